@@ -0,0 +1,270 @@
+"""
+Batch mode for the deep pain-point decomposer
+
+- Accepts a list of tasks or a JSONL file
+- Runs evidence retrieval + decomposition with bounded concurrency
+- Related tasks (same "group") share a single evidence retrieval
+- Streams one JSONL record per task with its status
+- Aggregates global confidence statistics at the end
+"""
+
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+
+# ----------------------------------------------------------------------
+# Task loading
+# ----------------------------------------------------------------------
+
+def load_tasks(tasks) -> list[dict]:
+    """
+    Normalize the batch input.
+
+    Args:
+        tasks: path to a JSONL file, or a list of strings / dicts.
+               Dicts use the keys "task" (required), "id" and "group".
+
+    Returns:
+        list[dict]: tasks with "id", "task" and "group" set.
+    """
+    if isinstance(tasks, str):
+        with open(tasks, "r", encoding="utf-8") as f:
+            tasks = [json.loads(line) for line in f if line.strip()]
+
+    normalized = []
+    for i, item in enumerate(tasks):
+        if isinstance(item, str):
+            item = {"task": item}
+        if not item.get("task"):
+            raise ValueError(f"Batch item {i} has no 'task': {item}")
+        normalized.append({
+            "id": str(item.get("id", i)),
+            "task": item["task"],
+            "group": item.get("group"),
+        })
+    return normalized
+
+
+def _load_records(output_path: str) -> dict:
+    """
+    Latest record per task ID of a previous run of the same batch.
+    """
+    if not os.path.exists(output_path):
+        return {}
+    records = {}
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record["id"]] = record
+    return records
+
+
+def _done_records(records: dict, prompt_key: str | None = None) -> dict:
+    """
+    Records decomposed successfully (with the same prompt, when prompt_key is given).
+    """
+    return {
+        task_id: record for task_id, record in records.items()
+        if record.get("status") == "ok" and (prompt_key is None or record.get("prompt") == prompt_key)
+    }
+
+
+def _compact(output_path: str):
+    """
+    Rewrite the output with one record per task ID: a re-run (e.g. with a new
+    prompt) supersedes the earlier record instead of adding a second one.
+    """
+    records = _load_records(output_path)
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records.values():
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, output_path)
+
+
+# ----------------------------------------------------------------------
+# Shared evidence
+# ----------------------------------------------------------------------
+
+class SharedEvidence:
+    """
+    Retrieves evidence once per key. Concurrent callers with the same key
+    wait for the first retrieval instead of issuing their own.
+
+    The retrieval itself runs for `task` (the first task of a group), not
+    for the key, which may be just a group label.
+    """
+
+    def __init__(self, retrieve):
+        self.retrieve = retrieve
+        self._futures: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, task: str) -> dict:
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[key] = future
+
+        if owner:
+            try:
+                future.set_result(self.retrieve({"task": task}))
+            except Exception as e:
+                future.set_exception(e)
+
+        return future.result()
+
+    def __len__(self):
+        return len(self._futures)
+
+
+# ----------------------------------------------------------------------
+# Statistics
+# ----------------------------------------------------------------------
+
+def confidence_stats(results: list[dict]) -> dict:
+    """
+    Aggregate global_confidence and the mean of every *_confidence field.
+    """
+    global_scores = [
+        r["global_confidence"] for r in results
+        if isinstance(r.get("global_confidence"), (int, float))
+    ]
+
+    per_field: dict[str, list] = {}
+    for r in results:
+        fields = dict(r)
+        fields.update(r.get("levels") or {})
+        for key, value in fields.items():
+            if key.endswith("_confidence") and key != "global_confidence" and isinstance(value, (int, float)):
+                per_field.setdefault(key, []).append(value)
+
+    stats = {"count": len(global_scores)}
+    if global_scores:
+        deciles = statistics.quantiles(global_scores, n=10, method="inclusive") if len(global_scores) > 1 else global_scores * 9
+        stats.update({
+            "mean": round(statistics.fmean(global_scores), 2),
+            "median": statistics.median(global_scores),
+            "min": min(global_scores),
+            "max": max(global_scores),
+            "p10": deciles[0],
+            "p90": deciles[-1],
+        })
+    stats["field_means"] = {
+        key: round(statistics.fmean(values), 2) for key, values in sorted(per_field.items())
+    }
+    return stats
+
+
+# ----------------------------------------------------------------------
+# Batch runner
+# ----------------------------------------------------------------------
+
+def run_decomposer_batch(
+    tasks,
+    retrieve,
+    decompose,
+    output_path: str = "painpoint_batch.jsonl",
+    max_concurrency: int = 4,
+    resume: bool = True,
+    prompt_key: str | None = None,
+) -> dict:
+    """
+    Decompose many pain points.
+
+    Args:
+        tasks: JSONL path or list of tasks (see load_tasks)
+        retrieve: evidence node, e.g. evidence_retriever(state) -> {"extra_evidence": ...}
+        decompose: decomposer node, e.g. deep_decomposer(state) -> dict
+        output_path: JSONL file, one record per task, appended as tasks finish
+        max_concurrency: number of tasks in flight
+        resume: skip task IDs already stored with status "ok" in output_path
+        prompt_key: version key of the decomposer prompt (decomposer_prompts.prompt_key);
+                    stored with every record, resume only skips records with the same key.
+                    Re-run tasks replace their earlier record in output_path.
+
+    Returns:
+        dict: batch summary with counts and confidence statistics over all
+              tasks of the batch, resumed ones included
+              (also saved next to output_path as *.summary.json)
+    """
+    items = load_tasks(tasks)
+    resumed = _done_records(_load_records(output_path), prompt_key) if resume else {}
+    resumed = {t["id"]: resumed[t["id"]] for t in items if t["id"] in resumed}
+    pending = [t for t in items if t["id"] not in resumed]
+
+    # Evidence shared by a group is retrieved for the group's first task
+    evidence_tasks = {}
+    for item in items:
+        evidence_tasks.setdefault(item["group"] or item["task"], item["task"])
+
+    evidence = SharedEvidence(retrieve)
+    write_lock = threading.Lock()
+    results, errors = [], []
+    started = time.perf_counter()
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    out = open(output_path, "a" if resume else "w", encoding="utf-8")
+
+    def run_one(item: dict) -> dict:
+        t0 = time.perf_counter()
+        evidence_key = item["group"] or item["task"]
+        record = {"id": item["id"], "task": item["task"], "group": item["group"], "prompt": prompt_key}
+        try:
+            shared = evidence.get(evidence_key, evidence_tasks[evidence_key])
+            result = decompose({"task": item["task"], **shared})
+            record.update({
+                "status": "ok",
+                "evidence_chars": len(shared.get("extra_evidence", "")),
+                "result": {"task": item["task"], **result},
+            })
+        except Exception as e:
+            record.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+        record["elapsed_s"] = round(time.perf_counter() - t0, 3)
+
+        with write_lock:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+        return record
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            futures = [pool.submit(run_one, item) for item in pending]
+            for done, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                if record["status"] == "ok":
+                    results.append(record["result"])
+                else:
+                    errors.append({"id": record["id"], "error": record["error"]})
+                print(f"[{done}/{len(pending)}] {record['status']:5} {record['id']} ({record['elapsed_s']}s)")
+    finally:
+        out.close()
+        if resume:
+            _compact(output_path)
+
+    previous = [record["result"] for record in resumed.values()]
+    summary = {
+        "output_path": output_path,
+        "tasks": len(items),
+        "skipped": len(resumed),
+        "ok": len(results) + len(previous),
+        "ok_this_run": len(results),
+        "errors": errors,
+        "evidence_retrievals": len(evidence),
+        "elapsed_s": round(time.perf_counter() - started, 3),
+        "global_confidence": confidence_stats(previous + results),
+    }
+
+    with open(os.path.splitext(output_path)[0] + ".summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=4, ensure_ascii=False)
+
+    return summary
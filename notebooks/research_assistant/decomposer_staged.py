@@ -0,0 +1,111 @@
+"""
+Staged (level-by-level) deep decomposer
+
+Stage 1 asks the LLM for the top-level fields and Levels 1–3 only.
+Stage 2 (Levels 4–5) is requested only when Levels 1–3 are confident enough
+AND enough evidence was retrieved. Otherwise Levels 4–5 are filled locally
+with "unknown", which saves the output tokens and latency of the deepest,
+least reliable levels.
+"""
+
+import json
+
+from decomposer_prompts import DEEPER_LEVELS, SHALLOW_DECOMPOSER
+
+
+SHALLOW_LEVELS = ("level_1", "level_2", "level_3")
+DEEP_LEVELS = ("level_4", "level_5")
+
+
+def _parse_json(raw: str) -> dict:
+    start = raw.find("{")
+    end = raw.rfind("}")
+    return json.loads(raw[start:end + 1])
+
+
+def _unknown_levels(reason: str) -> dict:
+    levels = {}
+    for level in DEEP_LEVELS:
+        levels[level] = ["unknown"]
+        levels[f"{level}_confidence"] = 0
+        levels[f"{level}_resources"] = [reason]
+    return levels
+
+
+def _confidence(value) -> int:
+    """
+    As decomposition_model._confidence, but a missing or non-numeric score
+    ("85", "unknown") counts as 0, so it fails the gate.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return max(0, min(100, int(value)))
+    return 0
+
+
+def should_go_deeper(
+    levels: dict,
+    evidence: str,
+    min_confidence: int = 60,
+    min_evidence_chars: int = 2000,
+) -> tuple[bool, str]:
+    """
+    Gate for stage 2: every shallow level must clear min_confidence and the
+    retrieved evidence must be at least min_evidence_chars long.
+    """
+    confidences = [_confidence(levels.get(f"{level}_confidence")) for level in SHALLOW_LEVELS]
+    weakest = min(confidences)
+
+    if weakest < min_confidence:
+        return False, f"Not generated: Levels 1–3 confidence {weakest} < {min_confidence}."
+    if len(evidence) < min_evidence_chars:
+        return False, f"Not generated: evidence volume {len(evidence)} chars < {min_evidence_chars}."
+    return True, f"Generated: weakest Levels 1–3 confidence {weakest}, evidence {len(evidence)} chars."
+
+
+def make_staged_decomposer(llm, min_confidence: int = 60, min_evidence_chars: int = 2000):
+    """
+    Build a drop-in replacement for the deep_decomposer node.
+
+    Args:
+        llm: chat model (e.g. ChatOpenAI) used for both stages
+        min_confidence: minimum Level 1–3 confidence required to request Levels 4–5
+        min_evidence_chars: minimum EXTRA_EVIDENCE length required to request Levels 4–5
+
+    Returns:
+        callable: node function (state) -> decomposition dict
+    """
+
+    def staged_decomposer(state):
+        task = state["task"]
+        if "extra_evidence" not in state:
+            # LangGraph drops keys the state schema does not declare, so the
+            # gate would silently always fail
+            raise KeyError(
+                "staged_decomposer needs 'extra_evidence' in the graph state; "
+                "declare it in the state schema (see DeepDecompositionState)"
+            )
+        evidence = state["extra_evidence"] or ""
+
+        # ---- Stage 1: top-level fields + Levels 1–3 ----
+        shallow = _parse_json(llm.invoke(
+            SHALLOW_DECOMPOSER.render(task=task, evidence=evidence)
+        ).content)
+
+        levels = shallow.setdefault("levels", {})
+        go_deeper, reason = should_go_deeper(levels, evidence, min_confidence, min_evidence_chars)
+
+        # ---- Stage 2: Levels 4–5 only when justified ----
+        if go_deeper:
+            deeper = _parse_json(llm.invoke(
+                DEEPER_LEVELS.render(task=task, evidence=evidence, levels=json.dumps(levels, ensure_ascii=False))
+            ).content)
+            filled = _unknown_levels("Not returned by the model.")
+            filled.update({k: v for k, v in deeper.items() if k in filled})
+            levels.update(filled)
+        else:
+            levels.update(_unknown_levels(reason))
+
+        shallow["stage_report"] = {"deep_levels_requested": go_deeper, "reason": reason}
+        return shallow
+
+    return staged_decomposer
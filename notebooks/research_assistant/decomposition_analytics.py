@@ -0,0 +1,133 @@
+"""
+Vectorized analytics over a corpus of deep decomposition results
+
+Works on the columnar arrays from decomposition_model.to_columns():
+- per-level (per-field) confidence histograms
+- severity x priority cross-tab
+- department frequency
+No Python loop over the results: every statistic is a NumPy reduction.
+"""
+
+import numpy as np
+
+from decomposition_model import (
+    CONFIDENCE_KEYS,
+    MISSING,
+    NO_PRIORITY,
+    SEVERITY_CODES,
+    load_decompositions,
+    to_columns,
+)
+
+# Same bands as the calibration guide used by the decomposer prompt
+CONFIDENCE_BANDS = (0, 10, 40, 70, 90, 101)
+CONFIDENCE_LABELS = ("0–9 unknown", "10–39 weak", "40–69 partial", "70–89 high", "90–100 direct")
+
+# Scores are 1–100; a missing priority (NO_PRIORITY, or 0) gets its own first column
+PRIORITY_BANDS = (1, 25, 50, 75, 101)
+PRIORITY_LABELS = ("none", "1–24", "25–49", "50–74", "75–100")
+
+
+def confidence_histograms(columns: dict, bands: tuple = CONFIDENCE_BANDS) -> dict:
+    """
+    Histogram of every confidence column in one bincount.
+
+    Returns:
+        dict: key -> counts per band (missing scores excluded)
+    """
+    scores = columns["confidences"]
+    n_bands = len(bands) - 1
+    n_keys = scores.shape[1]
+
+    band = np.searchsorted(np.asarray(bands), scores, side="right") - 1
+    flat = (np.arange(n_keys) * n_bands + band).ravel()
+    valid = (scores != MISSING).ravel()
+
+    counts = np.bincount(flat[valid], minlength=n_keys * n_bands).reshape(n_keys, n_bands)
+    return {key: counts[j] for j, key in enumerate(CONFIDENCE_KEYS)}
+
+
+def confidence_summary(columns: dict) -> dict:
+    """
+    Mean / median / count per confidence column, ignoring missing scores.
+    """
+    scores = np.ma.masked_equal(columns["confidences"], MISSING).astype(np.float32)
+    means = scores.mean(axis=0).filled(np.nan)
+    medians = np.ma.median(scores, axis=0).filled(np.nan)
+    counts = scores.count(axis=0)
+    return {
+        key: {"mean": float(means[j]), "median": float(medians[j]), "count": int(counts[j])}
+        for j, key in enumerate(CONFIDENCE_KEYS)
+    }
+
+
+def severity_priority_crosstab(columns: dict, bands: tuple = PRIORITY_BANDS) -> np.ndarray:
+    """
+    Counts of results per (severity, priority band). Column 0 counts the
+    results without a priority (NO_PRIORITY or 0): like MISSING confidences,
+    they are kept out of the score bands.
+
+    Returns:
+        np.ndarray: shape (len(SEVERITY_CODES), len(bands)), see PRIORITY_LABELS
+    """
+    n_bands = len(bands)
+    scores = columns["priority_score"]
+    priority = np.searchsorted(np.asarray(bands), scores, side="right")
+    priority = np.where((scores == NO_PRIORITY) | (scores <= 0), 0, np.clip(priority, 1, n_bands - 1))
+    cells = columns["severity"].astype(np.int64) * n_bands + priority
+    return np.bincount(cells, minlength=len(SEVERITY_CODES) * n_bands).reshape(len(SEVERITY_CODES), n_bands)
+
+
+def department_frequency(columns: dict, top: int | None = None) -> list[tuple[str, int]]:
+    """
+    How often each department appears in departments_affected, most frequent first.
+    """
+    vocab = columns["departments_vocab"]
+    counts = np.bincount(columns["departments_codes"], minlength=len(vocab))
+    order = np.argsort(-counts, kind="stable")
+    if top is not None:
+        order = order[:top]
+    return [(vocab[i], int(counts[i])) for i in order]
+
+
+def analyze_corpus(paths_or_columns, top_departments: int = 20) -> dict:
+    """
+    Load a corpus (result file paths, list of Decomposition, or columns)
+    and compute every statistic.
+    """
+    columns = paths_or_columns
+    if not isinstance(columns, dict):
+        if isinstance(columns, str) or (columns and isinstance(columns[0], str)):
+            columns = load_decompositions(columns)
+        columns = to_columns(columns)
+
+    return {
+        "count": int(columns["confidences"].shape[0]),
+        "confidence_summary": confidence_summary(columns),
+        "confidence_histograms": confidence_histograms(columns),
+        "severity_priority": severity_priority_crosstab(columns),
+        "departments": department_frequency(columns, top=top_departments),
+    }
+
+
+def print_corpus_report(report: dict):
+    """
+    Text report in the spirit of print_painpoint_tree, for a whole corpus.
+    """
+    print(f"\nDECOMPOSITION CORPUS ({report['count']} results)\n")
+
+    print("CONFIDENCE HISTOGRAMS:")
+    print(f"  {'field':<16}" + "".join(f"{label:>16}" for label in CONFIDENCE_LABELS) + f"{'mean':>8}")
+    for key, counts in report["confidence_histograms"].items():
+        mean = report["confidence_summary"][key]["mean"]
+        print(f"  {key:<16}" + "".join(f"{int(c):>16}" for c in counts) + f"{mean:>8.1f}")
+
+    print("\nSEVERITY x PRIORITY:")
+    print(f"  {'severity':<10}" + "".join(f"{label:>8}" for label in PRIORITY_LABELS))
+    for severity, row in zip(SEVERITY_CODES, report["severity_priority"]):
+        print(f"  {severity:<10}" + "".join(f"{int(c):>8}" for c in row))
+
+    print("\nDEPARTMENTS:")
+    for name, count in report["departments"]:
+        print(f"  {count:>6}  {name}")
+    print()
@@ -0,0 +1,341 @@
+"""
+Compact typed model for deep decomposition results
+
+- Decomposition: slotted dataclass, one per decomposer output
+  (confidence scores packed in a 16-byte array, categories as small codes)
+- Lossless round-trip with the existing JSON layout (painpoint_output.json):
+  values the compact fields cannot hold (a severity like "Medium-High", a
+  priority of "unknown", keys the model does not know such as stage_report)
+  are kept verbatim in `extra` and written back by to_dict()
+- Columnar export of a corpus: NumPy arrays, Arrow table or Parquet file
+"""
+
+import json
+from array import array
+from dataclasses import dataclass, field
+
+import numpy as np
+
+try:
+    import orjson as _fastjson
+except ImportError:  # optional speed-up
+    _fastjson = None
+
+
+# ----------------------------------------------------------------------
+# Layout of the decomposer JSON
+# ----------------------------------------------------------------------
+
+# (value key, confidence/resources prefix)
+FIELDS = (
+    ("pain_point", "pain_point"),
+    ("severity", "severity"),
+    ("priority_score", "priority_score"),
+    ("departments_affected", "departments"),
+    ("time_horizon", "time_horizon"),
+    ("symptoms", "symptoms"),
+    ("impact", "impact"),
+    ("root_causes", "root_causes"),
+    ("dependencies", "dependencies"),
+    ("opportunities", "opportunities"),
+)
+LIST_FIELDS = ("departments_affected", "symptoms", "impact", "root_causes", "dependencies", "opportunities")
+LEVELS = ("level_1", "level_2", "level_3", "level_4", "level_5")
+
+# Column order of Decomposition.confidences
+CONFIDENCE_KEYS = tuple(prefix for _, prefix in FIELDS) + LEVELS + ("global",)
+
+SEVERITY_CODES = ("unknown", "Low", "Medium", "High", "Critical")
+TIME_HORIZON_CODES = ("unknown", "Immediate", "Short-term", "Medium-term", "Long-term")
+
+MISSING = 255      # confidence not present in the source JSON
+NO_PRIORITY = -1   # priority_score missing or not a number ("unknown")
+
+# Keys held by the compact fields; everything else goes to Decomposition.extra
+_KNOWN_KEYS = frozenset(
+    ["task", "levels", "global_confidence"]
+    + [value_key for value_key, _ in FIELDS]
+    + [f"{prefix}_{suffix}" for _, prefix in FIELDS for suffix in ("confidence", "resources")]
+)
+_KNOWN_LEVEL_KEYS = frozenset(
+    [f"{level}{suffix}" for level in LEVELS for suffix in ("", "_confidence", "_resources")]
+)
+
+_SEVERITY_INDEX = {code.lower(): i for i, code in enumerate(SEVERITY_CODES)}
+_TIME_HORIZON_INDEX = {code.lower(): i for i, code in enumerate(TIME_HORIZON_CODES)}
+
+
+def _code(value, index: dict) -> int:
+    """
+    Code of a category, case-insensitive; 0 ("unknown") if not recognized.
+    """
+    return index.get(value.strip().lower(), 0) if isinstance(value, str) else 0
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _confidence(value) -> int:
+    if _is_number(value):
+        return max(0, min(100, int(value)))
+    return MISSING
+
+
+def _priority(value) -> int:
+    if _is_number(value):
+        return max(0, min(100, int(value)))
+    return NO_PRIORITY
+
+
+def loads(raw):
+    return _fastjson.loads(raw) if _fastjson else json.loads(raw)
+
+
+# ----------------------------------------------------------------------
+# Row model
+# ----------------------------------------------------------------------
+
+@dataclass(slots=True)
+class Decomposition:
+    task: str = ""
+    pain_point: str = ""
+    severity: int = 0                  # index in SEVERITY_CODES
+    priority_score: int = NO_PRIORITY
+    time_horizon: int = 0              # index in TIME_HORIZON_CODES
+    departments_affected: tuple = ()
+    symptoms: tuple = ()
+    impact: tuple = ()
+    root_causes: tuple = ()
+    dependencies: tuple = ()
+    opportunities: tuple = ()
+    levels: tuple = ((), (), (), (), ())
+    confidences: array = field(default_factory=lambda: array("B", [MISSING] * len(CONFIDENCE_KEYS)))
+    resources: dict | None = None      # prefix -> tuple[str], None when dropped
+    extra: dict | None = None          # source values the fields above cannot hold, None when none
+
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_dict(cls, data: dict, keep_resources: bool = True) -> "Decomposition":
+        """
+        Build from the decomposer JSON layout (flat fields + "levels" dict).
+        """
+        levels = data.get("levels") or {}
+        merged = {**data, **levels}
+        confidences = array("B", [_confidence(merged.get(f"{key}_confidence")) for key in CONFIDENCE_KEYS])
+
+        severity = _code(data.get("severity"), _SEVERITY_INDEX)
+        priority_score = _priority(data.get("priority_score"))
+        time_horizon = _code(data.get("time_horizon"), _TIME_HORIZON_INDEX)
+
+        # Everything to_dict() would not reproduce as it was
+        extra = {key: value for key, value in data.items() if key not in _KNOWN_KEYS}
+        for key, value in (("severity", SEVERITY_CODES[severity]),
+                           ("priority_score", priority_score),
+                           ("time_horizon", TIME_HORIZON_CODES[time_horizon])):
+            if key in data and data[key] != value:
+                extra[key] = data[key]
+        extra_levels = {key: value for key, value in levels.items() if key not in _KNOWN_LEVEL_KEYS}
+        for key, value in zip(CONFIDENCE_KEYS, confidences):
+            name = f"{key}_confidence"
+            source = levels if key in LEVELS else data
+            if source.get(name) is not None and source[name] != value:
+                (extra_levels if key in LEVELS else extra)[name] = source[name]
+        if extra_levels:
+            extra["levels"] = extra_levels
+
+        resources = None
+        if keep_resources:
+            resources = {
+                key: tuple(merged.get(f"{key}_resources") or ())
+                for key in CONFIDENCE_KEYS[:-1]
+            }
+
+        return cls(
+            task=data.get("task", ""),
+            pain_point=data.get("pain_point", ""),
+            severity=severity,
+            priority_score=priority_score,
+            time_horizon=time_horizon,
+            departments_affected=tuple(data.get("departments_affected") or ()),
+            symptoms=tuple(data.get("symptoms") or ()),
+            impact=tuple(data.get("impact") or ()),
+            root_causes=tuple(data.get("root_causes") or ()),
+            dependencies=tuple(data.get("dependencies") or ()),
+            opportunities=tuple(data.get("opportunities") or ()),
+            levels=tuple(tuple(levels.get(level) or ()) for level in LEVELS),
+            confidences=confidences,
+            resources=resources,
+            extra=extra or None,
+        )
+
+    def confidence(self, key: str) -> int | None:
+        value = self.confidences[CONFIDENCE_KEYS.index(key)]
+        return None if value == MISSING else value
+
+    def to_dict(self) -> dict:
+        """
+        Back to the decomposer JSON layout.
+        """
+        resources = self.resources or {}
+        out = {"task": self.task} if self.task else {}
+
+        values = {
+            "pain_point": self.pain_point,
+            "severity": SEVERITY_CODES[self.severity],
+            "priority_score": None if self.priority_score == NO_PRIORITY else self.priority_score,
+            "time_horizon": TIME_HORIZON_CODES[self.time_horizon],
+        }
+        values.update({name: list(getattr(self, name)) for name in LIST_FIELDS})
+
+        for value_key, prefix in FIELDS:
+            out[value_key] = values[value_key]
+            out[f"{prefix}_confidence"] = self.confidence(prefix)
+            out[f"{prefix}_resources"] = list(resources.get(prefix, ()))
+
+        out["levels"] = {}
+        for level, items in zip(LEVELS, self.levels):
+            out["levels"][level] = list(items)
+            out["levels"][f"{level}_confidence"] = self.confidence(level)
+            out["levels"][f"{level}_resources"] = list(resources.get(level, ()))
+
+        out["global_confidence"] = self.confidence("global")
+
+        extra = dict(self.extra or {})
+        out["levels"].update(extra.pop("levels", {}))
+        out.update(extra)
+        return out
+
+
+# ----------------------------------------------------------------------
+# Loading
+# ----------------------------------------------------------------------
+
+def iter_result_dicts(path: str):
+    """
+    Yield decomposer result dicts from:
+    - a single JSON result (painpoint_output.json)
+    - a JSON list of results
+    - a JSONL file (plain results or batch records with "status"/"result")
+    """
+    with open(path, "rb") as f:
+        head = f.read(1)
+        f.seek(0)
+        if path.endswith(".jsonl"):
+            for line in f:
+                if not line.strip():
+                    continue
+                row = loads(line)
+                if "result" in row and "status" in row:
+                    if row["status"] != "ok":
+                        continue
+                    row = row["result"]
+                yield row
+            return
+        data = loads(f.read())
+        if head == b"[" or isinstance(data, list):
+            yield from data
+        else:
+            yield data
+
+
+def load_decompositions(paths, keep_resources: bool = False) -> list[Decomposition]:
+    """
+    Load one or several result files into compact Decomposition objects.
+    Resources (long free text) are dropped by default for analytics.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    return [
+        Decomposition.from_dict(row, keep_resources=keep_resources)
+        for path in paths
+        for row in iter_result_dicts(path)
+    ]
+
+
+# ----------------------------------------------------------------------
+# Columnar export
+# ----------------------------------------------------------------------
+
+def _ragged(rows: list[tuple]) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """
+    Encode a list of string tuples as (offsets, codes, vocabulary).
+    """
+    vocabulary: dict[str, int] = {}
+    offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    codes = []
+    for i, items in enumerate(rows):
+        for item in items:
+            codes.append(vocabulary.setdefault(item, len(vocabulary)))
+        offsets[i + 1] = len(codes)
+    return offsets, np.asarray(codes, dtype=np.int32), list(vocabulary)
+
+
+def to_columns(decompositions: list[Decomposition]) -> dict:
+    """
+    Columnar view of a corpus.
+
+    Returns:
+        dict with
+        - "confidences": uint8 array (n, len(CONFIDENCE_KEYS)), MISSING = 255
+        - "severity", "time_horizon": int8 codes
+        - "priority_score": int16, NO_PRIORITY = -1
+        - "departments_offsets", "departments_codes", "departments_vocab": ragged departments
+        - "task", "pain_point": lists of str
+    """
+    n = len(decompositions)
+    confidences = np.frombuffer(
+        b"".join(d.confidences.tobytes() for d in decompositions), dtype=np.uint8
+    ).reshape(n, len(CONFIDENCE_KEYS))
+
+    offsets, codes, vocab = _ragged([d.departments_affected for d in decompositions])
+
+    return {
+        "confidence_keys": CONFIDENCE_KEYS,
+        "confidences": confidences,
+        "severity": np.fromiter((d.severity for d in decompositions), dtype=np.int8, count=n),
+        "time_horizon": np.fromiter((d.time_horizon for d in decompositions), dtype=np.int8, count=n),
+        "priority_score": np.fromiter((d.priority_score for d in decompositions), dtype=np.int16, count=n),
+        "departments_offsets": offsets,
+        "departments_codes": codes,
+        "departments_vocab": vocab,
+        "task": [d.task for d in decompositions],
+        "pain_point": [d.pain_point for d in decompositions],
+    }
+
+
+def to_arrow(decompositions: list[Decomposition]):
+    """
+    Arrow table (one row per decomposition). Requires pyarrow.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("to_arrow() requires pyarrow: pip install pyarrow") from e
+
+    cols = to_columns(decompositions)
+    table = {
+        "task": pa.array(cols["task"], type=pa.string()),
+        "pain_point": pa.array(cols["pain_point"], type=pa.string()),
+        "severity": pa.DictionaryArray.from_arrays(cols["severity"], pa.array(SEVERITY_CODES)),
+        "time_horizon": pa.DictionaryArray.from_arrays(cols["time_horizon"], pa.array(TIME_HORIZON_CODES)),
+        "priority_score": pa.array(cols["priority_score"], mask=cols["priority_score"] == NO_PRIORITY),
+        "departments_affected": pa.ListArray.from_arrays(
+            pa.array(cols["departments_offsets"].astype(np.int32)),
+            pa.DictionaryArray.from_arrays(cols["departments_codes"], pa.array(cols["departments_vocab"], type=pa.string())),
+        ),
+    }
+    confidences = cols["confidences"]
+    for j, key in enumerate(CONFIDENCE_KEYS):
+        column = confidences[:, j]
+        table[f"{key}_confidence"] = pa.array(column, mask=column == MISSING)
+    return pa.table(table)
+
+
+def to_parquet(decompositions: list[Decomposition], path: str):
+    """
+    Write the corpus to a Parquet file. Requires pyarrow.
+    """
+    import pyarrow.parquet as pq
+
+    pq.write_table(to_arrow(decompositions), path)
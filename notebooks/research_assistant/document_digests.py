@@ -0,0 +1,51 @@
+"""
+Per-source digest cache for retrieved documents
+
+The same Glassdoor, Reddit and Medium pages come back for many queries and
+their full content ends up in prompts again and again. DocumentDigests
+hands out a query-independent digest (summary + extracted claims) of every
+long document instead.
+
+It is cro.digests.DigestCache with a LangChain chat model as the digest
+call, so the research assistant and the CRO agents share one prompt
+(cro.prompts.DOCUMENT_DIGEST), one cache key (URL + document hash + prompt
+key) and, by default, one SQLite file (CRO_DIGEST_CACHE or
+~/.cro/digests.sqlite).
+
+Used by search_web (research assistant) before the documents reach the
+DocumentStore. Only `content` is replaced: `raw_content` stays the page, so
+evidence_ingest can still chunk, rank and cite it (the decomposer ingests
+raw pages and does not need digests).
+"""
+
+from cro.digests import DEFAULT_PATH, DigestCache
+
+
+class DocumentDigests(DigestCache):
+    """
+    Thread-safe, persistent digest cache shared by the graph nodes.
+
+    Args:
+        llm: chat model used to digest new documents (e.g. ChatOpenAI)
+        path: SQLite file (":memory:" for a throwaway cache)
+        min_chars: documents shorter than this are not digested
+        max_doc_chars: characters of a document sent to the model
+        max_concurrency: parallel digest calls per search
+    """
+
+    def __init__(self, llm, path: str = DEFAULT_PATH, min_chars: int = 1200,
+                 max_doc_chars: int = 12000, max_concurrency: int = 4):
+        super().__init__(path, min_chars=min_chars, max_doc_chars=max_doc_chars,
+                         max_concurrency=max_concurrency,
+                         summarize=lambda messages: llm.invoke(messages).content)
+
+    def apply(self, docs: list[dict]) -> list[dict]:
+        """
+        Copies of the documents with their `content` replaced by the rendered
+        digest where one exists (`raw_content` is kept).
+        """
+        docs = [doc for doc in docs if isinstance(doc, dict)]
+        out = []
+        for doc, content in zip(docs, self.contents(docs)):
+            out.append({**doc, "content": content})
+        return out
@@ -0,0 +1,121 @@
+"""
+Shared document store for a research run
+
+- One deduplicated store per run, shared by every interview
+- Documents keyed by URL + content hash
+- Interviews keep document IDs in their state, not the document text
+- Search results are cached per (source, query) so the same retrieval
+  is not repeated by another analyst
+"""
+
+import hashlib
+import threading
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class StoredDocument:
+    doc_id: str
+    url: str
+    content: str
+    source: str = "web"
+    page: str = ""
+
+    def render(self) -> str:
+        """
+        Format the document the way the interview prompts expect it.
+        """
+        if self.source == "wikipedia":
+            return f'<Document source="{self.url}" page="{self.page}"/>\n{self.content}\n</Document>'
+        return f'<Document href="{self.url}"/>\n{self.content}\n</Document>'
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.strip().encode("utf-8")).hexdigest()
+
+
+def make_doc_id(url: str, content: str) -> str:
+    """
+    Stable document ID: the same URL with the same content always maps to the same ID.
+    """
+    key = f"{url.strip()}\n{content_hash(content)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class DocumentStore:
+    """
+    Thread-safe store shared by all interviews of a research run.
+
+    Interviews run in parallel through the Send() API, so every access goes
+    through a single lock.
+    """
+    documents: dict = field(default_factory=dict)   # doc_id -> StoredDocument
+    queries: dict = field(default_factory=dict)     # (source, query) -> [doc_id]
+    hits: int = 0
+    misses: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, url: str, content: str, source: str = "web", page: str = "") -> str:
+        """
+        Add a document and return its ID. Duplicates are stored only once.
+        """
+        doc_id = make_doc_id(url, content)
+        with self._lock:
+            if doc_id not in self.documents:
+                self.documents[doc_id] = StoredDocument(
+                    doc_id=doc_id, url=url, content=content, source=source, page=str(page)
+                )
+        return doc_id
+
+    def search(self, source: str, query: str, fetch) -> list[str]:
+        """
+        Run `fetch(query)` once per (source, query) and return the document IDs.
+
+        `fetch` must return a list of dicts with at least "url" and "content"
+        (and optionally "page").
+        """
+        key = (source, " ".join(query.lower().split()))
+        with self._lock:
+            if key in self.queries:
+                self.hits += 1
+                return list(self.queries[key])
+            self.misses += 1
+
+        doc_ids = [
+            self.add(doc["url"], doc["content"], source=source, page=doc.get("page", ""))
+            for doc in fetch(query)
+        ]
+        doc_ids = list(dict.fromkeys(doc_ids))
+        with self._lock:
+            self.queries[key] = doc_ids
+        return list(doc_ids)
+
+    def unseen(self, doc_ids: list[str], seen: list[str]) -> list[str]:
+        """
+        Keep only the IDs an analyst has not received yet (order preserved).
+        """
+        seen_set = set(seen)
+        out = []
+        for doc_id in doc_ids:
+            if doc_id not in seen_set:
+                seen_set.add(doc_id)
+                out.append(doc_id)
+        return out
+
+    def render(self, doc_ids: list[str]) -> str:
+        """
+        Build the prompt context for a list of document IDs, each document once.
+        """
+        with self._lock:
+            docs = [self.documents[i] for i in dict.fromkeys(doc_ids) if i in self.documents]
+        return "\n\n---\n\n".join(doc.render() for doc in docs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": len(self.documents),
+                "queries": len(self.queries),
+                "query_hits": self.hits,
+                "query_misses": self.misses,
+            }
@@ -0,0 +1,153 @@
+"""
+Multi-level drill-down engine for the research graph
+
+Level 1 -> Level 2 -> Level 3 runs (see results_Allianz_3_Levels.ipynb) used
+to start from scratch each time. The engine instead:
+- seeds each child run with the parent's most relevant documents
+  (interviews start with these doc IDs in their context)
+- passes the parent's most relevant sections to the analyst planner
+- shares the run-wide DocumentStore, so queries already answered are not
+  retrieved again
+- runs sibling subtopics concurrently
+"""
+
+import math
+import re
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+
+_TOKEN = re.compile(r"[a-z0-9]{3,}")
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def rank_by_relevance(texts: list[str], query: str) -> list[int]:
+    """
+    Rank texts against a query with a small TF-IDF overlap score.
+
+    Returns:
+        list[int]: indices of texts with a positive score, best first
+    """
+    query_terms = set(_tokens(query))
+    if not texts or not query_terms:
+        return []
+
+    doc_terms = [Counter(_tokens(text)) for text in texts]
+    df = Counter(term for terms in doc_terms for term in set(terms) & query_terms)
+    idf = {term: math.log(1 + len(texts) / df[term]) for term in df}
+
+    scores = []
+    for i, terms in enumerate(doc_terms):
+        length = math.sqrt(sum(terms.values())) or 1.0
+        score = sum(terms[term] * idf[term] for term in idf) / length
+        if score > 0:
+            scores.append((score, i))
+    return [i for _, i in sorted(scores, key=lambda s: -s[0])]
+
+
+@dataclass
+class ResearchNode:
+    """
+    One finished research run in the drill-down tree.
+    """
+    topic: str
+    final_report: str = ""
+    sections: list = field(default_factory=list)
+    doc_ids: list = field(default_factory=list)
+    children: dict = field(default_factory=dict)   # child topic -> ResearchNode
+
+
+class DrillDownEngine:
+    """
+    Run child topics of a research report, reusing the parent's evidence.
+
+    Args:
+        graph: the compiled research graph (interrupt_before=['human_feedback'])
+        doc_store: the DocumentStore shared by the interview nodes
+        max_analysts: analysts per child run
+        seed_docs: parent documents passed to every child interview
+        seed_sections: parent sections passed to the analyst planner
+        max_concurrency: sibling subtopics run at the same time
+    """
+
+    def __init__(self, graph, doc_store, max_analysts: int = 3,
+                 seed_docs: int = 6, seed_sections: int = 2, max_concurrency: int = 3):
+        self.graph = graph
+        self.doc_store = doc_store
+        self.max_analysts = max_analysts
+        self.seed_docs = seed_docs
+        self.seed_sections = seed_sections
+        self.max_concurrency = max_concurrency
+
+    # ------------------------------------------------------------------
+    def node_from_state(self, topic: str, values: dict) -> ResearchNode:
+        """
+        Wrap a finished research graph state (graph.get_state(thread).values).
+        The node's evidence is the documents its interviews used (the
+        `context` doc IDs they return), not the whole shared store.
+        """
+        return ResearchNode(
+            topic=topic,
+            final_report=values.get("final_report", ""),
+            sections=list(values.get("sections", [])),
+            doc_ids=list(dict.fromkeys(values.get("context", []))),
+        )
+
+    def seed(self, parent: ResearchNode, child_topic: str) -> dict:
+        """
+        Select the parent documents and sections relevant to the child topic.
+        """
+        docs = [self.doc_store.documents[i] for i in parent.doc_ids if i in self.doc_store.documents]
+        ranked_docs = rank_by_relevance([d.content for d in docs], child_topic)[: self.seed_docs]
+        ranked_sections = rank_by_relevance(parent.sections, child_topic)[: self.seed_sections]
+
+        return {
+            "seed_context": [docs[i].doc_id for i in ranked_docs],
+            "parent_context": "\n\n".join(parent.sections[i] for i in ranked_sections),
+        }
+
+    # ------------------------------------------------------------------
+    def run(self, parent: ResearchNode, child_topic: str, feedback: str | None = None) -> ResearchNode:
+        """
+        Run one child topic to completion (human feedback step answered automatically).
+        """
+        config = {"configurable": {"thread_id": f"drill-{uuid.uuid4().hex[:12]}"}}
+        seed = self.seed(parent, child_topic)
+
+        # Runs until the interrupt before human_feedback
+        self.graph.invoke({
+            "topic": child_topic,
+            "max_analysts": self.max_analysts,
+            **seed,
+        }, config)
+
+        if feedback:
+            self.graph.update_state(config, {"human_analyst_feedback": feedback}, as_node="human_feedback")
+            self.graph.invoke(None, config)
+
+        self.graph.update_state(config, {"human_analyst_feedback": None}, as_node="human_feedback")
+        self.graph.invoke(None, config)
+
+        values = self.graph.get_state(config).values
+        child = self.node_from_state(child_topic, values)
+        parent.children[child_topic] = child
+
+        print(f"✅ {child_topic}: seeded with {len(seed['seed_context'])} docs, "
+              f"store now {self.doc_store.stats()}")
+        return child
+
+    def run_children(self, parent: ResearchNode, child_topics: list[str]) -> dict:
+        """
+        Run sibling subtopics concurrently.
+
+        Returns:
+            dict: child topic -> ResearchNode
+        """
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            futures = {topic: pool.submit(self.run, parent, topic) for topic in child_topics}
+            return {topic: future.result() for topic, future in futures.items()}
@@ -0,0 +1,287 @@
+"""
+Bounded ingestion of raw search content for the decomposer
+
+TavilySearchResults(include_raw_content=True) returns whole pages. Instead of
+concatenating them into one prompt, evidence_retriever passes them through:
+
+1. per-document cap:   only the first `max_doc_chars` of a page are read
+2. chunking:           paragraphs packed into chunks of ~`chunk_chars`
+3. boilerplate filter: navigation, cookie/legal lines, link lists and lines
+                       repeated across pages are dropped
+4. near-duplicates:    MinHash signatures + LSH buckets drop chunks that are
+                       near-copies of an earlier chunk (mirrors, syndication)
+5. ranking + budget:   chunks ranked by relevance to the task, at most
+                       `max_chunks_per_doc` per page, until `token_budget`
+
+Every selected chunk keeps its provenance (url, title, chunk index,
+character offset), and the evidence text cites it.
+"""
+
+import re
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from drill_down import rank_by_relevance
+from report_pipeline import estimate_tokens
+
+
+# ----------------------------------------------------------------------
+# Chunks
+# ----------------------------------------------------------------------
+
+@dataclass(slots=True)
+class Chunk:
+    url: str
+    title: str
+    index: int        # chunk number within the document
+    offset: int       # character offset within the raw content
+    text: str
+
+    def provenance(self) -> dict:
+        return {
+            "url": self.url,
+            "title": self.title,
+            "chunk": self.index,
+            "offset": self.offset,
+            "chars": len(self.text),
+        }
+
+    def render(self) -> str:
+        return f"[source: {self.url} #{self.index}]\n{self.text}"
+
+
+_PARAGRAPH = re.compile(r"\n\s*\n|\r\n\s*\r\n")
+_BOILERPLATE = re.compile(
+    r"cookie|privacy policy|terms of (use|service)|all rights reserved|©|sign in|log in|"
+    r"sign up|subscribe|newsletter|skip to (main )?content|accept all|share this|"
+    r"follow us|back to top|javascript",
+    re.IGNORECASE,
+)
+
+
+def _is_boilerplate(line: str) -> bool:
+    stripped = line.strip()
+    if len(stripped) < 25:
+        return True
+    letters = sum(c.isalpha() for c in stripped)
+    if letters < 0.6 * len(stripped):                       # tables, link lists, markup
+        return True
+    if stripped.count("|") >= 3 or stripped.count("»") >= 2:  # breadcrumbs / menus
+        return True
+    return len(stripped) < 160 and bool(_BOILERPLATE.search(stripped))
+
+
+def iter_paragraphs(raw: str, max_chars: int):
+    """
+    Yield (offset, paragraph) from the first `max_chars` of a page, without
+    splitting the rest of the page. `offset` is where the stripped paragraph
+    starts in `raw`.
+    """
+    end = min(len(raw), max_chars)
+    position = 0
+    while position < end:
+        match = _PARAGRAPH.search(raw, position, end)
+        stop = match.start() if match else end
+        block = raw[position:stop]
+        paragraph = block.strip()
+        if paragraph:
+            yield position + len(block) - len(block.lstrip()), paragraph
+        position = match.end() if match else end
+
+
+_LINE = re.compile(r"[^\r\n]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_long(offset: int, text: str, limit: int):
+    """
+    Yield (offset, piece) pieces of at most `limit` characters: cut at the
+    last sentence end that fits, else at the last space, else hard.
+    """
+    while len(text) > limit:
+        boundary = None
+        for match in _SENTENCE_END.finditer(text, 0, limit + 1):
+            if match.start() > 0:
+                boundary = match
+        if boundary is not None:
+            cut, resume = boundary.start(), boundary.end()
+        else:
+            space = text.rfind(" ", 0, limit + 1)
+            cut, resume = (space, space + 1) if space > 0 else (limit, limit)
+        yield offset, text[:cut]
+        offset += resume
+        text = text[resume:]
+    if text:
+        yield offset, text
+
+
+def chunk_document(url: str, title: str, raw: str, max_doc_chars: int,
+                   chunk_chars: int, repeated_lines: set) -> list[Chunk]:
+    """
+    Split one page into chunks of clean paragraphs. Paragraphs and lines
+    longer than `chunk_chars` (pages with single newlines only) are split at
+    sentence ends into several chunks; offsets point into `raw`.
+    """
+    chunks, text, start = [], "", 0
+
+    for paragraph_offset, paragraph in iter_paragraphs(raw, max_doc_chars):
+        new_paragraph = True
+        for line in _LINE.finditer(paragraph):
+            stripped = line.group().strip()
+            if _is_boilerplate(stripped) or stripped.lower() in repeated_lines:
+                continue
+            line_offset = paragraph_offset + line.start() + len(line.group()) - len(line.group().lstrip())
+
+            for offset, piece in split_long(line_offset, stripped, chunk_chars):
+                if text and len(text) + 1 + len(piece) > chunk_chars:
+                    chunks.append(Chunk(url, title, len(chunks), start, text))
+                    text = ""
+                if not text:
+                    text, start = piece, offset
+                else:
+                    text += ("\n" if new_paragraph else " ") + piece
+                new_paragraph = False
+
+    if text:
+        chunks.append(Chunk(url, title, len(chunks), start, text))
+    return chunks
+
+
+def repeated_lines(raws: list[str], max_doc_chars: int) -> set:
+    """
+    Short lines that appear on several pages (shared headers, footers, menus).
+    """
+    seen = {}
+    for raw in raws:
+        for line in set(raw[:max_doc_chars].splitlines()):
+            key = line.strip().lower()
+            if 0 < len(key) < 80:
+                seen[key] = seen.get(key, 0) + 1
+    return {line for line, count in seen.items() if count > 1}
+
+
+# ----------------------------------------------------------------------
+# Near-duplicate detection (MinHash + LSH)
+# ----------------------------------------------------------------------
+
+_PRIME = (1 << 61) - 1
+
+
+class MinHashDeduper:
+    """
+    Keeps the first chunk of every group of near-identical chunks.
+
+    Args:
+        threshold: estimated Jaccard similarity (word 5-gram shingles)
+                   above which a chunk counts as a duplicate
+        num_perm: MinHash signature length
+        bands: LSH bands (num_perm must be divisible by bands)
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 16, seed: int = 7):
+        rng = np.random.default_rng(seed)
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self.buckets = {}
+        self.signatures = []
+
+    def signature(self, text: str) -> np.ndarray:
+        words = re.findall(r"\w+", text.lower())
+        shingles = {" ".join(words[i:i + 5]) for i in range(max(1, len(words) - 4))}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64)
+        # (a * h + b) mod p for every permutation and shingle; uint64 wraps like a hash
+        return ((self.a[:, None] * hashes[None, :] + self.b[:, None]) % _PRIME).min(axis=1)
+
+    def is_duplicate(self, text: str) -> bool:
+        """
+        Check a chunk against all kept chunks; keep it if it is new.
+        """
+        sig = self.signature(text)
+        keys = [(band, sig[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+        candidates = {i for key in keys for i in self.buckets.get(key, ())}
+        for i in candidates:
+            if float(np.mean(self.signatures[i] == sig)) >= self.threshold:
+                return True
+
+        index = len(self.signatures)
+        self.signatures.append(sig)
+        for key in keys:
+            self.buckets.setdefault(key, []).append(index)
+        return False
+
+
+# ----------------------------------------------------------------------
+# Pipeline
+# ----------------------------------------------------------------------
+
+def ingest_results(
+    results: list,
+    query: str,
+    max_doc_chars: int = 20000,
+    chunk_chars: int = 1200,
+    max_chunks_per_doc: int = 4,
+    token_budget: int = 3000,
+    dedup_threshold: float = 0.8,
+) -> dict:
+    """
+    Turn raw search results into bounded, deduplicated, ranked evidence.
+
+    Args:
+        results: Tavily results (dicts with url, title, content, raw_content)
+        query: text the chunks are ranked against (e.g. the task)
+        max_doc_chars: characters read per page
+        chunk_chars: target chunk size
+        max_chunks_per_doc: chunks kept per page
+        token_budget: total evidence size for the prompt
+        dedup_threshold: MinHash similarity treated as duplicate
+
+    Returns:
+        dict: {"evidence": str, "chunks": [provenance], "stats": {...}}
+    """
+    docs = [r for r in results if isinstance(r, dict)]
+    raws = [r.get("raw_content") or r.get("content") or "" for r in docs]
+    repeated = repeated_lines(raws, max_doc_chars) if len(docs) > 1 else set()
+
+    stats = {"documents": len(docs), "raw_chars": sum(len(raw) for raw in raws),
+             "chunks": 0, "duplicates": 0, "selected": 0}
+
+    deduper = MinHashDeduper(threshold=dedup_threshold)
+    chunks = []
+    for doc, raw in zip(docs, raws):
+        for chunk in chunk_document(doc.get("url", ""), doc.get("title", ""), raw,
+                                    max_doc_chars, chunk_chars, repeated):
+            stats["chunks"] += 1
+            if deduper.is_duplicate(chunk.text):
+                stats["duplicates"] += 1
+            else:
+                chunks.append(chunk)
+
+    # Relevance order; chunks without any query term keep their original order at the end
+    ranked = rank_by_relevance([c.text for c in chunks], query)
+    ranked_set = set(ranked)
+    order = ranked + [i for i in range(len(chunks)) if i not in ranked_set]
+
+    selected, per_doc, used = [], {}, 0
+    for i in order:
+        chunk = chunks[i]
+        tokens = estimate_tokens(chunk.text)
+        if per_doc.get(chunk.url, 0) >= max_chunks_per_doc or used + tokens > token_budget:
+            continue
+        selected.append(chunk)
+        per_doc[chunk.url] = per_doc.get(chunk.url, 0) + 1
+        used += tokens
+
+    stats["selected"] = len(selected)
+    stats["evidence_tokens"] = used
+
+    return {
+        "evidence": "\n\n".join(chunk.render() for chunk in selected),
+        "chunks": [chunk.provenance() for chunk in selected],
+        "stats": stats,
+    }
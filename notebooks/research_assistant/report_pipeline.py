@@ -0,0 +1,107 @@
+"""
+Map-reduce report pipeline for the research graph
+
+With many analysts, the concatenated sections outgrow the context window of
+write_report / write_introduction / write_conclusion. This module condenses
+them before the writers run:
+
+1. map:    pack sections into batches and condense every batch in parallel
+2. reduce: condense the resulting memos again, level by level, until the
+           whole memo fits the token budget
+3. the writers (run concurrently by the graph) read the reduced memo
+
+When the raw sections already fit the budget they are passed through
+unchanged, with no extra LLM call.
+"""
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+
+condense_instructions = """You are a technical editor condensing analyst memos on this overall topic:
+
+{topic}
+
+You will be given one or more memos. Merge them into a single, denser memo:
+
+1. Keep every distinct technical pain point, finding and example.
+2. Drop repetition, preamble and generic statements.
+3. Preserve citations exactly as they appear, for example [1] or [2], next to the statements they support.
+4. End with a ### Sources section that lists every cited source once, keeping the original numbering and links.
+5. Use markdown. Include no preamble.
+6. Stay under {max_words} words."""
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token for English prose).
+    """
+    return len(text) // 4 + 1
+
+
+def pack(texts: list[str], budget: int) -> list[list[str]]:
+    """
+    Greedily group texts so each group stays under `budget` tokens
+    (a single oversized text gets its own group).
+    """
+    groups, current, size = [], [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and size + tokens > budget:
+            groups.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def condense(llm, groups: list[list[str]], topic: str, max_words: int, max_concurrency: int) -> list[str]:
+    """
+    Condense every group into one memo, all groups in parallel.
+    """
+    system_message = condense_instructions.format(topic=topic, max_words=max_words)
+    prompts = [
+        [SystemMessage(content=system_message),
+         HumanMessage(content="Condense these memos:\n\n" + "\n\n---\n\n".join(group))]
+        for group in groups
+    ]
+    responses = llm.batch(prompts, config={"max_concurrency": max_concurrency})
+    return [response.content for response in responses]
+
+
+def reduce_sections(
+    llm,
+    sections: list[str],
+    topic: str,
+    token_budget: int = 6000,
+    batch_budget: int = 3000,
+    max_concurrency: int = 4,
+    max_levels: int = 4,
+) -> str:
+    """
+    Reduce analyst sections to one memo that fits `token_budget`.
+
+    Args:
+        llm: chat model with .batch() (e.g. ChatOpenAI)
+        sections: raw analyst sections
+        topic: research topic
+        token_budget: target size of the final memo
+        batch_budget: input size of one condense call
+        max_concurrency: condense calls in flight
+        max_levels: safety cap on reduce levels
+
+    Returns:
+        str: the memo the report writers will use
+    """
+    memos = list(sections)
+    for _ in range(max_levels):
+        if sum(estimate_tokens(m) for m in memos) <= token_budget:
+            break
+        groups = pack(memos, batch_budget)
+        # Each level must shrink; the output share per group follows the final budget
+        max_words = max(150, int(token_budget * 0.75 / len(groups)))
+        memos = condense(llm, groups, topic, max_words, max_concurrency)
+        if len(groups) == 1:
+            break
+    return "\n\n".join(memos)
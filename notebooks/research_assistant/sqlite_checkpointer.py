@@ -0,0 +1,441 @@
+"""
+Persistent, compacting LangGraph checkpointer (SQLite)
+
+Drop-in replacement for MemorySaver in the research and decomposer graphs:
+- survives restarts (one SQLite file)
+- stores diffs: a checkpoint row only holds channel versions; a channel
+  value is written once per new version, not copied into every snapshot
+- large values (documents, transcripts, message lists) live out of line in a
+  content-addressed, zlib-compressed blob table, deduplicated across threads
+- keeps only the last `keep_last` checkpoints per thread / namespace and
+  garbage-collects the values no remaining checkpoint refers to
+
+Nothing is cached in RAM, so long human-in-the-loop sessions and many
+concurrent threads stay within a bounded memory footprint.
+
+Note: pruning drops intermediate checkpoints, so do not combine keep_last
+with graphs that use DeltaChannel (the notebook graphs do not).
+"""
+
+import hashlib
+import random
+import sqlite3
+import threading
+import zlib
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id     TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_id     TEXT,
+    checkpoint    TEXT NOT NULL,   -- blob hash of the checkpoint without channel_values
+    metadata      TEXT NOT NULL,   -- blob hash
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS channel_values (
+    thread_id     TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel       TEXT NOT NULL,
+    version       TEXT NOT NULL,
+    value         TEXT,            -- blob hash, NULL for an empty channel
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id     TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id       TEXT NOT NULL,
+    idx           INTEGER NOT NULL,
+    channel       TEXT NOT NULL,
+    value         TEXT NOT NULL,   -- blob hash
+    task_path     TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    hash       TEXT PRIMARY KEY,
+    type       TEXT NOT NULL,
+    compressed INTEGER NOT NULL,
+    data       BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_blob ON checkpoints (checkpoint);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_meta ON checkpoints (metadata);
+CREATE INDEX IF NOT EXISTS idx_channel_values_blob ON channel_values (value);
+CREATE INDEX IF NOT EXISTS idx_writes_blob ON writes (value);
+"""
+
+
+class SqliteCompactingSaver(BaseCheckpointSaver[str]):
+    """
+    SQLite checkpointer with diff storage, out-of-line blobs and pruning.
+
+    Args:
+        path: SQLite file (":memory:" for tests)
+        keep_last: checkpoints kept per thread / namespace (None = keep all)
+        compress_over: values larger than this many bytes are zlib-compressed
+    """
+
+    def __init__(self, path: str = "checkpoints.sqlite", keep_last: int | None = 20,
+                 compress_over: int = 1024, *, serde=None):
+        super().__init__(serde=serde)
+        self.keep_last = keep_last
+        self.compress_over = compress_over
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.RLock()
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Blobs
+    # ------------------------------------------------------------------
+
+    def _put_blob(self, value: Any) -> str:
+        type_, data = self.serde.dumps_typed(value)
+        digest = hashlib.sha256(type_.encode() + b"\0" + data).hexdigest()
+        compressed = len(data) > self.compress_over
+        if compressed:
+            data = zlib.compress(data, 6)
+        self.conn.execute(
+            "INSERT OR IGNORE INTO blobs (hash, type, compressed, data) VALUES (?, ?, ?, ?)",
+            (digest, type_, int(compressed), data),
+        )
+        return digest
+
+    def _get_blob(self, digest: str) -> Any:
+        type_, compressed, data = self.conn.execute(
+            "SELECT type, compressed, data FROM blobs WHERE hash = ?", (digest,)
+        ).fetchone()
+        if compressed:
+            data = zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_id, checkpoint_hash, metadata_hash = row
+        checkpoint = self._get_blob(checkpoint_hash)
+
+        values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            found = self.conn.execute(
+                "SELECT value FROM channel_values "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if found and found[0] is not None:
+                values[channel] = self._get_blob(found[0])
+
+        writes = self.conn.execute(
+            "SELECT task_id, channel, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+            "ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+
+        def config_for(cid):
+            return {"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": cid,
+            }}
+
+        return CheckpointTuple(
+            config=config_for(checkpoint_id),
+            checkpoint={**checkpoint, "channel_values": values},
+            metadata=self._get_blob(metadata_hash),
+            parent_config=config_for(parent_id) if parent_id else None,
+            pending_writes=[(task_id, channel, self._get_blob(h)) for task_id, channel, h in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "SELECT checkpoint_id, parent_id, checkpoint, metadata FROM checkpoints "
+
+        with self.lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.conn.execute(
+                    columns + "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    columns + "WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            return self._tuple(thread_id, checkpoint_ns, row) if row else None
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, checkpoint, metadata FROM checkpoints"
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            with self.lock:
+                item = self._tuple(thread_id, checkpoint_ns, tuple(row))
+            if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield item
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+
+        c = checkpoint.copy()
+        values = c.pop("channel_values")
+
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                # Only channels that changed since the parent checkpoint are stored
+                for channel, version in new_versions.items():
+                    value_hash = self._put_blob(values[channel]) if channel in values else None
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO channel_values VALUES (?, ?, ?, ?, ?)",
+                        (thread_id, checkpoint_ns, channel, str(version), value_hash),
+                    )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        thread_id, checkpoint_ns, checkpoint["id"], parent_id,
+                        self._put_blob(c),
+                        self._put_blob(get_checkpoint_metadata(config, metadata)),
+                    ),
+                )
+                if self.keep_last:
+                    self._prune_namespace(thread_id, checkpoint_ns, self.keep_last)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+        return {"configurable": {
+            "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"],
+        }}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                for idx, (channel, value) in enumerate(writes):
+                    write_idx = WRITES_IDX_MAP.get(channel, idx)
+                    # Regular writes are idempotent, special writes (errors, interrupts) are replaced
+                    verb = "INSERT OR IGNORE" if write_idx >= 0 else "INSERT OR REPLACE"
+                    self.conn.execute(
+                        f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (thread_id, checkpoint_ns, checkpoint_id, task_id, write_idx,
+                         channel, self._put_blob(value), task_path),
+                    )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def _prune_namespace(self, thread_id: str, checkpoint_ns: str, keep: int):
+        """
+        Drop all but the `keep` newest checkpoints of one namespace, their
+        writes, and the channel values no kept checkpoint refers to.
+        """
+        key = (thread_id, checkpoint_ns)
+        old = self.conn.execute(
+            "SELECT checkpoint_id, checkpoint, metadata FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (*key, keep),
+        ).fetchall()
+        if not old:
+            return
+
+        released = set()
+        for checkpoint_id, checkpoint_hash, metadata_hash in old:
+            released.update((checkpoint_hash, metadata_hash))
+            released.update(h for (h,) in self.conn.execute(
+                "SELECT value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (*key, checkpoint_id),
+            ))
+            self.conn.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (*key, checkpoint_id),
+            )
+            self.conn.execute(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (*key, checkpoint_id),
+            )
+
+        live = set()
+        for (checkpoint_hash,) in self.conn.execute(
+            "SELECT checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?", key
+        ).fetchall():
+            live.update((ch, str(v)) for ch, v in self._get_blob(checkpoint_hash)["channel_versions"].items())
+
+        for channel, version, value_hash in self.conn.execute(
+            "SELECT channel, version, value FROM channel_values WHERE thread_id = ? AND checkpoint_ns = ?", key
+        ).fetchall():
+            if (channel, version) not in live:
+                released.add(value_hash)
+                self.conn.execute(
+                    "DELETE FROM channel_values WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "AND channel = ? AND version = ?",
+                    (*key, channel, version),
+                )
+
+        self._collect_garbage(released - {None})
+
+    def _collect_garbage(self, candidates: set | None = None):
+        """
+        Delete blobs nothing refers to any more (only `candidates` when given).
+        Blobs are shared across threads, so a hash is checked against every table.
+        """
+        if candidates is None:
+            candidates = {h for (h,) in self.conn.execute("SELECT hash FROM blobs")}
+        for digest in candidates:
+            self.conn.execute("""
+                DELETE FROM blobs WHERE hash = :h
+                AND NOT EXISTS (SELECT 1 FROM checkpoints WHERE checkpoint = :h OR metadata = :h)
+                AND NOT EXISTS (SELECT 1 FROM channel_values WHERE value = :h)
+                AND NOT EXISTS (SELECT 1 FROM writes WHERE value = :h)
+            """, {"h": digest})
+
+    def prune(self, thread_ids: Sequence[str], *, strategy: str = "keep_latest") -> None:
+        """
+        "keep_latest" keeps the newest checkpoint per namespace, "delete" removes the threads.
+        """
+        if strategy == "delete":
+            for thread_id in thread_ids:
+                self.delete_thread(thread_id)
+            return
+        if strategy != "keep_latest":
+            raise ValueError(f"Unknown prune strategy: {strategy}")
+
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                for thread_id in thread_ids:
+                    for (checkpoint_ns,) in self.conn.execute(
+                        "SELECT DISTINCT checkpoint_ns FROM checkpoints WHERE thread_id = ?", (thread_id,)
+                    ).fetchall():
+                        self._prune_namespace(thread_id, checkpoint_ns, 1)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                for table in ("checkpoints", "channel_values", "writes"):
+                    self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+                self._collect_garbage()
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def vacuum(self):
+        """
+        Give the space freed by pruning back to the file system.
+        """
+        with self.lock:
+            self.conn.execute("VACUUM")
+
+    # ------------------------------------------------------------------
+    # Async API (same storage, called from the event loop thread)
+    # ------------------------------------------------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return self.delete_thread(thread_id)
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
@@ -0,0 +1,150 @@
+import os
+import json
+import re
+from datetime import datetime
+from cro import utils
+from cro.prompts import MATCH_MATRIX_SCORER
+
+from openai import OpenAI
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+def _pain_context(pain_json: dict) -> str:
+    pain_data = pain_json.get("pain_points") or {}
+    if isinstance(pain_data, dict):
+        return "\n".join(f"- {p}" for p in pain_data.get("pain_points", []))
+    return str(pain_data)
+
+
+def _value_context(value_json: dict) -> str:
+    value_data = value_json.get("value_proposition") or {}
+    if isinstance(value_data, dict):
+        return "\n".join(f"- {v}" for v in value_data.get("value_arguments", []))
+    return str(value_data)
+
+
+def _provider_ids(origins: list[str]) -> dict:
+    """
+    Short ids the LLM keys its answer by ("P1", "P2", ...), instead of echoing company names.
+    """
+    return {f"P{i}": origin for i, origin in enumerate(origins, start=1)}
+
+
+def _validate(result) -> dict:
+    """
+    One provider's answer, with the score checked (an int 0-100, else an error entry).
+    """
+    if not isinstance(result, dict):
+        return {"error": "missing from response"}
+    score = result.get("score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 100:
+        return {**result, "score": None, "error": f"invalid score: {score!r}"}
+    return {**result, "score": int(round(score))}
+
+
+def _score_chunk(target_company: str, pain_json: dict, origins: list[str], value_outputs: dict) -> dict:
+    """
+    One LLM call: score one target against several origins.
+    """
+    ids = _provider_ids(origins)
+    origins_block = "\n\n".join(
+        f'### [{provider_id}] {origin}\n{_value_context(value_outputs[origin]) or "(No value proposition data available)"}'
+        for provider_id, origin in ids.items()
+    )
+
+    messages = MATCH_MATRIX_SCORER.render(
+        target_company=target_company,
+        today=datetime.now().strftime("%Y-%m-%d"),
+        pain_context=_pain_context(pain_json) or f"(No pain points available for {target_company})",
+        origins_block=origins_block,
+    )
+
+    response = client.chat.completions.create(
+        model="gpt-4.1",
+        messages=messages,
+    )
+
+    content = response.choices[0].message.content.strip()
+
+    # Clean and parse JSON fences
+    clean = re.sub(r"^```[a-zA-Z]*\n?", "", content)
+    clean = re.sub(r"```$", "", clean).strip()
+
+    try:
+        parsed = json.loads(clean)
+    except json.JSONDecodeError:
+        parsed = {}
+    if not isinstance(parsed, dict):
+        parsed = {}
+
+    # Ids are matched case- and bracket-insensitively ("p1", "[P1]")
+    answers = {str(key).strip(" []").upper(): value for key, value in parsed.items()}
+    return {origin: _validate(answers.get(provider_id)) for provider_id, origin in ids.items()}
+
+
+def match_matrix_scorer(
+    pain_outputs: dict,
+    value_outputs: dict,
+    candidates: dict | None = None,
+    origins_per_call: int = 5,
+    top_k: int = 3,
+) -> dict:
+    """
+    Scores N targets against M origins with several origins per LLM call.
+
+    Args:
+        pain_outputs: target_company -> pain_point_detective output
+        value_outputs: origin_company -> value_prop_engineer output
+        candidates: optional target_company -> origins to score
+                    (e.g. pairs that passed the local pre-screen); default all origins
+        origins_per_call: origins scored together in one prompt
+        top_k: best origins kept per target
+
+    Returns:
+        dict with
+        - "matrix": target -> origin -> score (None when scoring failed)
+        - "top_k": target -> best origins, best first
+        - "match_outputs": (target, origin) -> match_scorer-compatible output,
+                           for the top_k pairs only
+    """
+
+    utils.print_html(f"Match Matrix Scorer ({len(pain_outputs)} x {len(value_outputs)})", "🧮")
+
+    matrix, details = {}, {}
+
+    for target_company, pain_json in pain_outputs.items():
+        origins = list((candidates or {}).get(target_company, value_outputs.keys()))
+        matrix[target_company] = {}
+
+        for start in range(0, len(origins), origins_per_call):
+            chunk = origins[start:start + origins_per_call]
+            try:
+                scored = _score_chunk(target_company, pain_json, chunk, value_outputs)
+            except Exception as e:
+                scored = {origin: {"error": str(e)} for origin in chunk}
+
+            for origin, result in scored.items():
+                score = result.get("score") if isinstance(result, dict) else None
+                matrix[target_company][origin] = score if isinstance(score, (int, float)) else None
+                details[(target_company, origin)] = result
+
+    top = {
+        target: [o for o, s in sorted(row.items(), key=lambda kv: -(kv[1] or -1)) if s is not None][:top_k]
+        for target, row in matrix.items()
+    }
+
+    match_outputs = {}
+    for target_company, origins in top.items():
+        for origin_company in origins:
+            match_outputs[(target_company, origin_company)] = {
+                "company_pair": f"{target_company} -> {origin_company}",
+                "matching_result": details[(target_company, origin_company)],
+                "pain_sources": pain_outputs[target_company].get("retrieval_sources", []),
+                "value_sources": value_outputs[origin_company].get("retrieval_sources", []),
+            }
+
+    return {
+        "matrix": matrix,
+        "top_k": top,
+        "match_outputs": match_outputs,
+    }
@@ -3,6 +3,7 @@ import json
 import re
 from datetime import datetime
 from cro import utils
+from cro.prompts import MATCH_SCORER
 from tavily import TavilyClient
 
 from openai import OpenAI
@@ -32,36 +33,15 @@ def match_scorer(target_company: str, origin_company: str,
         value_context = f"(No value proposition data available for {origin_company})"
     
     # Build a prompt that uses both textual and provenance evidence
-    prompt_ = f"""
-You are a business solution matchmaker.
-Compare the **pain points** of {target_company} with the **value proposition** of {origin_company}.
-
-Today's date: {datetime.now().strftime("%Y-%m-%d")}
-
-Context (pain points from {target_company}):
-{pain_context}
-
-Sources (pain points):
-{json.dumps(pain_sources, indent=2)}
-
-Context (value proposition from {origin_company}):
-{value_context}
-
-Sources (value proposition):
-{json.dumps(value_sources, indent=2)}
-
-Your tasks:
-1. Assess how well the value proposition of {origin_company} addresses the main pain points of {target_company}.
-2. Provide:
-   - "score": an integer 0–100 (0 = poor match, 100 = perfect fit)
-   - "arguments_for": list of 2–3 reasons supporting the match
-   - "arguments_against": list of 2–3 caveats or limitations
-   - "summary": a short paragraph summarizing the fit
-3. Include relevant URLs in your reasoning when possible.
-4. Return a **valid JSON** object with these keys.
-"""
-
-    messages = [{"role": "user", "content": prompt_}]
+    messages = MATCH_SCORER.render(
+        target_company=target_company,
+        origin_company=origin_company,
+        today=datetime.now().strftime("%Y-%m-%d"),
+        pain_context=pain_context,
+        pain_sources=json.dumps(pain_sources, indent=2),
+        value_context=value_context,
+        value_sources=json.dumps(value_sources, indent=2),
+    )
 
     try:
         # Call the model
@@ -3,6 +3,7 @@ import json
 import re
 from datetime import datetime
 from cro import utils
+from cro.prompts import META_REASONER
 from tavily import TavilyClient
 
 from openai import OpenAI
@@ -45,71 +46,18 @@ def meta_reasoner_agent(
 
     offer_note = offer_json.get("offer_note", {}) or {}
 
-    prompt = f"""
-You are a senior GTM strategist performing a **meta-analysis** of an opportunity.
-
-Your role:
-- NOT orchestration
-- NOT rewriting any outputs
-- BUT evaluating the overall opportunity from a business perspective
-
-Target company (prospect): {target_company}
-Origin company (solution provider): {origin_company}
-
-Today's date: {datetime.now().strftime("%Y-%m-%d")}
-
----
-
-🩺 Pain Points:
-{json.dumps(pain_points, indent=2)}
-
-💎 Value Proposition:
-{json.dumps(value_arguments, indent=2)}
-
-🎯 Matching Summary (score={match_score}):
-{match_summary}
-
-🧩 Selling Arguments:
-{json.dumps(selling_arguments, indent=2)}
-
-✉️ Outreach Snippet:
-{email_body}
-
-📄 Offer Note Snapshot:
-{json.dumps(offer_note, indent=2)}
-
----
-
-Your tasks:
-1. Provide a **viability_assessment** answering:
-   - "Is this a strong opportunity?"
-   - "Is the match believable?"
-   - "Is there enough evidence to proceed?"
-   - "What are the major risks?"
-
-2. Provide a list of **critical_gaps**:
-   Missing data, missing reasoning, unclear problem areas, or unclear proof points.
-
-3. Provide **strategic_recommendations**:
-   3–6 concrete next steps to strengthen the opportunity:
-   - discovery areas
-   - technical validation
-   - commercial positioning
-   - stakeholder alignment
-
-4. Provide **discovery_questions**:
-   The 5–7 highest-value questions to ask the prospect in the first meeting.
-
-5. Return STRICT JSON with keys:
-{{
-  "viability_assessment": str,
-  "critical_gaps": [str],
-  "strategic_recommendations": [str],
-  "discovery_questions": [str]
-}}
-"""
-
-    messages = [{"role": "user", "content": prompt}]
+    messages = META_REASONER.render(
+        target_company=target_company,
+        origin_company=origin_company,
+        today=datetime.now().strftime("%Y-%m-%d"),
+        pain_points=json.dumps(pain_points, indent=2),
+        value_arguments=json.dumps(value_arguments, indent=2),
+        match_score=match_score,
+        match_summary=match_summary,
+        selling_arguments=json.dumps(selling_arguments, indent=2),
+        email_body=email_body,
+        offer_note=json.dumps(offer_note, indent=2),
+    )
 
     try:
         response = client.chat.completions.create(
@@ -3,6 +3,7 @@ import json
 import re
 from datetime import datetime
 from cro import utils
+from cro.prompts import OFFER_NOTE_BUILDER
 from tavily import TavilyClient
 
 from openai import OpenAI
@@ -29,43 +30,20 @@ def offer_note_builder(
     selling_arguments = sell_json.get("selling_arguments", [])
     outreach_body = email_json.get("outreach_email", {}).get("email", {}).get("body", "")
 
-    prompt = f"""
-You are a solution consultant drafting a one-page Offer Note for {target_company}.
-
-Today's date: {datetime.now().strftime("%Y-%m-%d")}
-
-Pain Points:
-{json.dumps(pain_points, indent=2)}
-
-Value Proposition:
-{json.dumps(value_arguments, indent=2)}
-
-Matching Summary:
-{match_summary}
-
-Selling Arguments:
-{json.dumps(selling_arguments, indent=2)}
-
-Outreach Email Summary:
-{outreach_body}
-
-Your task:
-1. Build a structured **Offer Note** that fits on one page (≈ A4) with keys:
-   {{
-     "context": str,
-     "proposed_value": [str],
-     "solution_outline": {{"approach": str, "timeline": str, "resources": str}},
-     "expected_outcomes": [str],
-     "next_steps": [str]
-   }}
-2. Keep the tone professional, crisp, and outcome-driven.
-3. Return strictly valid JSON.
-"""
+    messages = OFFER_NOTE_BUILDER.render(
+        target_company=target_company,
+        today=datetime.now().strftime("%Y-%m-%d"),
+        pain_points=json.dumps(pain_points, indent=2),
+        value_arguments=json.dumps(value_arguments, indent=2),
+        match_summary=match_summary,
+        selling_arguments=json.dumps(selling_arguments, indent=2),
+        outreach_body=outreach_body,
+    )
 
     try:
         response = client.chat.completions.create(
             model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
+            messages=messages,
         )
 
         content = response.choices[0].message.content.strip()
@@ -3,6 +3,7 @@ import json
 import re
 from datetime import datetime
 from cro import utils
+from cro.prompts import OUTREACH_EMAIL_BUILDER
 from tavily import TavilyClient
 
 from openai import OpenAI
@@ -27,42 +28,19 @@ def outreach_email_builder(
     match_summary = match_json.get("matching_result", {}).get("summary", "")
     selling_arguments = sell_json.get("selling_arguments", [])
 
-    prompt = f"""
-You are an enterprise sales assistant preparing an outreach email.
-
-Target company: {target_company}
-Today's date: {datetime.now().strftime("%Y-%m-%d")}
-
-Pain Points:
-{json.dumps(pain_points, indent=2)}
-
-Value Proposition:
-{json.dumps(value_arguments, indent=2)}
-
-Matching Summary:
-{match_summary}
-
-Selling Arguments:
-{json.dumps(selling_arguments, indent=2)}
-
-Your task:
-1. Identify the most relevant target contact (role/title, department, reason to reach out).
-2. Write a concise, professional outreach email (max 150 words) that includes:
-   - Subject line
-   - Body referencing the pain points and proposed value
-   - Clear, respectful call to action
-3. Return **valid JSON** with keys:
-{{
-  "target_contact": {{"role": str, "department": str, "reason": str}},
-  "email": {{"subject": str, "body": str}},
-  "tone": str
-}}
-"""
+    messages = OUTREACH_EMAIL_BUILDER.render(
+        target_company=target_company,
+        today=datetime.now().strftime("%Y-%m-%d"),
+        pain_points=json.dumps(pain_points, indent=2),
+        value_arguments=json.dumps(value_arguments, indent=2),
+        match_summary=match_summary,
+        selling_arguments=json.dumps(selling_arguments, indent=2),
+    )
 
     try:
         response = client.chat.completions.create(
             model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
+            messages=messages,
         )
 
         content = response.choices[0].message.content.strip()
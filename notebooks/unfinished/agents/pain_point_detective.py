@@ -3,15 +3,32 @@ import json
 import re
 from datetime import datetime
 from cro import utils
+from cro.digests import digest_context
+from cro.fingerprints import evidence_fingerprint, source_hashes
+from cro.prompts import PAIN_POINT_DETECTIVE
 from tavily import TavilyClient
 
 from openai import OpenAI
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+def pain_point_search(target_company: str, max_results: int = 5) -> dict:
+    """
+    The retrieval step of pain_point_detective alone (Tavily search, no LLM call).
+    """
+    tavily = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+    query = (
+        f"{target_company} pain points OR challenges OR customer complaints "
+        f"site:reddit.com OR site:glassdoor.com OR site:medium.com OR site:trustpilot.com"
+    )
+    # Whole pages, so cro.digests can digest them (prompts get the digest or the snippet)
+    return tavily.search(query=query, max_results=max_results, include_raw_content=True)
+
+
 def pain_point_detective(
     target_company: str,
     return_messages: bool = True,
-    max_results: int = 5
+    max_results: int = 5,
+    search: dict | None = None,
 ) -> dict:
     """
     Uses a retrieval-augmented LLM to find and summarize the top pain points of a company.
@@ -19,40 +36,23 @@ def pain_point_detective(
 
     utils.print_html("Pain Point Detective", "🕵️‍♂️")
 
-    tavily = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
-
-    # 🔍 1. Retrieve live context
-    query = (
-        f"{target_company} pain points OR challenges OR customer complaints "
-        f"site:reddit.com OR site:glassdoor.com OR site:medium.com OR site:trustpilot.com"
-    )
-
-    search = tavily.search(query=query, max_results=max_results)
+    # 🔍 1. Retrieve live context (unless a refresh run already did)
+    if search is None:
+        search = pain_point_search(target_company, max_results=max_results)
+    hashes = source_hashes(search.get("results", []) if search else [])
 
     if not search or not search.get("results"):
         context = "No relevant online sources found."
     else:
-        context = "\n\n".join(
-            [f"- {r['title']}\n{r['content']}" for r in search["results"]]
-        )
+        # Long sources are replaced by their cached digest (summary + claims)
+        context = digest_context(search["results"])
 
     # 🧠 2. Prompt with retrieved context
-    prompt_ = f"""
-You are a company detective tasked with identifying the main pain points of "{target_company}".
-
-Use the following retrieved context from real web sources:
-
----
-{context}
----
-
-Your goal:
-1. Summarize the top 2–3 **pain points**, focusing on customer, technical, or organizational challenges.
-2. Return the result as a JSON object with keys "pain_points" (list) and "summary" (string).
-3. Today's date is {datetime.now().strftime("%Y-%m-%d")}.
-"""
-
-    messages = [{"role": "user", "content": prompt_}]
+    messages = PAIN_POINT_DETECTIVE.render(
+        target_company=target_company,
+        today=datetime.now().strftime("%Y-%m-%d"),
+        context=context,
+    )
 
     try:
         response = client.chat.completions.create(
@@ -76,6 +76,8 @@ Your goal:
             "company": target_company,
             "pain_points": pain_points_payload,
             "retrieval_sources": [r["url"] for r in search.get("results", [])],
+            "source_hashes": hashes,
+            "evidence_fingerprint": evidence_fingerprint(hashes),
         }
 
         if return_messages:
@@ -89,4 +91,6 @@ Your goal:
             "pain_points": None,
             "error": str(e),
             "retrieval_sources": [r["url"] for r in search.get("results", [])],
+            "source_hashes": hashes,
+            "evidence_fingerprint": evidence_fingerprint(hashes),
         }
@@ -3,6 +3,7 @@ import json
 import re
 from datetime import datetime
 from cro import utils
+from cro.prompts import SELLING_ARGUMENTATION_BUILDER
 from tavily import TavilyClient
 
 from openai import OpenAI
@@ -28,36 +29,17 @@ def selling_argumentation_builder(
     match_summary = match_json.get("matching_result", {}).get("summary", "")
 
     # ---- Build prompt ----
-    prompt = f"""
-You are a B2B sales strategist tasked with building persuasive, evidence-based selling arguments.
-
-Target Company: {target_company}
-Date: {datetime.now().strftime("%Y-%m-%d")}
-
-Pain Points:
-{json.dumps(pain_points, indent=2)}
-
-Value Proposition:
-{json.dumps(value_args, indent=2)}
-
-Matching Summary:
-{match_summary}
+    messages = SELLING_ARGUMENTATION_BUILDER.render(
+        target_company=target_company,
+        today=datetime.now().strftime("%Y-%m-%d"),
+        pain_points=json.dumps(pain_points, indent=2),
+        value_arguments=json.dumps(value_args, indent=2),
+        match_summary=match_summary,
+    )
 
-Your task:
-1. For each major pain point, create a clear selling argument showing how the value proposition solves it.
-2. Include (if possible) one supporting proof point per argument (case study, technical rationale, measurable outcome).
-3. Provide a concise 'sales_narrative' paragraph summarizing the commercial storyline.
-4. Return **valid JSON** with the keys:
-   {{
-     "selling_arguments": [
-         {{ "pain_point": str, "argument": str, "proof": str }}
-     ],
-     "sales_narrative": str
-   }}
-"""
     response = client.chat.completions.create(
         model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
+        messages=messages,
     )
 
     content = response.choices[0].message.content.strip()
@@ -3,6 +3,7 @@ import json
 import re
 from datetime import datetime
 from cro import utils
+from cro.prompts import SUMMARIZER_AGENT
 from tavily import TavilyClient
 
 from openai import OpenAI
@@ -40,49 +41,18 @@ def summarizer_agent(
     outreach_body = outreach_email.get("body", "")
     target_contact = outreach.get("target_contact", {}) or {}
 
-    prompt = f"""
-You are a senior sales strategist summarizing an opportunity between two companies.
-
-Target company (prospect): {target_company}
-Origin company (solution provider): {origin_company}
-Today's date: {datetime.now().strftime("%Y-%m-%d")}
-
-Matching result:
-Score: {score}
-Summary:
-{match_summary}
-
-Selling arguments:
-{json.dumps(selling_arguments, indent=2)}
-
-Sales narrative:
-{sales_narrative}
-
-Outreach plan:
-Target contact:
-{json.dumps(target_contact, indent=2)}
-
-Email subject: {outreach_subject}
-Email body:
-{outreach_body}
-
-Your task:
-1. Write a concise **executive_summary** (max 150 words) explaining:
-   - Why this opportunity matters for {target_company}
-   - How {origin_company} creates value
-   - How strong the fit is overall.
-2. Propose 3–5 **recommended_next_steps** for the sales team (meetings, discovery, PoC, stakeholder mapping, etc.).
-3. Optionally, refine the **sales_narrative** into a sharper, board-level storyline.
-4. Return a STRICT JSON object with the keys:
-{{
-  "executive_summary": str,
-  "fit_score": int,          # reuse or refine the score 0–100
-  "refined_sales_narrative": str,
-  "recommended_next_steps": [str]
-}}
-"""
-
-    messages = [{"role": "user", "content": prompt}]
+    messages = SUMMARIZER_AGENT.render(
+        target_company=target_company,
+        origin_company=origin_company,
+        today=datetime.now().strftime("%Y-%m-%d"),
+        score=score,
+        match_summary=match_summary,
+        selling_arguments=json.dumps(selling_arguments, indent=2),
+        sales_narrative=sales_narrative,
+        target_contact=json.dumps(target_contact, indent=2),
+        outreach_subject=outreach_subject,
+        outreach_body=outreach_body,
+    )
 
     try:
         response = client.chat.completions.create(
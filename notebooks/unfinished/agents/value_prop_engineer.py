@@ -3,65 +3,60 @@ import json
 import re
 from datetime import datetime
 from cro import utils
+from cro.digests import digest_context
+from cro.fingerprints import evidence_fingerprint, source_hashes
+from cro.prompts import VALUE_PROP_ENGINEER
 from tavily import TavilyClient
 
 from openai import OpenAI
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+def value_prop_search(origin_company: str, max_results: int = 5) -> dict:
+    """
+    The retrieval step of value_prop_engineer alone (Tavily search, no LLM call).
+    """
+    tavily = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+    query = (
+        f"{origin_company} value proposition OR product offering OR competitive advantage "
+        f"site:{origin_company} OR site:linkedin.com OR site:medium.com OR site:techcrunch.com"
+    )
+    # Whole pages, so cro.digests can digest them (prompts get the digest or the snippet)
+    return tavily.search(query=query, max_results=max_results, include_raw_content=True)
+
+
 def value_prop_engineer(
     origin_company: str,
     return_messages: bool = True,
-    max_results: int = 5
+    max_results: int = 5,
+    search: dict | None = None,
 ) -> dict:
     """
     Uses a retrieval-augmented LLM to analyze and summarize the value proposition
     of a given origin_company. Returns a dict with keys:
         - origin_company
         - value_proposition (JSON or raw text)
-        - retrieval_sources
+        - retrieval_sources, source_hashes, evidence_fingerprint
     """
 
     utils.print_html("Value Proposition Engineer", "🧱")
 
-    # Initialize clients
-    tavily = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
-
-    # 🔍 1. Retrieve live context
-    query = (
-        f"{origin_company} value proposition OR product offering OR competitive advantage "
-        f"site:{origin_company} OR site:linkedin.com OR site:medium.com OR site:techcrunch.com"
-    )
-
-    search = tavily.search(query=query, max_results=max_results)
+    # 🔍 1. Retrieve live context (unless a refresh run already did)
+    if search is None:
+        search = value_prop_search(origin_company, max_results=max_results)
+    hashes = source_hashes(search.get("results", []) if search else [])
 
     if not search or not search.get("results"):
         context = "No relevant origin_company information found online."
     else:
-        context = "\n\n".join(
-            [f"- {r['title']}\n{r['content']}" for r in search["results"]]
-        )
+        # Long sources are replaced by their cached digest (summary + claims)
+        context = digest_context(search["results"])
 
     # 🧠 2. Build the LLM prompt
-    prompt_ = f"""
-You are a value proposition analyst for the company "{origin_company}".
-
-Use the following retrieved context from real online sources:
-
----
-{context}
----
-
-Your goal:
-1. Summarize the company's **core value proposition**, focusing on product, data, architecture, software, hardware, and commercial differentiators.
-2. Return the result as a JSON object with keys:
-   {{
-     "value_arguments": [str],
-     "summary": str
-   }}
-3. Today's date is {datetime.now().strftime("%Y-%m-%d")}.
-"""
-
-    messages = [{"role": "user", "content": prompt_}]
+    messages = VALUE_PROP_ENGINEER.render(
+        origin_company=origin_company,
+        today=datetime.now().strftime("%Y-%m-%d"),
+        context=context,
+    )
 
     try:
         response = client.chat.completions.create(
@@ -85,6 +80,8 @@ Your goal:
             "origin_company": origin_company,
             "value_proposition": value_prop_payload,
             "retrieval_sources": [r["url"] for r in search.get("results", [])],
+            "source_hashes": hashes,
+            "evidence_fingerprint": evidence_fingerprint(hashes),
         }
 
         if return_messages:
@@ -98,4 +95,6 @@ Your goal:
             "value_proposition": None,
             "error": str(e),
             "retrieval_sources": [r["url"] for r in search.get("results", [])],
+            "source_hashes": hashes,
+            "evidence_fingerprint": evidence_fingerprint(hashes),
         }
@@ -0,0 +1,236 @@
+"""
+Token and cost budgets for CRO runs
+
+A Budget accumulates the tokens and estimated cost (cro.metrics.PRICES) of
+every chat completion made inside its scope. Scopes nest, so a batch budget
+and a per-pair budget can be active together; every call is charged to all
+of them.
+
+- soft limit: the run degrades instead of failing
+    * models are swapped for cheaper ones (CHEAPER_MODELS)
+    * optional agents (OPTIONAL_AGENTS) are skipped by the orchestrator
+    * Tavily searches are capped at DEGRADED_MAX_RESULTS results
+- hard limit: the next LLM call, search or orchestrator step raises
+  BudgetExceeded; the orchestrators stop cleanly and keep what was done so
+  a rerun with a fresh budget resumes from there
+
+Usage:
+
+    from cro.budget import Budget
+    CRO_batch_orchestrator(pairs, budget=Budget("nightly", soft_usd=20, hard_usd=25),
+                           pair_budget={"soft_usd": 0.05, "hard_usd": 0.10})
+
+install_budgets() wraps the clients of the imported `cro.*` modules once;
+without an active budget the wrappers behave exactly like the originals.
+"""
+
+import contextvars
+import functools
+import sys
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from cro.metrics import estimate_cost, usage_tokens
+from cro.wrapping import has_layer, has_marker, install_lock
+
+CHEAPER_MODELS = {
+    "gpt-4.1": "gpt-4.1-mini",
+    "gpt-4o": "gpt-4o-mini",
+}
+OPTIONAL_AGENTS = ("meta_reasoner", "offer_note_builder")
+DEGRADED_MAX_RESULTS = 2
+
+_active = contextvars.ContextVar("cro_budgets", default=())
+
+
+class BudgetExceeded(BaseException):
+    """
+    A hard budget limit is reached.
+
+    Derives from BaseException (like DeadlineExceeded), so the agents'
+    `except Exception` blocks let it through to the orchestrator.
+    """
+
+
+class Budget:
+    """
+    Spend accounting with soft and hard limits (any limit may be None).
+
+    Args:
+        name: label used in reports
+        soft_usd / hard_usd: estimated cost limits
+        soft_tokens / hard_tokens: total token limits (prompt + completion)
+    """
+
+    def __init__(self, name: str = "run", soft_usd: float | None = None, hard_usd: float | None = None,
+                 soft_tokens: int | None = None, hard_tokens: int | None = None):
+        self.name = name
+        self.soft_usd = soft_usd
+        self.hard_usd = hard_usd
+        self.soft_tokens = soft_tokens
+        self.hard_tokens = hard_tokens
+        self.spent_usd = 0.0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.calls = 0
+        self.downgrades = 0
+        self.by_model = {}
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> int:
+        return self.tokens_in + self.tokens_out
+
+    @staticmethod
+    def _over(value: float, limit: float | None) -> bool:
+        return limit is not None and value >= limit
+
+    @property
+    def degraded(self) -> bool:
+        return (self._over(self.spent_usd, self.soft_usd) or self._over(self.tokens, self.soft_tokens)
+                or self.exhausted)
+
+    @property
+    def exhausted(self) -> bool:
+        return self._over(self.spent_usd, self.hard_usd) or self._over(self.tokens, self.hard_tokens)
+
+    def charge(self, model: str, usage):
+        prompt, cached, completion = usage_tokens(usage)
+        cost = estimate_cost(model, prompt, cached, completion)
+        with self._lock:
+            self.calls += 1
+            self.tokens_in += prompt + cached
+            self.tokens_out += completion
+            self.spent_usd += cost
+            entry = self.by_model.setdefault(model, {"calls": 0, "tokens_in": 0, "tokens_out": 0, "usd": 0.0})
+            entry["calls"] += 1
+            entry["tokens_in"] += prompt + cached
+            entry["tokens_out"] += completion
+            entry["usd"] += cost
+
+    def check(self, what: str = "call"):
+        if self.exhausted:
+            raise BudgetExceeded(f"Budget '{self.name}' exhausted before {what} "
+                                 f"(${self.spent_usd:.4f}, {self.tokens} tokens)")
+
+    def report(self) -> dict:
+        return {
+            "name": self.name,
+            "spent_usd": round(self.spent_usd, 6),
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "calls": self.calls,
+            "downgrades": self.downgrades,
+            "soft_usd": self.soft_usd,
+            "hard_usd": self.hard_usd,
+            "soft_tokens": self.soft_tokens,
+            "hard_tokens": self.hard_tokens,
+            "degraded": self.degraded,
+            "exhausted": self.exhausted,
+            "by_model": {m: {**v, "usd": round(v["usd"], 6)} for m, v in self.by_model.items()},
+        }
+
+
+@contextmanager
+def budget_scope(budget: Budget):
+    """
+    Charge every call inside the block to `budget` (on top of outer budgets).
+    """
+    token = _active.set(_active.get() + (budget,))
+    try:
+        yield budget
+    finally:
+        _active.reset(token)
+
+
+def active() -> tuple:
+    return _active.get()
+
+
+def degraded() -> bool:
+    return any(b.degraded for b in _active.get())
+
+
+def check(what: str = "call"):
+    for budget in _active.get():
+        budget.check(what)
+
+
+# ----------------------------------------------------------------------
+# Client wrappers
+# ----------------------------------------------------------------------
+
+class BudgetOpenAI:
+    """
+    Wraps an OpenAI client: refuses calls over a hard limit, uses cheaper
+    models over a soft limit, and charges the usage to the active budgets.
+    """
+
+    def __init__(self, client):
+        self.wrapped = client
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        budgets = _active.get()
+        if not budgets:
+            return self.wrapped.chat.completions.create(**kwargs)
+
+        check("LLM call")
+        model = kwargs.get("model", "")
+        if degraded() and model in CHEAPER_MODELS:
+            kwargs["model"] = CHEAPER_MODELS[model]
+            for budget in budgets:
+                budget.downgrades += 1
+
+        response = self.wrapped.chat.completions.create(**kwargs)
+        for budget in budgets:
+            budget.charge(getattr(response, "model", None) or kwargs.get("model", ""),
+                          getattr(response, "usage", None))
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+
+class BudgetTavilyClient:
+    """
+    Wraps a TavilyClient: fewer results over a soft limit, none over a hard one.
+    """
+
+    def __init__(self, client):
+        self.wrapped = client
+
+    def search(self, query: str, **kwargs):
+        if _active.get():
+            check("search")
+            if degraded():
+                kwargs["max_results"] = min(kwargs.get("max_results", 5), DEGRADED_MAX_RESULTS)
+        return self.wrapped.search(query=query, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+
+def install_budgets(package: str = "cro"):
+    """
+    Wrap the OpenAI clients and TavilyClient of the imported `package` modules.
+    Idempotent (an existing layer anywhere in the wrapper stack is kept);
+    call it once, after importing the modules you run.
+    """
+    with install_lock:
+        for name, module in list(sys.modules.items()):
+            if module is None or not (name == package or name.startswith(package + ".")):
+                continue
+
+            client = getattr(module, "client", None)
+            if client is not None and hasattr(client, "chat") and not has_layer(client, BudgetOpenAI):
+                module.client = BudgetOpenAI(client)
+
+            tavily_cls = getattr(module, "TavilyClient", None)
+            if tavily_cls is not None and not has_marker(tavily_cls, "__budget__"):
+                factory = functools.wraps(tavily_cls, updated=())(
+                    lambda *args, _cls=tavily_cls, **kwargs: BudgetTavilyClient(_cls(*args, **kwargs))
+                )
+                factory.__budget__ = True
+                module.TavilyClient = factory
@@ -0,0 +1,287 @@
+"""
+Record/replay cassettes for LLM and search traffic
+
+Every OpenAI chat completion, Tavily search, arXiv and Wikipedia lookup is
+stored as a request/response pair in one SQLite file (zlib-compressed JSON,
+indexed by a hash of the request). Replaying a cassette needs no network and
+no API keys, so a whole CRO_hierarchical_orchestrator run can be repeated
+in milliseconds, with identical results, to profile our own code.
+
+Keys ignore volatile request fields (see stable_request): the timeout set
+from the remaining deadline and the "Today's date" line of the prompts.
+
+Modes:
+- "record": always call live and store (overwrites)
+- "replay": only use stored answers; a miss raises CassetteMiss
+- "auto":   replay when stored, otherwise call live and store
+
+Usage:
+
+    from cro import cassette
+    with cassette.use_cassette("cassettes/swissre.sqlite", mode="auto"):
+        CRO_hierarchical_orchestrator("swissre.com", "outsystems.com")
+
+use_cassette patches the already imported `cro.*` modules (agent clients,
+the LLM decider, TavilyClient and the research tools), so import the
+modules you run before entering it. Other callables, such as the fetchers
+of the research notebook, can be wrapped with `CassetteStore.wrap`.
+"""
+
+import functools
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from cro import metrics
+from cro.wrapping import has_layer
+
+MODES = ("record", "replay", "auto")
+
+
+class CassetteMiss(KeyError):
+    """
+    Replay mode found no stored response for a request.
+    """
+
+
+def _namespace(value):
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_namespace(v) for v in value]
+    return value
+
+
+# Request fields that change between otherwise identical calls: the
+# per-request timeout (the remaining deadline) and the date rendered into
+# the agent prompts
+VOLATILE_KEYS = ("timeout",)
+_PROMPT_DATE = re.compile(r"^((?:Today's )?[Dd]ate: )\d{4}-\d{2}-\d{2}", re.MULTILINE)
+
+
+def stable_request(request):
+    """
+    `request` without its volatile fields, for keying: replay then matches
+    across days and across runs with different deadlines.
+    """
+    if isinstance(request, dict):
+        return {k: stable_request(v) for k, v in request.items() if k not in VOLATILE_KEYS}
+    if isinstance(request, (list, tuple)):
+        return [stable_request(v) for v in request]
+    if isinstance(request, str):
+        return _PROMPT_DATE.sub(r"\1<today>", request)
+    return request
+
+
+def request_key(kind: str, request) -> str:
+    canonical = json.dumps([kind, stable_request(request)], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+# ----------------------------------------------------------------------
+# Store
+# ----------------------------------------------------------------------
+
+class CassetteStore:
+    """
+    One SQLite file of recorded interactions.
+
+    Args:
+        path: SQLite file (created if missing)
+        mode: "record", "replay" or "auto"
+    """
+
+    def __init__(self, path: str, mode: str = "auto"):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS interactions (
+                key      TEXT PRIMARY KEY,
+                kind     TEXT NOT NULL,
+                request  BLOB NOT NULL,
+                response BLOB NOT NULL,
+                created  REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS interactions_kind ON interactions(kind);
+        """)
+
+    # ------------------------------------------------------------------
+    def get(self, kind: str, request):
+        """
+        Stored response for a request, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM interactions WHERE key = ?", (request_key(kind, request),)
+            ).fetchone()
+        return None if row is None else json.loads(zlib.decompress(row[0]))
+
+    def put(self, kind: str, request, response):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO interactions VALUES (?, ?, ?, ?, ?)",
+                (
+                    request_key(kind, request),
+                    kind,
+                    zlib.compress(json.dumps(request, ensure_ascii=False, default=str).encode("utf-8")),
+                    zlib.compress(json.dumps(response, ensure_ascii=False, default=str).encode("utf-8")),
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def call(self, kind: str, request, live):
+        """
+        Return the recorded response for `request`, or call `live()` and record it
+        (depending on the mode). `live` must return a JSON-serializable value.
+        """
+        if self.mode != "record":
+            stored = self.get(kind, request)
+            if stored is not None:
+                self.hits += 1
+                metrics.record_cache("cassette", hit=True)
+                return stored
+            if self.mode == "replay":
+                raise CassetteMiss(f"No recorded {kind} response for {json.dumps(request, default=str)[:200]}")
+
+        self.misses += 1
+        metrics.record_cache("cassette", hit=False)
+        response = live()
+        self.put(kind, request, response)
+        return response
+
+    def wrap(self, fn, kind: str | None = None):
+        """
+        Record/replay a function whose arguments and result are JSON-serializable.
+        """
+        kind = kind or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return self.call(kind, {"args": list(args), "kwargs": kwargs}, lambda: fn(*args, **kwargs))
+
+        wrapper.__wrapped_by_cassette__ = True
+        return wrapper
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_kind = dict(self._conn.execute("SELECT kind, COUNT(*) FROM interactions GROUP BY kind"))
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses, "stored": by_kind}
+
+    def close(self):
+        self._conn.close()
+
+
+# ----------------------------------------------------------------------
+# Client wrappers
+# ----------------------------------------------------------------------
+
+class CassetteOpenAI:
+    """
+    Stands in for an OpenAI client (chat.completions.create only).
+    The live client is only used when a call has to be recorded.
+    """
+
+    def __init__(self, store: CassetteStore, live_client=None):
+        self.store = store
+        self.wrapped = live_client   # .wrapped, like the other client layers (cro.wrapping)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        def live():
+            return self.wrapped.chat.completions.create(**kwargs).model_dump(mode="json")
+
+        return _namespace(self.store.call("openai.chat", kwargs, live))
+
+
+class CassetteTavilyClient:
+    """
+    Stands in for TavilyClient (search only). The real client is only
+    created when a search has to be recorded, so replay needs no API key.
+    """
+
+    def __init__(self, store: CassetteStore, live_factory, *args, **kwargs):
+        self.store = store
+        self._live_factory = functools.partial(live_factory, *args, **kwargs)
+        self._live = None
+
+    def search(self, query: str, **kwargs):
+        def live():
+            if self._live is None:
+                self._live = self._live_factory()
+            return self._live.search(query=query, **kwargs)
+
+        return self.store.call("tavily.search", {"query": query, **kwargs}, live)
+
+
+# ----------------------------------------------------------------------
+# Patching
+# ----------------------------------------------------------------------
+
+WRAPPED_TOOLS = ("arxiv_search_tool", "wikipedia_search_tool")
+
+
+@contextmanager
+def use_cassette(path: str, mode: str = "auto", package: str = "cro"):
+    """
+    Record/replay all LLM and search traffic of the imported `package` modules.
+
+    Yields:
+        CassetteStore (see .stats() for hits and misses)
+    """
+    store = CassetteStore(path, mode)
+    patched = []   # (module, attribute, original)
+
+    def patch(module, name, value):
+        patched.append((module, name, getattr(module, name)))
+        setattr(module, name, value)
+
+    modules = [m for name, m in list(sys.modules.items())
+               if m is not None and (name == package or name.startswith(package + "."))]
+
+    for module in modules:
+        client = getattr(module, "client", None)
+        if client is not None and hasattr(client, "chat") and not has_layer(client, CassetteOpenAI):
+            patch(module, "client", CassetteOpenAI(store, client))
+
+        tavily_cls = getattr(module, "TavilyClient", None)
+        if callable(tavily_cls):
+            patch(module, "TavilyClient", functools.partial(CassetteTavilyClient, store, tavily_cls))
+
+        for tool in WRAPPED_TOOLS:
+            fn = getattr(module, tool, None)
+            if callable(fn) and not getattr(fn, "__wrapped_by_cassette__", False):
+                patch(module, tool, store.wrap(fn, tool))
+
+        mapping = getattr(module, "tool_mapping", None)
+        if isinstance(mapping, dict):
+            for tool in WRAPPED_TOOLS:
+                fn = mapping.get(tool)
+                if callable(fn) and not getattr(fn, "__wrapped_by_cassette__", False):
+                    patched.append((mapping, tool, fn))
+                    mapping[tool] = store.wrap(fn, tool)
+
+    try:
+        yield store
+    finally:
+        for target, name, original in reversed(patched):
+            if isinstance(target, dict):
+                target[name] = original
+            else:
+                setattr(target, name, original)
+        print(f"📼 Cassette {path}: {store.stats()}")
+        store.close()
@@ -0,0 +1,188 @@
+"""
+Per-run deadlines for the CRO pipeline
+
+A Deadline is set once per run (e.g. by CRO_hierarchical_orchestrator) and
+is visible to everything called inside it through a context variable:
+
+- OpenAI chat completions get the remaining budget as request timeout
+- Tavily searches get the remaining budget as search timeout
+- arXiv / Wikipedia requests in research_tools use `timeout_for(...)`
+
+When the budget is used up, calls raise DeadlineExceeded instead of
+starting (or instead of returning a timeout error), and the orchestrator
+turns it into an explicitly degraded result.
+
+install_deadlines() wraps the clients of the imported `cro.*` modules once;
+without an active deadline the wrappers behave exactly like the originals.
+"""
+
+import contextvars
+import functools
+import sys
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from cro.wrapping import has_layer, has_marker, install_lock
+
+_current = contextvars.ContextVar("cro_deadline", default=None)
+
+
+class DeadlineExceeded(BaseException):
+    """
+    The run's time budget is used up.
+
+    Like asyncio.CancelledError this derives from BaseException, so the
+    agents' `except Exception` blocks do not turn a cancellation into an
+    ordinary error output.
+    """
+
+
+class Deadline:
+    """
+    Absolute deadline on the monotonic clock.
+
+    Args:
+        seconds: budget from now (None = no deadline)
+    """
+
+    def __init__(self, seconds: float | None):
+        self.budget = seconds
+        self.started = time.monotonic()
+        self.expires_at = None if seconds is None else self.started + seconds
+
+    def remaining(self) -> float | None:
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def check(self, what: str = "call"):
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline of {self.budget:.1f}s exceeded before {what}")
+
+    def report(self) -> dict:
+        return {
+            "budget_s": self.budget,
+            "elapsed_s": round(self.elapsed(), 3),
+            "remaining_s": None if self.expires_at is None else round(self.remaining(), 3),
+        }
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline):
+    """
+    Make `deadline` the current deadline inside the block.
+    """
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def current() -> Deadline | None:
+    return _current.get()
+
+
+def timeout_for(default: float | None) -> float | None:
+    """
+    Timeout for one call: the remaining budget, capped by the call's own default.
+    Raises DeadlineExceeded when nothing is left.
+    """
+    deadline = _current.get()
+    if deadline is None or deadline.expires_at is None:
+        return default
+    deadline.check()
+    remaining = deadline.remaining()
+    return remaining if default is None else min(default, remaining)
+
+
+# ----------------------------------------------------------------------
+# Client wrappers
+# ----------------------------------------------------------------------
+
+class DeadlineOpenAI:
+    """
+    Wraps an OpenAI client: chat.completions.create gets the remaining
+    budget as per-request timeout, passed down the whole wrapper chain.
+    """
+
+    def __init__(self, client):
+        self.wrapped = client
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        deadline = _current.get()
+        if deadline is None or deadline.expires_at is None:
+            return self.wrapped.chat.completions.create(**kwargs)
+
+        deadline.check("LLM call")
+        # A per-request option, not a rebuilt client: with_options() would be
+        # resolved through the __getattr__ of the inner wrappers (budget,
+        # metrics, hedging) and call the raw OpenAI client underneath them
+        kwargs["timeout"] = timeout_for(kwargs.get("timeout"))
+        try:
+            return self.wrapped.chat.completions.create(**kwargs)
+        except Exception as e:
+            if deadline.expired:
+                raise DeadlineExceeded(f"LLM call cancelled by deadline: {e}") from e
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+
+class DeadlineTavilyClient:
+    """
+    Wraps a TavilyClient: search gets the remaining budget as timeout.
+    """
+
+    def __init__(self, client):
+        self.wrapped = client
+
+    def search(self, query: str, **kwargs):
+        deadline = _current.get()
+        if deadline is None or deadline.expires_at is None:
+            return self.wrapped.search(query=query, **kwargs)
+
+        kwargs["timeout"] = max(1, int(timeout_for(kwargs.get("timeout", 60))))
+        try:
+            return self.wrapped.search(query=query, **kwargs)
+        except Exception as e:
+            if deadline.expired:
+                raise DeadlineExceeded(f"Search cancelled by deadline: {e}") from e
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+
+def install_deadlines(package: str = "cro"):
+    """
+    Wrap the OpenAI clients and TavilyClient of the imported `package` modules.
+    Idempotent (an existing layer anywhere in the wrapper stack is kept);
+    call it once, after importing the modules you run.
+    """
+    with install_lock:
+        for name, module in list(sys.modules.items()):
+            if module is None or not (name == package or name.startswith(package + ".")):
+                continue
+
+            client = getattr(module, "client", None)
+            if client is not None and hasattr(client, "chat") and not has_layer(client, DeadlineOpenAI):
+                module.client = DeadlineOpenAI(client)
+
+            tavily_cls = getattr(module, "TavilyClient", None)
+            if tavily_cls is not None and not has_marker(tavily_cls, "__deadline__"):
+                factory = functools.wraps(tavily_cls, updated=())(
+                    lambda *args, _cls=tavily_cls, **kwargs: DeadlineTavilyClient(_cls(*args, **kwargs))
+                )
+                factory.__deadline__ = True
+                module.TavilyClient = factory
@@ -0,0 +1,258 @@
+"""
+Per-source digest cache for retrieved documents
+
+The same Glassdoor, Reddit and Medium pages come back for many companies
+and queries. Instead of pasting them into every prompt, each long document
+is condensed once into a query-independent digest (summary + extracted
+claims) and the digest is used from then on.
+
+A document is its `raw_content` (the whole page, Tavily
+include_raw_content=True) or else its `content`. Tavily `content` is a
+snippet of a few hundred characters, below `min_chars`, so without raw
+pages nothing is digested: the retrieval agents therefore request raw
+content. Documents shorter than `min_chars` are used as they are. If
+digesting fails, the snippet (`content`) is used and nothing is cached.
+
+Digests are keyed by URL, document hash (cro.fingerprints, so a changed
+page gets a new digest) and the DOCUMENT_DIGEST prompt key (a changed
+prompt re-digests). They are stored in a local SQLite file
+(CRO_DIGEST_CACHE or ~/.cro/digests.sqlite) and shared across runs and
+projects (research_assistant/document_digests.py uses the same cache).
+
+    from cro.digests import digest_context
+    context = digest_context(search["results"])   # "- title\\ndigest" per source
+
+The module-level `client` is an ordinary agent client, so cassettes,
+deadlines, budgets and metrics (install_*) apply to digest calls as well;
+`summarize` replaces it with another model call (e.g. a LangChain model).
+"""
+
+import contextvars
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from cro import metrics
+from cro.fingerprints import source_hashes
+from cro.prompts import DOCUMENT_DIGEST
+
+from openai import OpenAI
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+DEFAULT_PATH = os.environ.get("CRO_DIGEST_CACHE", os.path.join(os.path.expanduser("~"), ".cro", "digests.sqlite"))
+
+
+def render_digest(digest: dict) -> str:
+    """
+    Prompt text of a digest: summary, then one line per claim.
+    """
+    claims = "\n".join(f"  • {claim}" for claim in digest.get("claims", []))
+    return f"{digest.get('summary', '')}\n{claims}".strip()
+
+
+def _parse(content: str) -> dict:
+    clean = re.sub(r"^```[a-zA-Z]*\n?", "", content.strip())
+    clean = re.sub(r"```$", "", clean).strip()
+    parsed = json.loads(clean)
+    return {
+        "summary": str(parsed.get("summary", "")).strip(),
+        "claims": [str(c).strip() for c in parsed.get("claims", []) if str(c).strip()],
+    }
+
+
+def document_text(result: dict) -> str:
+    """
+    The text that is digested: the whole page if retrieved, else the snippet.
+    """
+    return result.get("raw_content") or result.get("content") or ""
+
+
+class DigestCache:
+    """
+    Persistent (url, content hash, prompt key) -> digest cache.
+
+    Args:
+        path: SQLite file (":memory:" for a throwaway cache)
+        model: model used to digest new documents
+        min_chars: documents shorter than this are not digested
+        max_doc_chars: characters of a document sent to the model
+        max_concurrency: parallel digest calls for the new documents of one search
+        summarize: callable(messages) -> str, the model call for one digest
+                   (default: the module `client` with `model`)
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, model: str = "gpt-4o-mini", min_chars: int = 1200,
+                 max_doc_chars: int = 12000, max_concurrency: int = 4,
+                 summarize: Callable[[list], str] | None = None):
+        self.path = path
+        self.model = model
+        self.summarize = summarize
+        self.min_chars = min_chars
+        self.max_doc_chars = max_doc_chars
+        self.max_concurrency = max_concurrency
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._inflight = {}   # key -> Lock, so concurrent agents digest a page once
+        self.hits = 0
+        self.misses = 0
+        self.saved_chars = 0
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS digests (
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                prompt_key TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                raw_chars INTEGER NOT NULL,
+                created REAL NOT NULL,
+                uses INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (url, content_hash, prompt_key)
+            );
+        """)
+
+    # ------------------------------------------------------------------
+    def key(self, result: dict) -> tuple:
+        url = result.get("url", "")
+        document = {"url": url, "title": result.get("title", ""), "content": document_text(result)}
+        return url, source_hashes([document])[url], DOCUMENT_DIGEST.key
+
+    def _lookup(self, key: tuple) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM digests WHERE url = ? AND content_hash = ? AND prompt_key = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE digests SET uses = uses + 1 WHERE url = ? AND content_hash = ? AND prompt_key = ?", key
+            )
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def _store(self, key: tuple, digest: dict, raw_chars: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, 1)",
+                (*key, json.dumps(digest, ensure_ascii=False), raw_chars, time.time()),
+            )
+            self._conn.commit()
+
+    def _summarize(self, result: dict) -> dict:
+        messages = DOCUMENT_DIGEST.render(
+            url=result.get("url", ""),
+            title=result.get("title", ""),
+            content=document_text(result)[:self.max_doc_chars],
+        )
+        if self.summarize is not None:
+            return _parse(self.summarize(messages))
+        response = client.chat.completions.create(model=self.model, messages=messages)
+        return _parse(response.choices[0].message.content)
+
+    # ------------------------------------------------------------------
+    def digest(self, result: dict) -> dict | None:
+        """
+        Digest of one search result (cached), or None if it is short or digesting failed.
+        """
+        content = document_text(result)
+        if len(content) < self.min_chars:
+            return None
+
+        key = self.key(result)
+        with self._lock:
+            inflight = self._inflight.setdefault(key, threading.Lock())
+
+        with inflight:
+            digest = self._lookup(key)
+            hit = digest is not None
+            if not hit:
+                try:
+                    digest = self._summarize(result)
+                except Exception as e:
+                    print(f"⚠️ Digest failed for {key[0]}: {e}")
+                    digest = None
+                if digest and digest["summary"]:
+                    self._store(key, digest, len(content))
+                else:
+                    digest = None
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            self.hits += hit
+            self.misses += not hit
+            if digest:
+                self.saved_chars += max(0, len(content) - len(render_digest(digest)))
+        metrics.record_cache("digests", hit)
+        return digest
+
+    def content(self, result: dict) -> str:
+        """
+        What goes into a prompt for one search result: its digest, or its
+        snippet (`content`; never the whole raw page).
+        """
+        digest = self.digest(result)
+        return render_digest(digest) if digest else result.get("content", "")
+
+    def contents(self, results: list) -> list[str]:
+        """
+        `content()` for every result; new documents are digested in parallel
+        (each call with the caller's context, e.g. its deadline and budget).
+        """
+        results = [r for r in results or [] if isinstance(r, dict)]
+        if len(results) <= 1 or self.max_concurrency <= 1:
+            return [self.content(r) for r in results]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(results))) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, self.content, r) for r in results]
+            return [f.result() for f in futures]
+
+    def stats(self) -> dict:
+        with self._lock:
+            stored = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(uses), 0) FROM digests").fetchone()
+            return {
+                "digests": stored[0],
+                "uses": stored[1],
+                "hits": self.hits,
+                "misses": self.misses,
+                "saved_chars": self.saved_chars,
+            }
+
+
+# ----------------------------------------------------------------------
+# Process-wide cache
+# ----------------------------------------------------------------------
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def use_digest_cache(path: str = DEFAULT_PATH, **kwargs) -> DigestCache:
+    """
+    Set the cache used by digest_context() (kwargs as in DigestCache).
+    """
+    global _cache
+    with _cache_lock:
+        _cache = DigestCache(path, **kwargs)
+    return _cache
+
+
+def digest_cache() -> DigestCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DigestCache(DEFAULT_PATH)
+        return _cache
+
+
+def digest_context(results: list) -> str:
+    """
+    Prompt context for search results: "- title\\n<digest or content>" per source.
+    """
+    results = [r for r in results or [] if isinstance(r, dict)]
+    contents = digest_cache().contents(results)
+    return "\n\n".join(f"- {r.get('title', '')}\n{content}" for r, content in zip(results, contents))
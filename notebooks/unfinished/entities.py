@@ -0,0 +1,328 @@
+"""
+Company entity resolution
+
+Companies arrive as domains ("swissre.com", "https://www.swissre.com/"),
+names ("Swiss Re", "Swiss Re Ltd") or typos ("Swis Re"). EntityIndex maps
+all of them to one canonical company ID (here: "swissre"), so run folders,
+retrieval caches, job ids and batch de-duplication agree on what is the
+same company.
+
+Resolution order:
+1. known alias (exact, after normalization)
+2. same slug: legal suffixes, punctuation and the TLD removed
+3. fuzzy, free-text names only: closest existing slug (difflib ratio >=
+   threshold, slugs of 5+ characters only, short names are too ambiguous).
+   A domain is never fuzzy-matched: "salesforge.com" is not "salesforce".
+4. otherwise a new entity
+
+Every variant resolved by 1, 2 or 4 is stored as an alias in a SQLite file,
+so the index learns and persists across runs. A fuzzy match is used but
+only stored as a suggestion until confirm() (or reject()) decides on it.
+
+The file is CRO_ENTITY_INDEX, or ~/.cro/entities.sqlite, which is local to
+one machine. Processes that must agree on IDs (the job queue's workers on
+several machines) have to set CRO_ENTITY_INDEX to one shared file, next to
+the queue; otherwise they can resolve the same name to different IDs.
+
+    from cro.entities import company_id, canonical_company
+    company_id("Swiss Re Ltd")          # "swissre"
+    canonical_company("Swiss Re")       # "swissre.com" once that domain was seen
+"""
+
+import difflib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+LOCAL_PATH = os.path.join(os.path.expanduser("~"), ".cro", "entities.sqlite")
+DEFAULT_PATH = os.environ.get("CRO_ENTITY_INDEX", LOCAL_PATH)
+
+LEGAL_SUFFIXES = {
+    "ag", "sa", "se", "nv", "bv", "plc", "ltd", "limited", "inc", "incorporated", "corp",
+    "corporation", "co", "company", "llc", "gmbh", "kg", "spa", "srl", "ab", "as", "oy",
+    "group", "holding", "holdings",
+}
+# Second-level labels of two-part public suffixes ("co.uk", "com.au", ...)
+_SECOND_LEVEL = {"co", "com", "net", "org", "gov", "ac", "edu"}
+_DOMAIN = re.compile(r"^(?:[a-z0-9-]+\.)+[a-z]{2,}$")
+
+
+def _strip_url(raw: str) -> str:
+    text = raw.strip().lower()
+    text = re.sub(r"^[a-z]+://", "", text)
+    text = text.split("/")[0].split("?")[0].split("#")[0]
+    return text[4:] if text.startswith("www.") else text
+
+
+def as_domain(raw: str) -> str | None:
+    """
+    "https://www.SwissRe.com/about" -> "swissre.com"; None for names.
+    """
+    text = _strip_url(raw)
+    return text if " " not in text and _DOMAIN.match(text) else None
+
+
+def slug(raw: str) -> str:
+    """
+    Canonical ID candidate: registrable domain label, or the name without
+    legal suffixes, spaces and punctuation.
+    """
+    domain = as_domain(raw)
+    if domain:
+        labels = domain.split(".")
+        if len(labels) >= 3 and labels[-2] in _SECOND_LEVEL:
+            return labels[-3]
+        return labels[-2]
+    words = re.findall(r"[a-z0-9]+", raw.lower().replace("&", " and "))
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return "".join(words)
+
+
+def alias_key(raw: str) -> str:
+    return re.sub(r"\s+", " ", _strip_url(raw)).strip()
+
+
+class EntityIndex:
+    """
+    Persistent alias -> company ID index.
+
+    Args:
+        path: SQLite file (":memory:" for a throwaway index)
+        threshold: minimum difflib ratio for a fuzzy match
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, threshold: float = 0.88):
+        self.path = path
+        self.threshold = threshold
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entities (
+                id TEXT PRIMARY KEY,
+                name TEXT,
+                domain TEXT,
+                created REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS aliases (
+                alias TEXT PRIMARY KEY,
+                entity_id TEXT NOT NULL REFERENCES entities(id),
+                how TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS suggestions (
+                alias TEXT PRIMARY KEY,
+                raw TEXT NOT NULL,
+                entity_id TEXT NOT NULL REFERENCES entities(id),
+                score REAL NOT NULL
+            );
+            -- fuzzy aliases learned without confirmation (older indexes) become suggestions
+            INSERT OR IGNORE INTO suggestions SELECT alias, alias, entity_id, 0 FROM aliases WHERE how = 'fuzzy';
+            DELETE FROM aliases WHERE how = 'fuzzy';
+        """)
+        self._ids = [row[0] for row in self._conn.execute("SELECT id FROM entities")]
+
+    # ------------------------------------------------------------------
+    def resolve(self, raw: str, create: bool = True) -> str | None:
+        """
+        Company ID for a domain / name / alias (creates the entity if unknown).
+        """
+        key = alias_key(raw)
+        if not key:
+            raise ValueError("Empty company name")
+
+        with self._lock:
+            row = self._conn.execute("SELECT entity_id FROM aliases WHERE alias = ?", (key,)).fetchone()
+            if row:
+                return row[0]
+
+            candidate = slug(raw) or key
+            how = "slug"
+            if candidate not in self._ids:
+                match = None if as_domain(raw) else self._fuzzy(candidate)
+                if match:
+                    # Used, not learned: a wrong merge must not become permanent
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO suggestions VALUES (?, ?, ?, ?)",
+                        (key, raw.strip(), match[0], match[1]),
+                    )
+                    self._conn.commit()
+                    return match[0]
+                if not create:
+                    return None
+                self._create(candidate)
+                how = "new"
+
+            self._remember(candidate, raw, key, how)
+            self._conn.commit()
+            return candidate
+
+    def _fuzzy(self, candidate: str) -> tuple[str, float] | None:
+        if len(candidate) < 5:
+            return None
+        pool = [i for i in self._ids if len(i) >= 5 and abs(len(i) - len(candidate)) <= 3]
+        best = difflib.get_close_matches(candidate, pool, n=1, cutoff=self.threshold)
+        if not best:
+            return None
+        return best[0], round(difflib.SequenceMatcher(None, candidate, best[0]).ratio(), 3)
+
+    def _create(self, entity_id: str):
+        self._conn.execute("INSERT OR IGNORE INTO entities VALUES (?, NULL, NULL, ?)", (entity_id, time.time()))
+        if entity_id not in self._ids:
+            self._ids.append(entity_id)
+
+    def _remember(self, entity_id: str, raw: str, key: str, how: str):
+        self._conn.execute("INSERT OR IGNORE INTO aliases VALUES (?, ?, ?)", (key, entity_id, how))
+        domain = as_domain(raw)
+        column = "domain" if domain else "name"
+        self._conn.execute(
+            f"UPDATE entities SET {column} = COALESCE({column}, ?) WHERE id = ?",
+            (domain or raw.strip(), entity_id),
+        )
+
+    # ------------------------------------------------------------------
+    def add_alias(self, entity_id: str, alias: str):
+        """
+        Teach the index an alias the rules cannot infer ("Munich Re" -> "munichre", ...).
+        """
+        with self._lock:
+            if entity_id not in self._ids:
+                raise KeyError(f"Unknown company ID: {entity_id}")
+            self._conn.execute("INSERT OR REPLACE INTO aliases VALUES (?, ?, 'manual')", (alias_key(alias), entity_id))
+            self._conn.execute("DELETE FROM suggestions WHERE alias = ?", (alias_key(alias),))
+            self._conn.commit()
+
+    def suggestions(self) -> list[dict]:
+        """
+        Fuzzy matches waiting for confirm() / reject().
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT alias, raw, entity_id, score FROM suggestions ORDER BY score").fetchall()
+        return [{"alias": alias, "raw": raw, "id": entity_id, "score": score} for alias, raw, entity_id, score in rows]
+
+    def confirm(self, alias: str):
+        """
+        Store a suggested fuzzy match as an alias.
+        """
+        key = alias_key(alias)
+        with self._lock:
+            row = self._conn.execute("SELECT raw, entity_id FROM suggestions WHERE alias = ?", (key,)).fetchone()
+            if row is None:
+                raise KeyError(f"No suggestion for: {alias}")
+            self._remember(row[1], row[0], key, "confirmed")
+            self._conn.execute("DELETE FROM suggestions WHERE alias = ?", (key,))
+            self._conn.commit()
+
+    def reject(self, alias: str) -> str:
+        """
+        Drop a suggested fuzzy match; the variant becomes its own company.
+        Returns its new ID.
+        """
+        key = alias_key(alias)
+        with self._lock:
+            row = self._conn.execute("SELECT raw FROM suggestions WHERE alias = ?", (key,)).fetchone()
+            if row is None:
+                raise KeyError(f"No suggestion for: {alias}")
+            entity_id = slug(row[0]) or key
+            self._create(entity_id)
+            self._remember(entity_id, row[0], key, "manual")
+            self._conn.execute("DELETE FROM suggestions WHERE alias = ?", (key,))
+            self._conn.commit()
+        return entity_id
+
+    def merge(self, keep: str, drop: str):
+        """
+        Fold entity `drop` into `keep` (e.g. after a wrong "new" resolution).
+        """
+        with self._lock:
+            self._conn.execute("UPDATE aliases SET entity_id = ? WHERE entity_id = ?", (keep, drop))
+            self._conn.execute("UPDATE suggestions SET entity_id = ? WHERE entity_id = ?", (keep, drop))
+            self._conn.execute(
+                "UPDATE entities SET domain = COALESCE(domain, (SELECT domain FROM entities WHERE id = ?)), "
+                "name = COALESCE(name, (SELECT name FROM entities WHERE id = ?)) WHERE id = ?",
+                (drop, drop, keep),
+            )
+            self._conn.execute("DELETE FROM entities WHERE id = ?", (drop,))
+            self._conn.commit()
+            self._ids = [i for i in self._ids if i != drop]
+
+    def entity(self, entity_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT id, name, domain FROM entities WHERE id = ?", (entity_id,)).fetchone()
+            if row is None:
+                return None
+            aliases = [r[0] for r in self._conn.execute("SELECT alias FROM aliases WHERE entity_id = ?", (entity_id,))]
+        return {"id": row[0], "name": row[1], "domain": row[2], "aliases": aliases}
+
+    def label(self, entity_id: str) -> str:
+        """
+        The form used for searches and prompts: the domain if known, else the first name seen.
+        """
+        info = self.entity(entity_id)
+        return (info and (info["domain"] or info["name"])) or entity_id
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT how, COUNT(*) FROM aliases GROUP BY how").fetchall())
+            suggested = self._conn.execute("SELECT COUNT(*) FROM suggestions").fetchone()[0]
+        return {"entities": len(self._ids), "aliases": counts, "suggestions": suggested}
+
+
+# ----------------------------------------------------------------------
+# Process-wide index
+# ----------------------------------------------------------------------
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def use_entity_index(path: str = DEFAULT_PATH, threshold: float = 0.88) -> EntityIndex:
+    """
+    Set the index used by company_id() / canonical_company().
+    """
+    global _index
+    with _index_lock:
+        _index = EntityIndex(path, threshold=threshold)
+    return _index
+
+
+def entity_index() -> EntityIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = EntityIndex(DEFAULT_PATH)
+        return _index
+
+
+def company_id(raw: str) -> str:
+    return entity_index().resolve(raw)
+
+
+def canonical_company(raw: str) -> str:
+    """
+    One spelling per company for every run (domain preferred).
+    """
+    index = entity_index()
+    return index.label(index.resolve(raw))
+
+
+def canonical_companies(companies: list[str]) -> list[str]:
+    """
+    Canonical spellings, duplicates (same ID) removed, order kept. All IDs are
+    resolved first, so a domain seen later in the list is used for every variant.
+    """
+    index = entity_index()
+    ids = list(dict.fromkeys(index.resolve(c) for c in companies))
+    return [index.label(i) for i in ids]
+
+
+def canonical_pairs(pairs: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """
+    Canonical spellings, duplicates (same IDs) removed, order kept.
+    """
+    index = entity_index()
+    ids = list(dict.fromkeys((index.resolve(t), index.resolve(o)) for t, o in pairs))
+    return [(index.label(t), index.label(o)) for t, o in ids]
@@ -0,0 +1,43 @@
+"""
+Evidence fingerprints for retrieval results
+
+The retrieval agents record, next to their `retrieval_sources` URLs, a
+content hash per source and one fingerprint over all of them. Comparing
+fingerprints tells whether a company's evidence changed since the last
+run without re-running any LLM (see cro.orchestrator.refresh).
+
+Hashes ignore result order and whitespace, so reshuffled or reformatted
+but otherwise identical search results keep their fingerprint.
+"""
+
+import hashlib
+import re
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def source_hashes(results: list) -> dict:
+    """
+    url -> hash of the (normalized) title, content and raw_content (the whole
+    page, when retrieved) of each search result. The agents read digests of
+    the whole page, so a changed page body changes the hash even when the
+    Tavily snippet (`content`) does not.
+    """
+    hashes = {}
+    for r in results or []:
+        text = f"{r.get('title', '')}\n{r.get('content', '')}"
+        if r.get("raw_content"):
+            text += f"\n{r['raw_content']}"
+        hashes[r.get("url", "")] = _digest(_WHITESPACE.sub(" ", text).strip().lower())
+    return hashes
+
+
+def evidence_fingerprint(hashes: dict) -> str:
+    """
+    One fingerprint for a set of sources (order-independent).
+    """
+    return _digest("\n".join(f"{url} {h}" for url, h in sorted(hashes.items())))
@@ -0,0 +1,226 @@
+"""
+Hedged LLM requests for slow completions
+
+Per-agent, opt-in tail-latency cutting for `client.chat.completions.create`:
+
+- the latency of every call is tracked per (agent, model)
+- if a call has not returned after the observed p90 for its agent and
+  model, a second request is fired: the same request or a fallback model
+- the first successful response wins, the other one is abandoned
+  (cancelled if it has not started; a running sync HTTP call cannot be
+  interrupted, its result is simply discarded)
+- hedges are capped at `max_hedge_ratio` of all calls, so the extra cost
+  stays bounded; stats() reports hedge rate, wins and denied hedges
+
+Usage:
+
+    from cro.hedging import HedgePolicy, install_hedging
+    policy = HedgePolicy({"match_scorer": {"fallback_model": "gpt-4.1-mini"}})
+    install_hedging(policy)
+    ...
+    policy.stats()
+
+The current deadline (cro.deadline) is carried into both requests.
+"""
+
+import contextvars
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import SimpleNamespace
+
+from cro.wrapping import has_layer, install_lock
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent latencies per key.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, seconds: float):
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._samples)
+
+    def percentile(self, key, q: float, min_samples: int) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class HedgePolicy:
+    """
+    Which agents hedge, when, and how much.
+
+    Args:
+        agents: agent name -> options; {} hedges with an identical request,
+                {"fallback_model": "..."} hedges with another model
+        percentile: hedge after this latency quantile of the agent/model
+        min_samples: calls observed before the quantile is trusted
+        default_delay: hedge delay (s) until enough samples exist (None = no hedging yet)
+        max_hedge_ratio: hedges allowed per call (budget cap)
+        max_workers: threads running primary and hedge requests
+    """
+
+    def __init__(self, agents: dict, percentile: float = 0.9, min_samples: int = 20,
+                 default_delay: float | None = None, max_hedge_ratio: float = 0.1,
+                 max_workers: int = 16):
+        self.agents = agents
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.max_hedge_ratio = max_hedge_ratio
+        self.latency = LatencyTracker()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def _count(self, agent: str, key: str, n: int = 1):
+        with self._lock:
+            counts = self._counts.setdefault(agent, {"calls": 0, "hedged": 0, "hedge_wins": 0, "denied": 0})
+            counts[key] += n
+
+    def delay(self, agent: str, model: str) -> float | None:
+        observed = self.latency.percentile((agent, model), self.percentile, self.min_samples)
+        return observed if observed is not None else self.default_delay
+
+    def allow_hedge(self, agent: str) -> bool:
+        """
+        Take one hedge from the budget if the cap allows it.
+        """
+        with self._lock:
+            total_calls = sum(c["calls"] for c in self._counts.values())
+            total_hedges = sum(c["hedged"] for c in self._counts.values())
+            if total_hedges + 1 > self.max_hedge_ratio * total_calls:
+                self._counts[agent]["denied"] += 1
+                return False
+            self._counts[agent]["hedged"] += 1
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            per_agent = {}
+            for agent, c in self._counts.items():
+                per_agent[agent] = {
+                    **c,
+                    "hedge_rate": round(c["hedged"] / c["calls"], 4) if c["calls"] else 0.0,
+                    "hedge_win_rate": round(c["hedge_wins"] / c["hedged"], 4) if c["hedged"] else 0.0,
+                }
+        return {
+            "agents": per_agent,
+            "p90_s": {
+                f"{agent}/{model}": self.latency.percentile((agent, model), self.percentile, 1)
+                for agent, model in self.latency.keys()
+            },
+        }
+
+    # ------------------------------------------------------------------
+    def _submit(self, agent: str, create, kwargs: dict):
+        """
+        Start one request in the pool (with the caller's context, e.g. its
+        deadline); its latency is recorded when it finishes, win or lose.
+        """
+        context = contextvars.copy_context()
+        started = time.monotonic()
+        model = kwargs.get("model")
+
+        def run():
+            return context.run(create, **kwargs)
+
+        def record(future):
+            if not future.cancelled() and future.exception() is None:
+                self.latency.record((agent, model), time.monotonic() - started)
+
+        future = self.pool.submit(run)
+        future.add_done_callback(record)
+        return future
+
+    def call(self, agent: str, create, kwargs: dict):
+        """
+        Run `create(**kwargs)`, hedged if the agent opted in.
+        """
+        options = self.agents.get(agent)
+        self._count(agent, "calls")
+        if options is None:
+            started = time.monotonic()
+            response = create(**kwargs)
+            self.latency.record((agent, kwargs.get("model")), time.monotonic() - started)
+            return response
+
+        primary = self._submit(agent, create, kwargs)
+        delay = self.delay(agent, kwargs.get("model"))
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.allow_hedge(agent):
+            return primary.result()
+
+        hedge_kwargs = dict(kwargs)
+        if options.get("fallback_model"):
+            hedge_kwargs["model"] = options["fallback_model"]
+        hedge = self._submit(agent, create, hedge_kwargs)
+
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    if future is hedge:
+                        self._count(agent, "hedge_wins")
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+
+class HedgedOpenAI:
+    """
+    Wraps one agent module's OpenAI client with a HedgePolicy.
+    """
+
+    def __init__(self, client, policy: HedgePolicy, agent: str):
+        self.wrapped = client
+        self.policy = policy
+        self.agent = agent
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        return self.policy.call(self.agent, self.wrapped.chat.completions.create, kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+
+def install_hedging(policy: HedgePolicy) -> dict:
+    """
+    Wrap the `client` of every registered agent module with `policy`.
+    Agents not listed in the policy are only measured (no hedging).
+
+    Returns:
+        dict: module name -> agent name that was wrapped
+    """
+    from cro.orchestrator.agent_registry import AGENT_SPEC
+
+    wrapped = {}
+    with install_lock:
+        for agent, spec in AGENT_SPEC.items():
+            module = sys.modules[spec["fn"].__module__]
+            client = getattr(module, "client", None)
+            if client is None or has_layer(client, HedgedOpenAI):
+                continue
+            module.client = HedgedOpenAI(client, policy, agent)
+            wrapped[module.__name__] = agent
+    return wrapped
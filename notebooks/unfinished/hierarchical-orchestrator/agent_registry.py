@@ -109,3 +109,19 @@ AGENT_SPEC = {
 }
 
 AVAILABLE_AGENTS = list(AGENT_SPEC.keys())
+
+
+def downstream_agents(agents) -> set:
+    """
+    The given agents plus every agent that consumes their outputs,
+    directly or through other agents.
+    """
+    affected = set(agents)
+    grew = True
+    while grew:
+        grew = False
+        for name, spec in AGENT_SPEC.items():
+            if name not in affected and affected & set(spec["inputs"].values()):
+                affected.add(name)
+                grew = True
+    return affected
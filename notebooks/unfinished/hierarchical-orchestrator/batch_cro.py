@@ -0,0 +1,341 @@
+"""
+Batch runner for the Hierarchical CRO Orchestrator
+
+- Runs pain_point_detective once per target and value_prop_engineer once
+  per origin (not once per pair)
+- Pre-screens all pairs locally in one vectorized pass
+- Runs the full hierarchical orchestrator only for pairs that pass,
+  best pre-screen scores first
+- Matrix mode: scores N targets x M origins with batched LLM prompts and
+  only runs the top-k origins per target through the later agents
+- Batch and per-pair token / cost budgets (cro.budget); at the hard limit
+  the batch stops, and resume=True continues from the saved outputs
+"""
+
+import json
+import os
+
+from cro import budget as budgets, metrics
+from cro.budget import Budget, BudgetExceeded, budget_scope
+from cro.agents.match_matrix_scorer import match_matrix_scorer
+from cro.entities import canonical_companies, canonical_company, canonical_pairs, company_id
+
+from .agent_registry import AGENT_SPEC
+from .hierarchical_cro import CRO_hierarchical_orchestrator, install_run_controls, load_summary, resumable_outputs
+from .json_utils import save_json
+from .prescreen import prescreen_pairs
+
+
+def retrieve_companies(targets: list[str], origins: list[str],
+                       cache_path: str | None = None) -> tuple[dict, dict]:
+    """
+    Run the retrieval agents once per company.
+
+    Args:
+        cache_path: optional JSON file (keyed by company ID); outputs found there
+                    are reused and every new output is saved right away (so a
+                    stopped batch resumes)
+
+    Returns:
+        (target -> pain_point_detective output, origin -> value_prop_engineer output)
+    """
+    cache = {"pain_point_detective": {}, "value_prop_engineer": {}}
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            cache.update(json.load(f))
+
+    for agent_name, arg_name, companies in (
+        ("pain_point_detective", "target_company", targets),
+        ("value_prop_engineer", "origin_company", origins),
+    ):
+        for company in companies:
+            key = company_id(company)
+            output = cache[agent_name].get(key)
+            if output is None or "error" in output:
+                cache[agent_name][key] = AGENT_SPEC[agent_name]["fn"](**{arg_name: company})
+                if cache_path:
+                    save_json(cache, cache_path)
+
+    return (
+        {t: cache["pain_point_detective"][company_id(t)] for t in targets},
+        {o: cache["value_prop_engineer"][company_id(o)] for o in origins},
+    )
+
+
+def CRO_batch_orchestrator(
+    pairs: list[tuple[str, str]],
+    output_dir: str = "HH-exchanges",
+    max_steps: int = 24,
+    prescreen_threshold: float = 10.0,
+    drop_below_threshold: bool = True,
+    deadline_s: float | None = None,
+    budget: Budget | None = None,
+    pair_budget: dict | None = None,
+    resume: bool = False,
+):
+    """
+    Batch version of CRO_hierarchical_orchestrator.
+
+    Args:
+        pairs: list of (target_company, origin_company)
+        output_dir: str — Where to store step-by-step JSON
+        max_steps: int — Safety cap per pair
+        prescreen_threshold: float — Minimum local pre-screen score (0–100)
+        drop_below_threshold: bool — Skip pairs below the threshold
+                                     (False: run them last instead)
+        deadline_s: float — Time budget per pair (see CRO_hierarchical_orchestrator)
+        budget: Budget — Token / cost budget for the whole batch
+        pair_budget: dict — Budget limits per pair, e.g. {"soft_usd": 0.05, "hard_usd": 0.1}
+        resume: bool — Reuse retrieval outputs and finished pairs of an earlier
+                       (e.g. budget-stopped) run in output_dir
+
+    Returns:
+        dict: pre-screen ranking + one summary per pair
+    """
+
+    # One spelling per company: variants share retrieval, folders and caches
+    pairs = canonical_pairs(pairs)
+    print(f"=== CRO Batch — {len(pairs)} pairs ===")
+
+    budget = budget or Budget("batch")
+    install_run_controls()
+    with budget_scope(budget):
+        try:
+            batch_summary = _run_batch(pairs, output_dir, max_steps, prescreen_threshold,
+                                       drop_below_threshold, deadline_s, pair_budget, resume)
+        except BudgetExceeded as e:
+            # Only reachable during retrieval: pairs stop on their own
+            print(f"💸 {e}. Stopping; rerun with resume=True and a new budget.")
+            batch_summary = {"prescreen": [], "results": [], "stopped": {"reason": "budget", "detail": str(e)}}
+
+    batch_summary["budget"] = budget.report()
+    save_json(batch_summary, os.path.join(output_dir, "00_batch_summary.json"))
+    metrics.QUEUE_DEPTH.set(0, queue="batch")
+
+    if "stopped" in batch_summary:
+        print(f"\n💸 CRO batch stopped by budget: {batch_summary['stopped']['detail']}")
+    else:
+        skipped = sum(1 for r in batch_summary["results"] if r.get("skipped") == "prescreen")
+        print(f"\n✅ CRO batch complete: {skipped} pairs skipped by pre-screen.")
+    return batch_summary
+
+
+def _pair_budget(pair_budget: dict | None, target_company: str, origin_company: str) -> Budget | None:
+    if pair_budget is None:
+        return None
+    return Budget(f"{target_company} -> {origin_company}", **pair_budget)
+
+
+def _run_batch(pairs, output_dir, max_steps, prescreen_threshold, drop_below_threshold,
+               deadline_s, pair_budget, resume) -> dict:
+    """
+    Retrieval, pre-screen and per-pair orchestration of CRO_batch_orchestrator.
+    """
+    targets = list(dict.fromkeys(t for t, _ in pairs))
+    origins = list(dict.fromkeys(o for _, o in pairs))
+
+    # ----------------------------------------------------------
+    # Shared retrieval agents: once per company
+    # ----------------------------------------------------------
+    pain_outputs, value_outputs = retrieve_companies(
+        targets, origins, cache_path=os.path.join(output_dir, "00_batch_retrieval.json") if resume else None
+    )
+
+    # ----------------------------------------------------------
+    # Local pre-screen of every pair
+    # ----------------------------------------------------------
+    ranking = prescreen_pairs(pairs, pain_outputs, value_outputs, threshold=prescreen_threshold)
+    save_json(ranking, os.path.join(output_dir, "00_batch_prescreen.json"))
+
+    passed = sum(r["passed"] for r in ranking)
+    print(f"🔎 Pre-screen: {passed}/{len(ranking)} pairs >= {prescreen_threshold}")
+
+    # ----------------------------------------------------------
+    # Full orchestration for the remaining pairs
+    # ----------------------------------------------------------
+    results = []
+    stopped = None
+    for position, row in enumerate(ranking):
+        metrics.QUEUE_DEPTH.set(len(ranking) - position, queue="batch")
+        target_company, origin_company = row["target_company"], row["origin_company"]
+
+        if stopped:
+            results.append({"pair": f"{target_company} -> {origin_company}", "pending": "budget"})
+            continue
+
+        if not row["passed"] and drop_below_threshold:
+            results.append({
+                "pair": f"{target_company} -> {origin_company}",
+                "skipped": "prescreen",
+                "prescreen_score": row["prescreen_score"],
+            })
+            metrics.record_pair("skipped")
+            continue
+
+        previous = load_summary(output_dir, target_company, origin_company) if resume else None
+        if previous and "stopped" not in previous:
+            print(f"↩️ Reusing finished pair {target_company} -> {origin_company}")
+            results.append(previous)
+            continue
+
+        summary = CRO_hierarchical_orchestrator(
+            target_company=target_company,
+            origin_company=origin_company,
+            output_dir=output_dir,
+            max_steps=max_steps,
+            initial_outputs={
+                **(resumable_outputs(previous) if previous else {}),
+                "pain_point_detective": pain_outputs[target_company],
+                "value_prop_engineer": value_outputs[origin_company],
+            },
+            deadline_s=deadline_s,
+            budget=_pair_budget(pair_budget, target_company, origin_company),
+        )
+        summary["prescreen_score"] = row["prescreen_score"]
+        results.append(summary)
+
+        # A pair stopped by its own budget does not stop the batch; the batch budget does
+        if "stopped" in summary and any(b.exhausted for b in budgets.active()):
+            stopped = {"reason": "budget", "detail": summary["stopped"]["detail"]}
+
+    batch_summary = {"prescreen": ranking, "results": results}
+    if stopped:
+        batch_summary["stopped"] = stopped
+    return batch_summary
+
+
+def CRO_matrix_orchestrator(
+    targets: list[str],
+    origins: list[str],
+    output_dir: str = "HH-exchanges",
+    max_steps: int = 24,
+    top_k: int = 3,
+    origins_per_call: int = 5,
+    prescreen_threshold: float | None = 10.0,
+    pain_outputs: dict | None = None,
+    value_outputs: dict | None = None,
+    deadline_s: float | None = None,
+    budget: Budget | None = None,
+    pair_budget: dict | None = None,
+):
+    """
+    N x M matrix mode: score every target against every origin, then run the
+    later agents (selling arguments, email, offer note, ...) only for the
+    top_k origins of each target.
+
+    Args:
+        targets: prospects (pain point sources)
+        origins: our offerings (value proposition sources)
+        output_dir: str — Where to store step-by-step JSON
+        max_steps: int — Safety cap per pair
+        top_k: int — Origins kept per target
+        origins_per_call: int — Origins scored together in one LLM prompt
+        prescreen_threshold: float — Local pre-screen before LLM scoring (None = off)
+        pain_outputs / value_outputs: cached retrieval outputs; missing companies are retrieved
+        deadline_s: float — Time budget per top pair (see CRO_hierarchical_orchestrator)
+        budget: Budget — Token / cost budget for the whole run
+        pair_budget: dict — Budget limits per top pair (see CRO_batch_orchestrator)
+
+    Returns:
+        dict: score matrix, top-k per target and one summary per selected pair
+    """
+
+    targets = canonical_companies(targets)
+    origins = canonical_companies(origins)
+    pain_outputs = {canonical_company(k): v for k, v in (pain_outputs or {}).items()}
+    value_outputs = {canonical_company(k): v for k, v in (value_outputs or {}).items()}
+    print(f"=== CRO Matrix — {len(targets)} targets x {len(origins)} origins ===")
+
+    budget = budget or Budget("matrix")
+    install_run_controls()
+    with budget_scope(budget):
+        try:
+            result = _run_matrix(targets, origins, output_dir, max_steps, top_k, origins_per_call,
+                                 prescreen_threshold, pain_outputs, value_outputs, deadline_s, pair_budget)
+        except BudgetExceeded as e:
+            print(f"💸 {e}. Stopping before the top pairs.")
+            result = {"matrix": {}, "top_k": {}, "results": [], "stopped": {"reason": "budget", "detail": str(e)}}
+    metrics.QUEUE_DEPTH.set(0, queue="matrix")
+
+    result["budget"] = budget.report()
+    if "stopped" in result:
+        print(f"\n💸 CRO matrix stopped by budget: {result['stopped']['detail']}")
+    else:
+        print(f"\n✅ CRO matrix complete: {len(result['results'])} top pairs processed.")
+    return result
+
+
+def _run_matrix(targets, origins, output_dir, max_steps, top_k, origins_per_call,
+                prescreen_threshold, pain_outputs, value_outputs, deadline_s, pair_budget) -> dict:
+    """
+    Retrieval, matrix scoring and top-pair orchestration of CRO_matrix_orchestrator.
+    """
+    pain_outputs = dict(pain_outputs or {})
+    value_outputs = dict(value_outputs or {})
+    new_pain, new_value = retrieve_companies(
+        [t for t in targets if t not in pain_outputs],
+        [o for o in origins if o not in value_outputs],
+    )
+    pain_outputs.update(new_pain)
+    value_outputs.update(new_value)
+
+    # ----------------------------------------------------------
+    # Optional local pre-screen: only plausible pairs reach the LLM
+    # ----------------------------------------------------------
+    candidates = None
+    if prescreen_threshold is not None:
+        pairs = [(t, o) for t in targets for o in origins]
+        ranking = prescreen_pairs(pairs, pain_outputs, value_outputs, threshold=prescreen_threshold)
+        candidates = {t: [] for t in targets}
+        for row in ranking:
+            if row["passed"]:
+                candidates[row["target_company"]].append(row["origin_company"])
+
+    # ----------------------------------------------------------
+    # Batched LLM scoring
+    # ----------------------------------------------------------
+    scored = match_matrix_scorer(
+        {t: pain_outputs[t] for t in targets},
+        {o: value_outputs[o] for o in origins},
+        candidates=candidates,
+        origins_per_call=origins_per_call,
+        top_k=top_k,
+    )
+    save_json(
+        {"matrix": scored["matrix"], "top_k": scored["top_k"]},
+        os.path.join(output_dir, "00_match_matrix.json"),
+    )
+
+    # ----------------------------------------------------------
+    # Later agents for the top matches only
+    # ----------------------------------------------------------
+    results = []
+    stopped = None
+    top_pairs = list(scored["match_outputs"].items())
+    for position, ((target_company, origin_company), match_json) in enumerate(top_pairs):
+        metrics.QUEUE_DEPTH.set(len(top_pairs) - position, queue="matrix")
+        if stopped:
+            results.append({"pair": f"{target_company} -> {origin_company}", "pending": "budget"})
+            continue
+
+        summary = CRO_hierarchical_orchestrator(
+            target_company=target_company,
+            origin_company=origin_company,
+            output_dir=output_dir,
+            max_steps=max_steps,
+            initial_outputs={
+                "pain_point_detective": pain_outputs[target_company],
+                "value_prop_engineer": value_outputs[origin_company],
+                "match_scorer": match_json,
+            },
+            deadline_s=deadline_s,
+            budget=_pair_budget(pair_budget, target_company, origin_company),
+        )
+        results.append(summary)
+        if "stopped" in summary and any(b.exhausted for b in budgets.active()):
+            stopped = {"reason": "budget", "detail": summary["stopped"]["detail"]}
+
+    result = {"matrix": scored["matrix"], "top_k": scored["top_k"], "results": results}
+    if stopped:
+        result["stopped"] = stopped
+    return result
@@ -5,22 +5,50 @@ Hierarchical CRO Orchestrator (target_company / origin_company version)
 - Orchestrator executes agents
 - LLM decider chooses the next agent
 - No agent-to-agent communication
+- Optional per-run deadline (deadline_s) shared by every agent, search and LLM call
+- Agent latency / outcome and pair throughput reported to cro.metrics
+- Optional token / cost budget: cheaper models and no optional agents over the
+  soft limit, clean (resumable) stop at the hard limit
 """
 
 import os
 import json
+import time
 from datetime import datetime
+from typing import Callable
 from openai import OpenAI
 
+from cro import budget as budgets, metrics
+from cro.budget import Budget, BudgetExceeded, budget_scope, install_budgets
+from cro.deadline import Deadline, DeadlineExceeded, deadline_scope, install_deadlines
+from cro.entities import company_id
+from cro.wrapping import install_lock
+
 # Local imports
 from .agent_registry import AGENT_SPEC, AVAILABLE_AGENTS
 from .llm_decider import ask_llm_for_next_agent
 from .json_utils import save_json
+from .prescreen import similarity_matrix
 
 from .agent_registry import AGENT_SPEC
 
 client = OpenAI()
 
+
+def install_run_controls():
+    """
+    Make sure the deadline and budget client wrappers are installed.
+    Both pass calls through when no deadline / budget is in scope, so every
+    run (pair, batch, matrix, service job) shares them. Called at the start
+    of every run: the installs are idempotent (cro.wrapping), and a client
+    can lose its layers in between, e.g. when use_cassette() restores the
+    clients it replaced.
+    """
+    with install_lock:
+        install_deadlines()
+        install_budgets()
+
+
 # ----------------------------------------------------------------------
 # MAIN ORCHESTRATOR
 # ----------------------------------------------------------------------
@@ -30,6 +58,12 @@ def CRO_hierarchical_orchestrator(
     origin_company: str,
     output_dir: str = "HH-exchanges",
     max_steps: int = 24,
+    initial_outputs: dict | None = None,
+    prescreen_threshold: float | None = None,
+    deadline_s: float | None = None,
+    budget: Budget | None = None,
+    on_output: Callable[[str, dict], None] | None = None,
+    prefetch: Callable[[], dict] | None = None,
 ):
     """
     Hierarchical CRO Orchestrator.
@@ -39,6 +73,23 @@ def CRO_hierarchical_orchestrator(
         origin_company: str — Solution provider (value proposition source)
         output_dir: str — Where to store step-by-step JSON
         max_steps: int — Safety cap
+        initial_outputs: dict — Agent outputs already computed (e.g. by a batch run),
+                                reused instead of re-running those agents (error
+                                outputs are ignored, so those agents run again)
+        prescreen_threshold: float — If set, skip match_scorer and every later agent
+                                     when the local pre-screen score (0–100) is below it
+        deadline_s: float — Time budget for the whole pair. Every LLM / search call gets
+                            the remaining budget; when it runs out the run stops and the
+                            summary is marked "degraded"
+        budget: Budget — Token / cost budget for the pair (nested in any outer budget,
+                         e.g. the batch's). Over the soft limit the run degrades; at the
+                         hard limit it stops and the summary is marked "stopped"; rerun
+                         with initial_outputs=resumable_outputs(summary) to continue
+        on_output: callable(agent_name, output) — Called after every successful agent,
+                   e.g. to checkpoint outputs outside the output folder (job queue)
+        prefetch: callable() -> dict — Computes more outputs to reuse, like initial_outputs,
+                  but inside the pair's deadline and budget (e.g. the service's shared
+                  retrieval cache)
 
     Returns:
         dict: final summary containing outputs + history
@@ -48,10 +99,7 @@ def CRO_hierarchical_orchestrator(
 
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
-    folder = os.path.join(
-        output_dir,
-        f"{target_company.replace('.', '_')}__{origin_company.replace('.', '_')}"
-    )
+    folder = pair_folder(output_dir, target_company, origin_company)
     os.makedirs(folder, exist_ok=True)
 
     # ----------------------------------------------------------
@@ -66,11 +114,140 @@ def CRO_hierarchical_orchestrator(
         "agent_registry": AGENT_SPEC,
     }
 
+    _reuse_outputs(state, initial_outputs)
+
     # ----------------------------------------------------------
-    # LLM-driven agent selection loop
+    # LLM-driven agent selection loop (inside the pair's deadline)
     # ----------------------------------------------------------
+    deadline = Deadline(deadline_s)
+    progress = {"agent": None}
+    degraded = None
+    stopped = None
+    budget = budget or Budget(f"{target_company} -> {origin_company}")
+    install_run_controls()
+
+    with deadline_scope(deadline), budget_scope(budget):
+        try:
+            if prefetch is not None:
+                _reuse_outputs(state, prefetch())
+            _run_steps(state, folder, max_steps, prescreen_threshold, deadline, progress, on_output)
+        except BudgetExceeded as e:
+            # The interrupted agent has no output, so a rerun starts there
+            print(f"💸 {e}. Stopping; rerun with a new budget to resume.")
+            stopped = {"reason": "budget", "detail": str(e), "agent": progress["agent"]}
+        except DeadlineExceeded as e:
+            agent_name = progress["agent"]
+            print(f"⏰ {e}. Returning a degraded result.")
+            degraded = {
+                "reason": "deadline",
+                "detail": str(e),
+                "agent": agent_name,
+                **deadline.report(),
+            }
+            if agent_name:
+                state["outputs"][agent_name] = {"error": str(e), "degraded": True}
+                metrics.AGENT_RUNS.inc(agent=agent_name, outcome="degraded")
+
+    # ----------------------------------------------------------
+    # FINAL SUMMARY
+    # ----------------------------------------------------------
+    summary = {
+        "pair": f"{target_company} -> {origin_company}",
+        "timestamp": timestamp,
+        "steps": state["history"],
+        "final_outputs": state["outputs"],
+    }
+    if deadline_s is not None:
+        summary["deadline"] = deadline.report()
+    if degraded:
+        summary["degraded"] = degraded
+    summary["budget"] = budget.report()
+    if stopped:
+        summary["stopped"] = stopped
+
+    save_json(summary, f"{folder}/00_summary_hierarchical.json")
+    metrics.record_pair("stopped" if stopped else "degraded" if degraded else "ok")
+
+    print("\n✅ Hierarchical CRO complete.")
+    print(f"📂 All files saved to: {folder}")
+
+    return summary
+
+
+def pair_folder(output_dir: str, target_company: str, origin_company: str) -> str:
+    """
+    Run folder of a pair, keyed by canonical company IDs (cro.entities), so
+    "swissre.com", "Swiss Re" and "Swiss Re Ltd" share one folder.
+    """
+    return os.path.join(output_dir, f"{company_id(target_company)}__{company_id(origin_company)}")
+
+
+def _legacy_pair_folder(output_dir: str, target_company: str, origin_company: str) -> str:
+    return os.path.join(
+        output_dir,
+        f"{target_company.replace('.', '_')}__{origin_company.replace('.', '_')}"
+    )
+
+
+def load_summary(output_dir: str, target_company: str, origin_company: str) -> dict | None:
+    """
+    The saved summary of an earlier run of this pair, if any (also from
+    folders named before canonical IDs were used).
+    """
+    for folder in (pair_folder(output_dir, target_company, origin_company),
+                   _legacy_pair_folder(output_dir, target_company, origin_company)):
+        path = os.path.join(folder, "00_summary_hierarchical.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+    return None
+
+
+def resumable_outputs(summary: dict) -> dict:
+    """
+    Outputs of a stopped run that can be reused (no errors, no skipped agents).
+    """
+    return {
+        agent: output
+        for agent, output in summary.get("final_outputs", {}).items()
+        if agent != "prescreen" and not (isinstance(output, dict) and ("error" in output or "skipped" in output))
+    }
+
+
+def _reuse_outputs(state: dict, outputs: dict | None):
+    """
+    Reused outputs count as already run, so the LLM decider moves on.
+    Error outputs are skipped: the decider runs those agents again.
+    """
+    for agent_name, output in (outputs or {}).items():
+        if isinstance(output, dict) and "error" in output:
+            continue
+        state["outputs"][agent_name] = output
+        state["run_counts"][agent_name] = 1
+        state["history"].append({
+            "step": 0,
+            "agent": agent_name,
+            "inputs": [],
+            "output_keys": list(output.keys()) if isinstance(output, dict) else "non-dict",
+            "reused": True,
+        })
+
+
+def _run_steps(state: dict, folder: str, max_steps: int, prescreen_threshold: float | None,
+               deadline: Deadline, progress: dict, on_output: Callable | None = None):
+    """
+    The decider / agent loop of CRO_hierarchical_orchestrator.
+    progress["agent"] is the agent running right now (None while deciding).
+    Raises DeadlineExceeded when the pair's time budget runs out and
+    BudgetExceeded at a hard budget limit.
+    """
+
     for step in range(1, max_steps + 1):
 
+        progress["agent"] = None
+        deadline.check(f"step {step}")
+        budgets.check(f"step {step}")
+
         print(f"\n=== 🧠 Step {step} — LLM deciding next agent ===")
 
         decision = ask_llm_for_next_agent(state)
@@ -89,6 +266,15 @@ def CRO_hierarchical_orchestrator(
             print(f"⚠️ LLM returned invalid agent: {agent_name}. Stopping.")
             break
 
+        # Over a soft budget limit, optional agents are not run
+        if agent_name in budgets.OPTIONAL_AGENTS and budgets.degraded():
+            print(f"💸 Budget soft limit reached, skipping optional agent: {agent_name}")
+            state["outputs"][agent_name] = {"skipped": "budget"}
+            state["run_counts"][agent_name] = state["run_counts"].get(agent_name, 0) + 1
+            state["history"].append({"step": step, "agent": agent_name, "inputs": [], "skipped": "budget"})
+            metrics.AGENT_RUNS.inc(agent=agent_name, outcome="skipped")
+            continue
+
         # ------------------------------------------------------
         # Build argument map for the agent
         # ------------------------------------------------------
@@ -114,11 +300,27 @@ def CRO_hierarchical_orchestrator(
                     )
                 call_args[arg_name] = state["outputs"][source]
 
+        # ------------------------------------------------------
+        # Cheap local pre-screen before the expensive match_scorer
+        # ------------------------------------------------------
+        if agent_name == "match_scorer" and prescreen_threshold is not None:
+            score = float(similarity_matrix([call_args["pain_json"]], [call_args["value_json"]])[0, 0])
+            state["outputs"]["prescreen"] = {
+                "prescreen_score": round(score, 2),
+                "threshold": prescreen_threshold,
+            }
+            if score < prescreen_threshold:
+                print(f"⏭️ Pre-screen score {score:.1f} < {prescreen_threshold}. Poor fit, stopping before match_scorer.")
+                break
+
         # ------------------------------------------------------
         # Execute the agent
         # ------------------------------------------------------
         print(f"▶️ Calling agent: {agent_name}")
+        progress["agent"] = agent_name
 
+        started = time.monotonic()
+        metrics.AGENTS_IN_FLIGHT.inc(agent=agent_name)
         try:
             output = fn(**call_args)
 #        except Exception as e:
@@ -131,7 +333,11 @@ def CRO_hierarchical_orchestrator(
             traceback.print_exc()
             print("-------------------------------------------")
             state["outputs"][agent_name] = {"error": str(e)}
+            metrics.record_agent(agent_name, time.monotonic() - started, state["outputs"][agent_name])
             continue
+        finally:
+            metrics.AGENTS_IN_FLIGHT.dec(agent=agent_name)
+        metrics.record_agent(agent_name, time.monotonic() - started, output)
 
         # increments run_counts
         state["run_counts"][agent_name] = state["run_counts"].get(agent_name, 0) + 1
@@ -149,20 +355,5 @@ def CRO_hierarchical_orchestrator(
 
         # Save output file
         save_json(output, f"{folder}/{step:02d}_{agent_name}.json")
-
-    # ----------------------------------------------------------
-    # FINAL SUMMARY
-    # ----------------------------------------------------------
-    summary = {
-        "pair": f"{target_company} -> {origin_company}",
-        "timestamp": timestamp,
-        "steps": state["history"],
-        "final_outputs": state["outputs"],
-    }
-
-    save_json(summary, f"{folder}/00_summary_hierarchical.json")
-
-    print("\n✅ Hierarchical CRO complete.")
-    print(f"📂 All files saved to: {folder}")
-
-    return summary
+        if on_output is not None:
+            on_output(agent_name, output)
@@ -0,0 +1,445 @@
+"""
+Lease-based job queue for distributed CRO batch runs
+
+Several worker processes (on machines sharing a filesystem) pull work from
+one SQLite file; no external service is needed.
+
+Jobs:
+- "retrieval": pain_point_detective for one target / value_prop_engineer
+  for one origin (shared by all pairs of that company)
+- "pair": CRO_hierarchical_orchestrator for one pair; waits for its
+  retrieval jobs (depends_on)
+
+Agent-level tasks: every agent output of a pair is checkpointed in the
+queue as soon as it is produced (agent_outputs table), so a pair job picked
+up after a crash restarts with those outputs instead of paying for them
+again.
+
+Guarantees:
+- visibility timeout: a leased job becomes available again when its lease
+  expires (worker crashed or lost)
+- heartbeats: a running worker keeps extending its lease
+- idempotent completion: the first complete() stores the result, later
+  ones (e.g. from a worker whose lease expired) are ignored; enqueue and
+  agent checkpoints are idempotent too
+- failing jobs are retried up to max_attempts, then marked "failed"
+
+Company IDs (cro.entities) name the jobs and run folders, so every worker
+and the process that enqueues must share one entity index: set
+CRO_ENTITY_INDEX to a shared file (e.g. /shared/entities.sqlite) on every
+machine. With the default per-machine index, workers can resolve the same
+company to different IDs; run_worker warns when it is not set.
+
+Usage:
+
+    # CRO_ENTITY_INDEX=/shared/entities.sqlite on every machine
+    queue = JobQueue("/shared/cro_queue.sqlite")
+    enqueue_batch(queue, pairs)
+    run_worker(queue, output_dir="/shared/HH-exchanges")   # on every machine
+    collect_results(queue, pairs)
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+from cro.entities import LOCAL_PATH, canonical_pairs, company_id, entity_index
+
+from .agent_registry import AGENT_SPEC
+from .hierarchical_cro import CRO_hierarchical_orchestrator
+
+RETRIEVAL_ROLES = {
+    "pain_point_detective": "target_company",
+    "value_prop_engineer": "origin_company",
+}
+
+
+class _Transaction:
+    """
+    `with` block over a connection: commit (or roll back) and close at the end.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.conn.close()
+
+
+class JobQueue:
+    """
+    Jobs and agent checkpoints in one SQLite file.
+
+    Args:
+        path: SQLite file (on the shared filesystem)
+        visibility_timeout: seconds a lease lasts without a heartbeat
+        max_attempts: leases per job before it is marked failed
+    """
+
+    def __init__(self, path: str, visibility_timeout: float = 300.0, max_attempts: int = 3):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    depends_on TEXT NOT NULL,
+                    status TEXT NOT NULL,          -- queued | leased | done | failed
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    lease_expires REAL,
+                    result TEXT,
+                    error TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created);
+                CREATE TABLE IF NOT EXISTS agent_outputs (
+                    job_id TEXT NOT NULL,
+                    agent TEXT NOT NULL,
+                    output TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    PRIMARY KEY (job_id, agent)
+                );
+            """)
+
+    def _connect(self) -> _Transaction:
+        # One short-lived connection per operation: safe across threads and
+        # processes; rollback journal (WAL needs shared memory, not NFS-safe)
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 60000")
+        return _Transaction(conn)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def enqueue(self, job_id: str, kind: str, payload: dict, depends_on: list[str] = ()) -> bool:
+        """
+        Add a job (no-op if a job with this id exists). Returns True if added.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO jobs (id, kind, payload, depends_on, status, created, updated) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(payload, ensure_ascii=False), json.dumps(list(depends_on)), now, now),
+            )
+            return cursor.rowcount == 1
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+    def lease(self, worker: str, kinds: tuple[str, ...] | None = None) -> dict | None:
+        """
+        Lease the oldest runnable job: queued (or with an expired lease) and
+        with all its dependencies done. Returns the job or None.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, kind, payload, depends_on, attempts FROM jobs "
+                "WHERE status = 'queued' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY created, id",
+                (now,),
+            ).fetchall()
+            finished = dict(conn.execute("SELECT id, status FROM jobs WHERE status IN ('done', 'failed')"))
+
+            for job_id, kind, payload, depends_on, attempts in rows:
+                if kinds and kind not in kinds:
+                    continue
+                if attempts >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', owner = NULL, updated = ?, "
+                        "error = COALESCE(error, 'lease expired too often') WHERE id = ?",
+                        (now, job_id),
+                    )
+                    continue
+                depends_on = json.loads(depends_on)
+                if any(finished.get(dep) == "failed" for dep in depends_on):
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', owner = NULL, updated = ?, "
+                        "error = 'dependency failed' WHERE id = ?",
+                        (now, job_id),
+                    )
+                    continue
+                if any(finished.get(dep) != "done" for dep in depends_on):
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET status = 'leased', owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated = ? WHERE id = ?",
+                    (worker, now + self.visibility_timeout, now, job_id),
+                )
+                return {"id": job_id, "kind": kind, "payload": json.loads(payload), "attempt": attempts + 1}
+        return None
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        """
+        Extend the lease. False if the worker no longer holds it.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated = ? "
+                "WHERE id = ? AND owner = ? AND status = 'leased'",
+                (now + self.visibility_timeout, now, job_id, worker),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker: str, result) -> bool:
+        """
+        Store the result unless the job is already done (first result wins,
+        even from a worker whose lease expired: the work is paid for).
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, owner = ?, lease_expires = NULL, "
+                "error = NULL, updated = ? WHERE id = ? AND status != 'done'",
+                (json.dumps(result, ensure_ascii=False, default=str), worker, now, job_id),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker: str, error: str) -> str:
+        """
+        Give the job back for a retry, or mark it failed after max_attempts.
+        Returns the new status.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT attempts, status, owner FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row[1] == "done" or row[2] != worker:
+                return row[1] if row else "missing"
+            status = "failed" if row[0] >= self.max_attempts else "queued"
+            conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, lease_expires = NULL, error = ?, updated = ? "
+                "WHERE id = ?",
+                (status, error, now, job_id),
+            )
+            return status
+
+    # ------------------------------------------------------------------
+    # Agent-level checkpoints
+    # ------------------------------------------------------------------
+    def save_agent_output(self, job_id: str, agent: str, output: dict):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO agent_outputs VALUES (?, ?, ?, ?)",
+                (job_id, agent, json.dumps(output, ensure_ascii=False, default=str), time.time()),
+            )
+
+    def agent_outputs(self, job_id: str) -> dict:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT agent, output FROM agent_outputs WHERE job_id = ?", (job_id,))
+            return {agent: json.loads(output) for agent, output in rows}
+
+    # ------------------------------------------------------------------
+    # Inspection
+    # ------------------------------------------------------------------
+    def result(self, job_id: str):
+        with self._connect() as conn:
+            row = conn.execute("SELECT result FROM jobs WHERE id = ? AND status = 'done'", (job_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def jobs(self, status: str | None = None) -> list[dict]:
+        query = "SELECT id, kind, status, attempts, owner, lease_expires, error FROM jobs"
+        args = ()
+        if status:
+            query += " WHERE status = ?"
+            args = (status,)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY created, id", args).fetchall()
+        keys = ("id", "kind", "status", "attempts", "owner", "lease_expires", "error")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            checkpoints = conn.execute("SELECT COUNT(*) FROM agent_outputs").fetchone()[0]
+        return {
+            "queued": counts.get("queued", 0),
+            "leased": counts.get("leased", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "agent_checkpoints": checkpoints,
+        }
+
+    def unfinished(self) -> int:
+        stats = self.stats()
+        return stats["queued"] + stats["leased"]
+
+
+# ----------------------------------------------------------------------
+# Batch helpers
+# ----------------------------------------------------------------------
+
+def retrieval_job_id(agent_name: str, company: str) -> str:
+    return f"retrieval|{agent_name}|{company_id(company)}"
+
+
+def pair_job_id(target_company: str, origin_company: str) -> str:
+    return f"pair|{company_id(target_company)}|{company_id(origin_company)}"
+
+
+def enqueue_batch(queue: JobQueue, pairs: list[tuple[str, str]], max_steps: int = 24,
+                  prescreen_threshold: float | None = None, deadline_s: float | None = None) -> int:
+    """
+    One retrieval job per company and one pair job per pair (idempotent).
+    Returns the number of new jobs.
+    """
+    added = 0
+    for target_company, origin_company in canonical_pairs(pairs):
+        companies = {"target_company": target_company, "origin_company": origin_company}
+        depends_on = []
+        for agent_name, role in RETRIEVAL_ROLES.items():
+            job_id = retrieval_job_id(agent_name, companies[role])
+            added += queue.enqueue(job_id, "retrieval", {"agent": agent_name, role: companies[role]})
+            depends_on.append(job_id)
+        added += queue.enqueue(
+            pair_job_id(target_company, origin_company),
+            "pair",
+            {
+                "target_company": target_company,
+                "origin_company": origin_company,
+                "max_steps": max_steps,
+                "prescreen_threshold": prescreen_threshold,
+                "deadline_s": deadline_s,
+            },
+            depends_on=depends_on,
+        )
+    print(f"📥 Enqueued {added} new jobs for {len(pairs)} pairs")
+    return added
+
+
+def collect_results(queue: JobQueue, pairs: list[tuple[str, str]]) -> dict:
+    """
+    pair -> summary (None while not done).
+    """
+    return {
+        f"{t} -> {o}": queue.result(pair_job_id(t, o))
+        for t, o in pairs
+    }
+
+
+# ----------------------------------------------------------------------
+# Worker
+# ----------------------------------------------------------------------
+
+def _run_job(queue: JobQueue, job: dict, output_dir: str):
+    payload = job["payload"]
+
+    if job["kind"] == "retrieval":
+        agent_name = payload["agent"]
+        role = RETRIEVAL_ROLES[agent_name]
+        output = AGENT_SPEC[agent_name]["fn"](**{role: payload[role]})
+        if isinstance(output, dict) and "error" in output:
+            raise RuntimeError(output["error"])
+        return output
+
+    if job["kind"] == "pair":
+        target_company, origin_company = payload["target_company"], payload["origin_company"]
+        initial_outputs = {
+            "pain_point_detective": queue.result(retrieval_job_id("pain_point_detective", target_company)),
+            "value_prop_engineer": queue.result(retrieval_job_id("value_prop_engineer", origin_company)),
+            # Agents finished by an earlier (crashed) attempt
+            **queue.agent_outputs(job["id"]),
+        }
+        if job["attempt"] > 1:
+            print(f"🔁 Attempt {job['attempt']} of {job['id']}, reusing {sorted(initial_outputs)}")
+        return CRO_hierarchical_orchestrator(
+            target_company=target_company,
+            origin_company=origin_company,
+            output_dir=output_dir,
+            max_steps=payload["max_steps"],
+            initial_outputs=initial_outputs,
+            prescreen_threshold=payload["prescreen_threshold"],
+            deadline_s=payload["deadline_s"],
+            on_output=lambda agent_name, output: queue.save_agent_output(job["id"], agent_name, output),
+        )
+
+    raise ValueError(f"Unknown job kind: {job['kind']}")
+
+
+def run_worker(
+    queue: JobQueue,
+    output_dir: str = "HH-exchanges",
+    worker_id: str | None = None,
+    poll_interval: float = 5.0,
+    max_jobs: int | None = None,
+    exit_when_idle: bool = True,
+) -> dict:
+    """
+    Lease and run jobs until the queue is drained (or max_jobs are done).
+
+    Args:
+        queue: shared JobQueue
+        output_dir: str — Where pairs store their step-by-step JSON (shared)
+        worker_id: str — Lease owner name (default: host-pid-random)
+        poll_interval: float — Wait between leases when nothing is runnable
+        max_jobs: int — Stop after this many jobs
+        exit_when_idle: bool — Stop when no job is queued or leased
+
+    Returns:
+        dict: counts of completed / duplicate / failed jobs of this worker
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    counts = {"completed": 0, "duplicate": 0, "failed": 0}
+    print(f"👷 Worker {worker_id} started")
+    if os.path.abspath(entity_index().path) == os.path.abspath(LOCAL_PATH):
+        print(f"⚠️ {worker_id} uses the local entity index {LOCAL_PATH}; set CRO_ENTITY_INDEX "
+              f"to the index shared by all workers, or company IDs may differ between them")
+
+    while max_jobs is None or sum(counts.values()) < max_jobs:
+        job = queue.lease(worker_id)
+        if job is None:
+            if exit_when_idle and queue.unfinished() == 0:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        print(f"▶️ {worker_id}: {job['id']} (attempt {job['attempt']})")
+        stop = threading.Event()
+
+        def beat(job_id=job["id"]):
+            while not stop.wait(queue.visibility_timeout / 3):
+                if not queue.heartbeat(job_id, worker_id):
+                    print(f"⚠️ Lease on {job_id} lost; result will only count if it is first")
+                    return
+
+        heartbeat = threading.Thread(target=beat, name=f"heartbeat-{job['id']}", daemon=True)
+        heartbeat.start()
+        try:
+            result = _run_job(queue, job, output_dir)
+        except Exception as e:
+            status = queue.fail(job["id"], worker_id, str(e))
+            print(f"❌ {job['id']} failed: {e} -> {status}")
+            counts["failed"] += 1
+            continue
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        if queue.complete(job["id"], worker_id, result):
+            counts["completed"] += 1
+        else:
+            print(f"↩️ {job['id']} was already completed by another worker")
+            counts["duplicate"] += 1
+
+    print(f"👷 Worker {worker_id} done: {counts}")
+    return counts
@@ -0,0 +1,523 @@
+"""
+Offline (batch API) mode for the CRO agents
+
+For overnight runs nobody waits on a single pair, so the synchronous
+`client.chat.completions.create` of every agent is replaced by batch jobs:
+
+1. every agent whose inputs are ready (per AGENT_SPEC) is run with a
+   deferring client: the first LLM call without a known answer raises
+   PendingLLMCall and the request is collected instead of sent
+2. the ready requests of ALL pairs are written to one JSONL batch file and
+   submitted through a pluggable BatchBackend
+3. once the batch completes, the answers are loaded and the agents are
+   re-run; known calls return instantly, the next new call is deferred
+4. repeat until every pair's DAG is complete
+
+Retrieval agents depend only on one company, so pain_point_detective runs
+once per target and value_prop_engineer once per origin, not once per pair.
+
+Answers are keyed by a hash of the request (cro.cassette.request_key), so
+a changed prompt is submitted again instead of being answered with a stale
+response. Successful answers are appended to
+`<output_dir>/_batches/responses.jsonl`, the batch in flight to
+`pending_batch.json`, and the agents' Tavily searches to `searches.jsonl`
+(every wave and a resumed run reuse them, so the prompts stay identical),
+so an interrupted run resumes without resubmitting anything. Failed
+requests are only kept in memory: the next run submits them again.
+"""
+
+import json
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Protocol
+
+from cro import metrics
+from cro.cassette import request_key
+from cro.entities import canonical_pairs, company_id
+
+from .agent_registry import AGENT_SPEC
+from .hierarchical_cro import pair_folder
+from .json_utils import save_json
+
+ROOT_INPUTS = ("target_company", "origin_company")
+ENDPOINT = "/v1/chat/completions"
+
+
+# ----------------------------------------------------------------------
+# Deferring client
+# ----------------------------------------------------------------------
+
+class PendingLLMCall(BaseException):
+    """
+    Raised inside an agent when its next LLM call has no answer yet.
+
+    Derives from BaseException so the agents' `except Exception` blocks
+    let it through instead of turning it into an error output.
+    """
+
+    def __init__(self, custom_id: str, body: dict):
+        super().__init__(custom_id)
+        self.custom_id = custom_id
+        self.body = body
+
+
+def _namespace(value):
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_namespace(v) for v in value]
+    return value
+
+
+class DeferringClient:
+    """
+    Drop-in for the agents' OpenAI client (only chat.completions.create).
+
+    Calls are numbered per agent run; call i of node N has the custom_id
+    "N#i". Answers are looked up by request hash: known answers are
+    returned, unknown ones raise PendingLLMCall.
+    """
+
+    def __init__(self, responses: dict):
+        self.responses = responses
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.node_id = None
+        self.call_index = 0
+
+    def start(self, node_id: str):
+        self.node_id = node_id
+        self.call_index = 0
+
+    def _create(self, **kwargs):
+        custom_id = f"{self.node_id}#{self.call_index}"
+        self.call_index += 1
+
+        key = request_key("openai.chat", kwargs)
+        if key not in self.responses:
+            raise PendingLLMCall(custom_id, kwargs)
+
+        result = self.responses[key]
+        if result.get("error"):
+            raise RuntimeError(f"Batch request {custom_id} failed: {result['error']}")
+        return _namespace(result["body"])
+
+
+class SearchCache:
+    """
+    The agents' Tavily searches of an offline run, each answered once.
+
+    Agents are re-run in every wave; without the cache each wave would
+    search again (and could get different results, i.e. different prompts
+    than the ones already submitted). Stored in a JSONL file so a resumed
+    run reuses them as well.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.results = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.results[record["key"]] = record["result"]
+
+    def client(self, tavily_cls):
+        cache = self
+
+        class CachedTavilyClient:
+            def __init__(self, *args, **kwargs):
+                self._live = None
+                self._factory = lambda: tavily_cls(*args, **kwargs)
+
+            def search(self, query: str, **kwargs):
+                key = request_key("tavily.search", {"query": query, **kwargs})
+                if key not in cache.results:
+                    if self._live is None:
+                        self._live = self._factory()
+                    result = self._live.search(query=query, **kwargs)
+                    cache.results[key] = result
+                    with open(cache.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps({"key": key, "result": result}, ensure_ascii=False, default=str) + "\n")
+                return cache.results[key]
+
+        return CachedTavilyClient
+
+
+@contextmanager
+def deferred_agents(client: DeferringClient, searches: SearchCache | None = None):
+    """
+    Point the module-level `client` of every registered agent to `client`
+    (and their TavilyClient to `searches`, if given).
+    """
+    modules = {sys.modules[spec["fn"].__module__] for spec in AGENT_SPEC.values()}
+    originals = {m: m.client for m in modules if hasattr(m, "client")}
+    tavily = {m: m.TavilyClient for m in modules if searches is not None and hasattr(m, "TavilyClient")}
+    try:
+        for module in originals:
+            module.client = client
+        for module, tavily_cls in tavily.items():
+            module.TavilyClient = searches.client(tavily_cls)
+        yield client
+    finally:
+        for module, original in originals.items():
+            module.client = original
+        for module, tavily_cls in tavily.items():
+            module.TavilyClient = tavily_cls
+
+
+# ----------------------------------------------------------------------
+# Batch backends
+# ----------------------------------------------------------------------
+
+class BatchBackend(Protocol):
+    """
+    Anything that can run a JSONL file of chat completion requests.
+    """
+
+    def submit(self, input_path: str) -> str:
+        """Submit a request file, return a batch id."""
+
+    def status(self, batch_id: str) -> str:
+        """One of "in_progress", "completed", "failed" (or a provider status)."""
+
+    def results(self, batch_id: str) -> dict:
+        """custom_id -> {"body": response body} or {"error": message}."""
+
+
+def _parse_output_lines(lines) -> dict:
+    results = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code", 200) != 200:
+            results[record["custom_id"]] = {"error": record.get("error") or response.get("body")}
+        else:
+            results[record["custom_id"]] = {"body": response["body"]}
+    return results
+
+
+class OpenAIBatchBackend:
+    """
+    OpenAI Batch API (https://platform.openai.com/docs/guides/batch).
+    """
+
+    def __init__(self, client=None, completion_window: str = "24h"):
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=ENDPOINT,
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> dict:
+        batch = self.client.batches.retrieve(batch_id)
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                results.update(_parse_output_lines(self.client.files.content(file_id).text.splitlines()))
+        return results
+
+
+class LocalFileBatchBackend:
+    """
+    File-based stand-in for tests and dry runs: answers every request at
+    submit time and writes an output file in the Batch API format.
+
+    Args:
+        directory: where output files are written
+        responder: request body -> response content string
+                   (default: an empty JSON object)
+    """
+
+    def __init__(self, directory: str, responder: Callable[[dict], str] | None = None):
+        self.directory = directory
+        self.responder = responder or (lambda body: "{}")
+        os.makedirs(directory, exist_ok=True)
+
+    def _output_path(self, batch_id: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}_output.jsonl")
+
+    def submit(self, input_path: str) -> str:
+        batch_id = f"local_{uuid.uuid4().hex[:12]}"
+        with open(input_path, encoding="utf-8") as src, \
+                open(self._output_path(batch_id), "w", encoding="utf-8") as out:
+            for line in src:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                body = {
+                    "model": request["body"].get("model"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": self.responder(request["body"])},
+                    }],
+                }
+                out.write(json.dumps({
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 200, "body": body},
+                    "error": None,
+                }, ensure_ascii=False) + "\n")
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        return "completed" if os.path.exists(self._output_path(batch_id)) else "failed"
+
+    def results(self, batch_id: str) -> dict:
+        with open(self._output_path(batch_id), encoding="utf-8") as f:
+            return _parse_output_lines(f)
+
+
+# ----------------------------------------------------------------------
+# DAG over AGENT_SPEC
+# ----------------------------------------------------------------------
+
+def agent_scopes() -> dict:
+    """
+    agent -> root inputs it depends on (directly or through other agents).
+    pain_point_detective -> {"target_company"}, match_scorer -> both, ...
+    """
+    scopes = {}
+
+    def scope(name):
+        if name not in scopes:
+            sources = AGENT_SPEC[name]["inputs"].values()
+            scopes[name] = frozenset().union(
+                *({s} if s in ROOT_INPUTS else scope(s) for s in sources)
+            )
+        return scopes[name]
+
+    for name in AGENT_SPEC:
+        scope(name)
+    return scopes
+
+
+def _node_id(agent_name: str, scope: frozenset, target_company: str, origin_company: str) -> str:
+    return "|".join([
+        agent_name,
+        company_id(target_company) if "target_company" in scope else "",
+        company_id(origin_company) if "origin_company" in scope else "",
+    ])
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+def _load_responses(path: str) -> dict:
+    """
+    Request hash -> successful answer. Errors (and records of older runs
+    without a request hash) are skipped, so those requests are submitted again.
+    """
+    responses = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if record.get("key") and not record["result"].get("error"):
+                        responses[record["key"]] = record["result"]
+    return responses
+
+
+def _append_responses(path: str, results: dict, keys: dict) -> dict:
+    """
+    Store the successful answers of a batch (custom_id -> result) by request
+    hash; returns all answers, errors included, keyed by request hash.
+    """
+    by_key = {}
+    with open(path, "a", encoding="utf-8") as f:
+        for custom_id, result in results.items():
+            key = keys.get(custom_id)
+            if key is None:
+                continue
+            by_key[key] = result
+            if not result.get("error"):
+                f.write(json.dumps({"custom_id": custom_id, "key": key, "result": result}, ensure_ascii=False) + "\n")
+    return by_key
+
+
+def _wait(backend: BatchBackend, batch_id: str, poll_interval: float, timeout: float | None) -> str:
+    started = time.monotonic()
+    while True:
+        status = backend.status(batch_id)
+        if status in ("completed", "failed", "expired", "cancelled"):
+            return status
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise TimeoutError(f"Batch {batch_id} still '{status}' after {timeout:.0f}s")
+        print(f"⏳ Batch {batch_id}: {status}")
+        time.sleep(poll_interval)
+
+
+def CRO_offline_orchestrator(
+    pairs: list[tuple[str, str]],
+    backend: BatchBackend,
+    output_dir: str = "HH-exchanges",
+    agents: list[str] | None = None,
+    poll_interval: float = 60.0,
+    timeout: float | None = None,
+    max_waves: int = 50,
+):
+    """
+    Run the agent DAG for many pairs through a batch backend.
+
+    Unlike CRO_hierarchical_orchestrator there is no LLM decider: every
+    agent in `agents` runs as soon as the outputs it needs exist.
+
+    Args:
+        pairs: list of (target_company, origin_company)
+        backend: BatchBackend (OpenAIBatchBackend, LocalFileBatchBackend, ...)
+        output_dir: str — Where to store batch files and per-pair JSON
+        agents: agents to run (default: all of AGENT_SPEC)
+        poll_interval: seconds between status checks
+        timeout: max seconds to wait for one batch (None = no limit)
+        max_waves: safety cap on submitted batches
+
+    Returns:
+        dict: one summary per pair + wave statistics
+    """
+
+    pairs = canonical_pairs(pairs)
+    print(f"=== CRO Offline — {len(pairs)} pairs ===")
+
+    agents = list(agents or AGENT_SPEC)
+    scopes = agent_scopes()
+    batch_dir = os.path.join(output_dir, "_batches")
+    os.makedirs(batch_dir, exist_ok=True)
+    responses_path = os.path.join(batch_dir, "responses.jsonl")
+    pending_path = os.path.join(batch_dir, "pending_batch.json")
+
+    responses = _load_responses(responses_path)
+    client = DeferringClient(responses)
+    searches = SearchCache(os.path.join(batch_dir, "searches.jsonl"))
+
+    # node id -> output, shared across pairs
+    outputs = {}
+    waves = []
+
+    # A batch submitted by an interrupted run is collected first
+    if os.path.exists(pending_path):
+        with open(pending_path, encoding="utf-8") as f:
+            pending = json.load(f)
+        print(f"🔁 Resuming batch {pending['batch_id']}")
+        if _wait(backend, pending["batch_id"], poll_interval, timeout) == "completed":
+            results = backend.results(pending["batch_id"])
+            responses.update(_append_responses(responses_path, results, pending.get("keys", {})))
+        os.remove(pending_path)
+
+    for wave in range(1, max_waves + 1):
+
+        requests = {}
+        with deferred_agents(client, searches):
+            progressed = True
+            # Agents unblocked by answers already known run in the same wave
+            while progressed:
+                progressed = False
+                for target_company, origin_company in pairs:
+                    roots = {"target_company": target_company, "origin_company": origin_company}
+                    for agent_name in agents:
+                        node_id = _node_id(agent_name, scopes[agent_name], target_company, origin_company)
+                        if node_id in outputs or node_id in requests:
+                            continue
+
+                        call_args = {}
+                        for arg_name, source in AGENT_SPEC[agent_name]["inputs"].items():
+                            if source in ROOT_INPUTS:
+                                call_args[arg_name] = roots[source]
+                            else:
+                                source_id = _node_id(source, scopes[source], target_company, origin_company)
+                                if source_id not in outputs:
+                                    break
+                                call_args[arg_name] = outputs[source_id]
+                        else:
+                            client.start(node_id)
+                            try:
+                                outputs[node_id] = AGENT_SPEC[agent_name]["fn"](**call_args)
+                                progressed = True
+                            except PendingLLMCall as pending:
+                                requests[node_id] = pending
+                            except Exception as e:
+                                outputs[node_id] = {"error": str(e)}
+                                progressed = True
+
+        if not requests:
+            break
+
+        # ----------------------------------------------------------
+        # Submit one batch with every ready request
+        # ----------------------------------------------------------
+        input_path = os.path.join(batch_dir, f"wave_{wave:02d}_input.jsonl")
+        with open(input_path, "w", encoding="utf-8") as f:
+            for pending in requests.values():
+                f.write(json.dumps({
+                    "custom_id": pending.custom_id,
+                    "method": "POST",
+                    "url": ENDPOINT,
+                    "body": pending.body,
+                }, ensure_ascii=False) + "\n")
+
+        keys = {pending.custom_id: request_key("openai.chat", pending.body) for pending in requests.values()}
+        batch_id = backend.submit(input_path)
+        save_json({"batch_id": batch_id, "input_path": input_path, "keys": keys}, pending_path)
+        print(f"📤 Wave {wave}: {len(requests)} requests in batch {batch_id}")
+        metrics.QUEUE_DEPTH.set(len(requests), queue="offline_batch")
+
+        status = _wait(backend, batch_id, poll_interval, timeout)
+        results = backend.results(batch_id) if status == "completed" else {}
+        # Requests without an answer become errors (in memory only) so their
+        # agents can finish in this run
+        for pending in requests.values():
+            results.setdefault(pending.custom_id, {"error": f"batch {status}"})
+        responses.update(_append_responses(responses_path, results, keys))
+        os.remove(pending_path)
+        metrics.QUEUE_DEPTH.set(0, queue="offline_batch")
+
+        waves.append({"wave": wave, "batch_id": batch_id, "status": status, "requests": len(requests)})
+
+    # ----------------------------------------------------------
+    # Per-pair files, same layout as the hierarchical orchestrator
+    # ----------------------------------------------------------
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    summaries = []
+    for target_company, origin_company in pairs:
+        folder = pair_folder(output_dir, target_company, origin_company)
+        final_outputs = {}
+        for step, agent_name in enumerate(agents, start=1):
+            node_id = _node_id(agent_name, scopes[agent_name], target_company, origin_company)
+            if node_id in outputs:
+                final_outputs[agent_name] = outputs[node_id]
+                save_json(outputs[node_id], f"{folder}/{step:02d}_{agent_name}.json")
+
+        summary = {
+            "pair": f"{target_company} -> {origin_company}",
+            "timestamp": timestamp,
+            "mode": "offline",
+            "final_outputs": final_outputs,
+        }
+        save_json(summary, f"{folder}/00_summary_offline.json")
+        summaries.append(summary)
+
+    save_json({"waves": waves, "pairs": len(pairs)}, os.path.join(batch_dir, "00_offline_summary.json"))
+
+    print(f"\n✅ CRO offline complete: {len(waves)} batches, "
+          f"{sum(w['requests'] for w in waves)} requests.")
+    return {"waves": waves, "results": summaries}
@@ -0,0 +1,159 @@
+"""
+Local pre-screening of target/origin pairs (before match_scorer)
+
+- Embeds pain points and value arguments locally (hashed word + char n-gram
+  vectors, no network, no model download)
+- Scores every target x origin pair of a batch in one matrix product
+- Pairs below the threshold are dropped (or ranked last) before any
+  gpt-4.1 call in match_scorer
+
+A better local embedding (e.g. a sentence-transformers model) can be passed
+as `embed`; it only has to map a list of strings to a 2-D array.
+"""
+
+import re
+import zlib
+
+import numpy as np
+
+DIM = 4096
+
+_WORD = re.compile(r"[a-z][a-z0-9\-]{2,}")
+_STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "are", "was", "were", "their",
+    "its", "our", "into", "over", "has", "have", "not", "but", "can", "which", "more",
+    "company", "companies", "customers", "customer",
+}
+
+
+# ----------------------------------------------------------------------
+# Text extraction (same fields match_scorer reads)
+# ----------------------------------------------------------------------
+
+def pain_texts(pain_json: dict) -> list[str]:
+    pain_data = (pain_json or {}).get("pain_points") or {}
+    if isinstance(pain_data, dict):
+        items = pain_data.get("pain_points") or []
+        if not items and pain_data.get("raw_text"):
+            items = [pain_data["raw_text"]]
+        return [i if isinstance(i, str) else str(i) for i in items]
+    return [str(pain_data)] if pain_data else []
+
+
+def value_texts(value_json: dict) -> list[str]:
+    value_data = (value_json or {}).get("value_proposition") or {}
+    if isinstance(value_data, dict):
+        items = value_data.get("value_arguments") or []
+        if not items and value_data.get("summary"):
+            items = [value_data["summary"]]
+        if not items and value_data.get("raw_text"):
+            items = [value_data["raw_text"]]
+        return [i if isinstance(i, str) else str(i) for i in items]
+    return [str(value_data)] if value_data else []
+
+
+# ----------------------------------------------------------------------
+# Local embedding
+# ----------------------------------------------------------------------
+
+def _features(text: str) -> list[str]:
+    words = [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+    features = list(words)
+    for w in words:
+        padded = f"#{w}#"
+        features.extend(padded[i:i + 4] for i in range(len(padded) - 3))
+    return features
+
+
+def hashing_embed(texts: list[str], dim: int = DIM) -> np.ndarray:
+    """
+    Signed feature hashing of words and char 4-grams, log-TF, L2-normalized.
+    """
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for feature in _features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            matrix[row, h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _stack(groups: list[list[str]], embed) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Embed all texts of all groups at once.
+    Returns (vectors, group start offsets); empty groups get one empty text.
+    """
+    texts, starts = [], []
+    for items in groups:
+        starts.append(len(texts))
+        texts.extend(items or [""])
+    return embed(texts), np.asarray(starts, dtype=np.int64)
+
+
+# ----------------------------------------------------------------------
+# Scoring
+# ----------------------------------------------------------------------
+
+def similarity_matrix(pain_jsons: list[dict], value_jsons: list[dict], embed=hashing_embed) -> np.ndarray:
+    """
+    Score every target (pain_json) against every origin (value_json).
+
+    A pair score is the mean, over the target's pain points, of the best
+    cosine similarity with any value argument of the origin, scaled to 0–100.
+
+    Returns:
+        np.ndarray: shape (len(pain_jsons), len(value_jsons))
+    """
+    pain_vectors, pain_starts = _stack([pain_texts(p) for p in pain_jsons], embed)
+    value_vectors, value_starts = _stack([value_texts(v) for v in value_jsons], embed)
+
+    sims = pain_vectors @ value_vectors.T                             # (all pains, all values)
+    best = np.maximum.reduceat(sims, value_starts, axis=1)            # (all pains, origins)
+    counts = np.diff(np.append(pain_starts, len(pain_vectors)))
+    per_target = np.add.reduceat(best, pain_starts, axis=0) / counts[:, None]
+    return np.clip(per_target, 0.0, 1.0) * 100.0
+
+
+def prescreen_pairs(
+    pairs: list[tuple[str, str]],
+    pain_outputs: dict,
+    value_outputs: dict,
+    threshold: float = 10.0,
+    embed=hashing_embed,
+) -> list[dict]:
+    """
+    Pre-screen a batch of (target_company, origin_company) pairs.
+
+    Args:
+        pairs: pairs to screen
+        pain_outputs: target_company -> pain_point_detective output
+        value_outputs: origin_company -> value_prop_engineer output
+        threshold: minimum score (0–100) for a pair to pass
+
+    Returns:
+        list[dict]: {"target_company", "origin_company", "prescreen_score", "passed"},
+                    passing pairs first, each group best score first
+    """
+    targets = list(dict.fromkeys(t for t, _ in pairs))
+    origins = list(dict.fromkeys(o for _, o in pairs))
+    scores = similarity_matrix(
+        [pain_outputs.get(t) or {} for t in targets],
+        [value_outputs.get(o) or {} for o in origins],
+        embed=embed,
+    )
+    t_index = {t: i for i, t in enumerate(targets)}
+    o_index = {o: j for j, o in enumerate(origins)}
+
+    ranked = []
+    for target, origin in pairs:
+        score = float(scores[t_index[target], o_index[origin]])
+        ranked.append({
+            "target_company": target,
+            "origin_company": origin,
+            "prescreen_score": round(score, 2),
+            "passed": score >= threshold,
+        })
+    ranked.sort(key=lambda r: (not r["passed"], -r["prescreen_score"]))
+    return ranked
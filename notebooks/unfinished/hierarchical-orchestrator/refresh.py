@@ -0,0 +1,198 @@
+"""
+Incremental refresh of earlier CRO runs
+
+Weekly re-analysis without re-running every agent:
+
+1. only the retrieval (Tavily search) of pain_point_detective and
+   value_prop_engineer is re-run, once per company
+2. the results are fingerprinted (cro.fingerprints) and compared with the
+   evidence_fingerprint of the company's last saved output
+3. unchanged company: the saved output is reused (no LLM call);
+   changed company: only its retrieval agent is re-run, on the new results
+4. per pair, the agents downstream of a changed retrieval agent
+   (agent_registry.downstream_agents) are invalidated; everything else is
+   passed to CRO_hierarchical_orchestrator as initial_outputs
+5. a pair whose evidence did not change is not run at all: its saved
+   summary gets a "refresh": {"status": "no_change"} marker
+
+    from cro.orchestrator.refresh import CRO_refresh_orchestrator
+    CRO_refresh_orchestrator([("swissre.com", "outsystems.com")], output_dir="HH-exchanges")
+"""
+
+import os
+from datetime import datetime
+
+from cro.agents.pain_point_detective import pain_point_search
+from cro.agents.value_prop_engineer import value_prop_search
+from cro.entities import canonical_pairs
+from cro.fingerprints import evidence_fingerprint, source_hashes
+
+from .agent_registry import AGENT_SPEC, downstream_agents
+from .hierarchical_cro import CRO_hierarchical_orchestrator, load_summary, pair_folder, resumable_outputs
+from .json_utils import save_json
+
+# retrieval agent -> (company role, retrieval-only function)
+RETRIEVAL_AGENTS = {
+    "pain_point_detective": ("target_company", pain_point_search),
+    "value_prop_engineer": ("origin_company", value_prop_search),
+}
+
+
+def _previous_outputs(pairs: list[tuple[str, str]], output_dir: str) -> tuple[dict, dict]:
+    """
+    Saved pair summaries, and the last saved retrieval output of every company.
+    """
+    summaries, retrieval = {}, {}
+    for target_company, origin_company in pairs:
+        summary = load_summary(output_dir, target_company, origin_company)
+        summaries[(target_company, origin_company)] = summary
+        if not summary:
+            continue
+        companies = {"target_company": target_company, "origin_company": origin_company}
+        for agent_name, (role, _) in RETRIEVAL_AGENTS.items():
+            output = summary.get("final_outputs", {}).get(agent_name)
+            if isinstance(output, dict) and "error" not in output:
+                retrieval.setdefault((agent_name, companies[role]), output)
+    return summaries, retrieval
+
+
+def refresh_retrieval(agent_name: str, company: str, previous: dict | None,
+                      max_results: int = 5) -> tuple[dict, bool]:
+    """
+    Re-run the search of one retrieval agent and compare fingerprints.
+
+    Returns:
+        (output, changed): the previous output if the evidence is unchanged
+        or the search failed, otherwise the agent's new output (built on the
+        same search results); {"error": ...} if the search failed and there
+        is no previous output
+    """
+    role, search_fn = RETRIEVAL_AGENTS[agent_name]
+    try:
+        search = search_fn(company, max_results=max_results)
+    except Exception as e:
+        print(f"⚠️ Search failed for {agent_name} / {company}: {e}")
+        if previous:
+            return previous, False
+        return {"error": f"Search failed: {e}"}, True
+    fingerprint = evidence_fingerprint(source_hashes(search.get("results", []) if search else []))
+
+    if previous and previous.get("evidence_fingerprint") == fingerprint:
+        return previous, False
+
+    output = AGENT_SPEC[agent_name]["fn"](**{role: company}, max_results=max_results, search=search)
+    return output, True
+
+
+def CRO_refresh_orchestrator(
+    pairs: list[tuple[str, str]],
+    output_dir: str = "HH-exchanges",
+    max_steps: int = 24,
+    max_results: int = 5,
+    deadline_s: float | None = None,
+):
+    """
+    Refresh earlier runs of `pairs`, re-running only what new evidence invalidates.
+
+    Args:
+        pairs: list of (target_company, origin_company)
+        output_dir: str — Output directory of the earlier runs (updated in place)
+        max_steps: int — Safety cap per pair
+        max_results: int — Search results per company (as in the retrieval agents)
+        deadline_s: float — Time budget per re-run pair (see CRO_hierarchical_orchestrator)
+
+    Returns:
+        dict: per pair, its status ("no_change", "refreshed" or "new") and summary
+    """
+
+    pairs = canonical_pairs(pairs)
+    print(f"=== CRO Refresh — {len(pairs)} pairs ===")
+    checked_at = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+    summaries, previous_retrieval = _previous_outputs(pairs, output_dir)
+
+    # ----------------------------------------------------------
+    # Retrieval only, once per company
+    # ----------------------------------------------------------
+    retrieval, changed = {}, set()
+    for target_company, origin_company in pairs:
+        companies = {"target_company": target_company, "origin_company": origin_company}
+        for agent_name, (role, _) in RETRIEVAL_AGENTS.items():
+            key = (agent_name, companies[role])
+            if key in retrieval:
+                continue
+            retrieval[key], is_changed = refresh_retrieval(
+                agent_name, companies[role], previous_retrieval.get(key), max_results=max_results
+            )
+            if is_changed:
+                changed.add(key)
+
+    print(f"🔎 Evidence changed for {len(changed)}/{len(retrieval)} company retrievals")
+
+    # ----------------------------------------------------------
+    # Per pair: skip, or re-run only the invalidated agents
+    # ----------------------------------------------------------
+    results = []
+    for target_company, origin_company in pairs:
+        companies = {"target_company": target_company, "origin_company": origin_company}
+        keys = {agent_name: (agent_name, companies[role]) for agent_name, (role, _) in RETRIEVAL_AGENTS.items()}
+        # Failed retrievals are left to the orchestrator, which runs the agent again
+        fresh = {agent_name: retrieval[key] for agent_name, key in keys.items()
+                 if isinstance(retrieval[key], dict) and "error" not in retrieval[key]}
+        changed_agents = sorted(agent_name for agent_name, key in keys.items() if key in changed)
+        fingerprints = {agent_name: output.get("evidence_fingerprint") for agent_name, output in fresh.items()}
+        failed = sorted(set(keys) - set(fresh))
+
+        previous = summaries[(target_company, origin_company)]
+        path = os.path.join(pair_folder(output_dir, target_company, origin_company), "00_summary_hierarchical.json")
+
+        if previous and not changed_agents and not failed and "stopped" not in previous and "degraded" not in previous:
+            print(f"✅ No change: {target_company} -> {origin_company}")
+            previous["refresh"] = {"status": "no_change", "checked_at": checked_at, "fingerprints": fingerprints}
+            save_json(previous, path)
+            results.append({"pair": f"{target_company} -> {origin_company}", "status": "no_change",
+                            "summary": previous})
+            continue
+
+        invalidated = downstream_agents(changed_agents)
+        reused = {
+            agent_name: output
+            for agent_name, output in (resumable_outputs(previous) if previous else {}).items()
+            if agent_name not in invalidated and agent_name not in RETRIEVAL_AGENTS
+        }
+        print(f"🔁 {target_company} -> {origin_company}: re-running {sorted(invalidated) or 'missing agents'}")
+
+        summary = CRO_hierarchical_orchestrator(
+            target_company=target_company,
+            origin_company=origin_company,
+            output_dir=output_dir,
+            max_steps=max_steps,
+            initial_outputs={**reused, **fresh},
+            deadline_s=deadline_s,
+        )
+        status = "refreshed" if previous else "new"
+        summary["refresh"] = {
+            "status": status,
+            "checked_at": checked_at,
+            "changed": changed_agents,
+            "invalidated": sorted(invalidated),
+            "reused": sorted(reused),
+            "failed": failed,
+            "fingerprints": fingerprints,
+        }
+        save_json(summary, path)
+        results.append({"pair": f"{target_company} -> {origin_company}", "status": status, "summary": summary})
+
+    refresh_summary = {
+        "checked_at": checked_at,
+        "changed": [f"{agent_name}:{company}" for agent_name, company in sorted(changed)],
+        "results": results,
+    }
+    save_json(
+        {**refresh_summary, "results": [{"pair": r["pair"], "status": r["status"]} for r in results]},
+        os.path.join(output_dir, "00_refresh_summary.json"),
+    )
+
+    unchanged = sum(r["status"] == "no_change" for r in results)
+    print(f"\n✅ CRO refresh complete: {unchanged}/{len(results)} pairs unchanged.")
+    return refresh_summary
@@ -0,0 +1,467 @@
+"""
+Long-running CRO orchestrator service (local HTTP, no dependencies)
+
+One process keeps everything warm between runs: imported agents and their
+OpenAI / Tavily clients, a worker pool, and a cache of retrieval outputs
+(pain_point_detective per target, value_prop_engineer per origin) shared by
+all jobs.
+
+Endpoints:
+    POST /jobs                 {"target_company", "origin_company", ...options}
+                               or {"pairs": [[target, origin], ...], ...options}
+                               options: max_steps, prescreen_threshold, deadline_s
+                               -> 202 {"job_id", "events"}; 429 + Retry-After when full
+    GET  /jobs/<id>            status and result
+    GET  /jobs/<id>/events     progress as server-sent events (Last-Event-ID resumes)
+    GET  /health               pool / queue state
+    GET  /metrics              cro.metrics in the Prometheus text format
+
+Progress events: "log" (every line the orchestrator prints for that job:
+decisions, agent calls, ...), "output" (each agent output), "status" and a
+final "done". A batch job streams the events of all its pairs (a pair's
+"done" arrives as "pair_done"), then its own "done".
+
+Backpressure: pairs wait in a bounded queue; a submission that does not fit
+(a batch needs one slot per pair) is rejected with 429.
+
+    python -m cro.orchestrator.service --port 8765 --workers 4
+    curl -N localhost:8765/jobs/<id>/events
+"""
+
+import argparse
+import io
+import json
+import queue
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cro import metrics
+from cro.entities import canonical_company, canonical_pairs, company_id
+
+from .agent_registry import AGENT_SPEC
+from .hierarchical_cro import CRO_hierarchical_orchestrator
+
+JOB_OPTIONS = ("max_steps", "prescreen_threshold", "deadline_s")
+
+
+# ----------------------------------------------------------------------
+# Jobs and their event streams
+# ----------------------------------------------------------------------
+
+class Job:
+    """
+    A pair run, or a batch of pair runs (children), with its event log.
+    """
+
+    def __init__(self, kind: str, request: dict, parent: "Job | None" = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.request = request
+        self.parent = parent
+        self.children = []
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.events = []
+        self._closing = False
+        self._cond = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def emit(self, event: str, data: dict):
+        if self.parent is not None:
+            # The batch stream ends with the batch's own "done"
+            self.parent.emit("pair_done" if event == "done" else event,
+                             {"job_id": self.id, "pair": self.request.get("pair"), **data})
+        with self._cond:
+            self.events.append((len(self.events) + 1, event, data))
+            self._cond.notify_all()
+
+    def set_status(self, status: str):
+        self.status = status
+        self.emit("status", {"status": status})
+
+    def finish(self, result=None, error: str | None = None):
+        self.result = result
+        self.error = error
+        self.finished = time.time()
+        self.set_status("failed" if error else "done")
+        self.emit("done", {"status": self.status, "error": error})
+        if self.parent is not None:
+            self.parent._child_finished()
+
+    def _child_finished(self):
+        with self._cond:
+            if self._closing or not all(child.done for child in self.children):
+                return
+            self._closing = True
+        self.finish(result=[
+            {"pair": child.request["pair"], "status": child.status, "error": child.error, "summary": child.result}
+            for child in self.children
+        ])
+
+    def events_after(self, last_id: int, timeout: float) -> list:
+        """
+        Events with id > last_id, waiting up to `timeout` for new ones.
+        """
+        with self._cond:
+            if len(self.events) <= last_id and not self.done:
+                self._cond.wait(timeout)
+            return self.events[last_id:]
+
+    def describe(self, with_result: bool = True) -> dict:
+        info = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "request": self.request,
+            "created": self.created,
+            "finished": self.finished,
+            "events": len(self.events),
+        }
+        if self.children:
+            info["children"] = [child.id for child in self.children]
+        if with_result:
+            info["result"] = self.result
+            info["error"] = self.error
+        return info
+
+
+class _ThreadOutput(io.TextIOBase):
+    """
+    sys.stdout replacement: lines printed by a job's thread become "log"
+    events of that job (and still reach the console).
+    """
+
+    def __init__(self, console):
+        self.console = console
+        self.local = threading.local()
+
+    def write(self, text: str) -> int:
+        self.console.write(text)
+        job = getattr(self.local, "job", None)
+        if job is not None:
+            buffer = getattr(self.local, "buffer", "") + text
+            *lines, self.local.buffer = buffer.split("\n")
+            for line in lines:
+                if line.strip():
+                    job.emit("log", {"line": line})
+        return len(text)
+
+    def flush(self):
+        self.console.flush()
+
+    def attach(self, job: Job | None):
+        self.local.job = job
+        self.local.buffer = ""
+
+
+# ----------------------------------------------------------------------
+# Warm state
+# ----------------------------------------------------------------------
+
+class RetrievalCache:
+    """
+    Retrieval agent outputs per company, shared by all jobs of the service.
+    One computation per company at a time; failed outputs are not cached.
+    """
+
+    ROLES = {"pain_point_detective": "target_company", "value_prop_engineer": "origin_company"}
+
+    def __init__(self, ttl_s: float = 6 * 3600):
+        self.ttl_s = ttl_s
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, agent_name: str, company: str) -> dict:
+        key = (agent_name, company_id(company))
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] < self.ttl_s:
+                self.hits += 1
+                metrics.record_cache("service_retrieval", hit=True)
+                return entry[1]
+
+            self.misses += 1
+            metrics.record_cache("service_retrieval", hit=False)
+            output = AGENT_SPEC[agent_name]["fn"](**{self.ROLES[agent_name]: company})
+            if not (isinstance(output, dict) and "error" in output):
+                self._entries[key] = (time.time(), output)
+            return output
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class OrchestratorService:
+    """
+    Worker pool + bounded queue + job registry behind the HTTP API.
+
+    Args:
+        output_dir: where runs store their step-by-step JSON
+        max_workers: pairs running at the same time
+        max_queue: pairs waiting at most (beyond that: 429)
+        keep_jobs: finished jobs kept for GET /jobs/<id>
+        retrieval_ttl_s: how long cached retrieval outputs are reused
+    """
+
+    def __init__(self, output_dir: str = "HH-exchanges", max_workers: int = 4, max_queue: int = 32,
+                 keep_jobs: int = 500, retrieval_ttl_s: float = 6 * 3600):
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.keep_jobs = keep_jobs
+        self.retrieval = RetrievalCache(ttl_s=retrieval_ttl_s)
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.jobs = {}
+        self.running = 0
+        self._lock = threading.Lock()
+        self._output = None
+        self._workers = []
+
+    # ------------------------------------------------------------------
+    def start(self):
+        if not isinstance(sys.stdout, _ThreadOutput):
+            sys.stdout = _ThreadOutput(sys.stdout)
+        self._output = sys.stdout
+        for i in range(self.max_workers):
+            worker = threading.Thread(target=self._work, name=f"cro-service-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        return self
+
+    def stop(self):
+        for _ in self._workers:
+            self.queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+        if isinstance(sys.stdout, _ThreadOutput):
+            sys.stdout = sys.stdout.console
+
+    # ------------------------------------------------------------------
+    def submit(self, request: dict) -> Job:
+        """
+        Queue a pair or batch job. Raises queue.Full when it does not fit.
+        """
+        options = {k: request[k] for k in JOB_OPTIONS if request.get(k) is not None}
+        if "pairs" in request:
+            pairs = [tuple(pair) for pair in request["pairs"]]
+            if not pairs or any(len(pair) != 2 for pair in pairs):
+                raise ValueError("'pairs' must be a non-empty list of [target_company, origin_company]")
+            pairs = canonical_pairs(pairs)
+            job = Job("batch", {"pairs": [list(p) for p in pairs], **options})
+            job.children = [
+                Job("pair", {"pair": f"{t} -> {o}", "target_company": t, "origin_company": o, **options}, parent=job)
+                for t, o in pairs
+            ]
+        elif request.get("target_company") and request.get("origin_company"):
+            t, o = canonical_company(request["target_company"]), canonical_company(request["origin_company"])
+            job = Job("pair", {"pair": f"{t} -> {o}", "target_company": t, "origin_company": o, **options})
+        else:
+            raise ValueError("Provide target_company and origin_company, or pairs")
+
+        runs = job.children or [job]
+        with self._lock:
+            free = self.queue.maxsize - self.queue.qsize()
+            if len(runs) > free:
+                raise queue.Full(f"{len(runs)} pairs do not fit, {free} queue slots free")
+            self._register(job)
+            for run in runs:
+                self._register(run)
+                self.queue.put_nowait(run)
+            metrics.QUEUE_DEPTH.set(self.queue.qsize(), queue="service")
+        return job
+
+    def _register(self, job: Job):
+        self.jobs[job.id] = job
+        if len(self.jobs) > self.keep_jobs:
+            for job_id in [j.id for j in self.jobs.values() if j.done][: len(self.jobs) - self.keep_jobs]:
+                del self.jobs[job_id]
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            metrics.QUEUE_DEPTH.set(self.queue.qsize(), queue="service")
+            with self._lock:
+                self.running += 1
+            self._output.attach(job)
+            try:
+                if job.parent is not None and job.parent.status == "queued":
+                    job.parent.set_status("running")
+                job.set_status("running")
+                job.finish(result=self._run_pair(job))
+            except BaseException as e:   # a worker must survive anything a run raises
+                job.finish(error=f"{type(e).__name__}: {e}")
+            finally:
+                self._output.attach(None)
+                with self._lock:
+                    self.running -= 1
+
+    def _run_pair(self, job: Job) -> dict:
+        request = job.request
+        t, o = request["target_company"], request["origin_company"]
+        return CRO_hierarchical_orchestrator(
+            target_company=t,
+            origin_company=o,
+            output_dir=self.output_dir,
+            max_steps=request.get("max_steps", 24),
+            prescreen_threshold=request.get("prescreen_threshold"),
+            deadline_s=request.get("deadline_s"),
+            on_output=lambda agent_name, output: job.emit("output", {"agent": agent_name, "output": output}),
+            prefetch=lambda: self._retrieval(t, o),
+        )
+
+    def _retrieval(self, t: str, o: str) -> dict:
+        """
+        Cached retrieval outputs of a pair (run inside the pair's deadline and
+        budget); a failed retrieval is left to the orchestrator.
+        """
+        outputs = {}
+        for agent_name, company in (("pain_point_detective", t), ("value_prop_engineer", o)):
+            try:
+                outputs[agent_name] = self.retrieval.get(agent_name, company)
+            except Exception as e:
+                print(f"⚠️ Retrieval {agent_name} failed for {company}: {e}")
+        return outputs
+
+    def health(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "running": self.running,
+            "queued": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "jobs": len(self.jobs),
+            "retrieval_cache": self.retrieval.stats(),
+        }
+
+
+# ----------------------------------------------------------------------
+# HTTP API
+# ----------------------------------------------------------------------
+
+def _handler(service: OrchestratorService, heartbeat_s: float):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _json(self, status: int, payload, headers: dict | None = None):
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                return self._json(404, {"error": "not found"})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                job = service.submit(json.loads(self.rfile.read(length) or b"{}"))
+            except queue.Full as e:
+                return self._json(429, {"error": "queue full", "detail": str(e)}, {"Retry-After": "30"})
+            except (ValueError, TypeError) as e:
+                return self._json(400, {"error": str(e)})
+            self._json(202, {"job_id": job.id, "events": f"/jobs/{job.id}/events",
+                             "children": [child.id for child in job.children]})
+
+        def do_GET(self):
+            parts = [p for p in self.path.split("?")[0].split("/") if p]
+            if parts == ["health"]:
+                return self._json(200, service.health())
+            if parts == ["metrics"]:
+                body = metrics.METRICS.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                return self.wfile.write(body)
+            if parts == ["jobs"]:
+                return self._json(200, [job.describe(with_result=False) for job in service.jobs.values()])
+            if len(parts) >= 2 and parts[0] == "jobs" and parts[1] in service.jobs:
+                job = service.jobs[parts[1]]
+                if len(parts) == 2:
+                    return self._json(200, job.describe())
+                if parts[2:] == ["events"]:
+                    return self._stream(job)
+            self._json(404, {"error": "not found"})
+
+        def _stream(self, job: Job):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            last_id = int(self.headers.get("Last-Event-ID") or 0)
+            try:
+                while True:
+                    events = job.events_after(last_id, timeout=heartbeat_s)
+                    if not events:
+                        if job.done:
+                            return
+                        self.wfile.write(b": keep-alive\n\n")
+                    for event_id, event, data in events:
+                        payload = json.dumps(data, ensure_ascii=False, default=str)
+                        self.wfile.write(f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n".encode("utf-8"))
+                        last_id = event_id
+                    self.wfile.flush()
+                    if job.done and last_id >= len(job.events):
+                        return
+            except (BrokenPipeError, ConnectionResetError):
+                return   # client went away; the job keeps running
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve_orchestrator(host: str = "127.0.0.1", port: int = 8765, output_dir: str = "HH-exchanges",
+                       max_workers: int = 4, max_queue: int = 32,
+                       heartbeat_s: float = 15.0) -> tuple[ThreadingHTTPServer, OrchestratorService]:
+    """
+    Start the service in background threads. Returns (server, service);
+    stop with server.shutdown() and service.stop().
+    """
+    service = OrchestratorService(output_dir=output_dir, max_workers=max_workers, max_queue=max_queue).start()
+    server = ThreadingHTTPServer((host, port), _handler(service, heartbeat_s))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="cro-service-http", daemon=True).start()
+    print(f"🛰️ CRO service at http://{host}:{server.server_address[1]} "
+          f"({max_workers} workers, queue {max_queue})")
+    return server, service
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CRO orchestrator service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output-dir", default="HH-exchanges")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue", type=int, default=32)
+    args = parser.parse_args()
+
+    server, service = serve_orchestrator(args.host, args.port, args.output_dir, args.workers, args.queue)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        service.stop()
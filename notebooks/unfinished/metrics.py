@@ -0,0 +1,318 @@
+"""
+In-process metrics for CRO runs, served in the Prometheus text format
+
+    from cro.metrics import serve_metrics, install_metrics
+    install_metrics()            # token / cost accounting on the OpenAI clients
+    serve_metrics(port=9464)     # http://localhost:9464/metrics
+    CRO_batch_orchestrator(...)
+
+Reported (all names prefixed with cro_):
+- pairs_completed_total, pairs_per_minute      throughput
+- agents_in_flight, queue_depth                 concurrency / backlog
+- agent_latency_seconds (histogram per agent)
+- agent_runs_total{agent, outcome}              ok / error / parse_failure / degraded / skipped
+- llm_tokens_total{model, kind}                 prompt / cached / completion
+- llm_cost_usd_total{model}                     estimated from PRICES
+- cache_requests_total{cache, result}           hit / miss (cassette, ...)
+- cache_hit_ratio{cache}
+
+No dependency: a tiny registry + http.server. Point a Prometheus scraper (or
+just a browser / curl) at the endpoint while a batch runs.
+"""
+
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from cro.wrapping import has_layer, install_lock
+
+# USD per 1M tokens: (input, cached input, output). List prices, override as needed.
+PRICES = {
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+THROUGHPUT_WINDOW_S = 300
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.label_names)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), [0.0, 0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            total[0] += value
+            total[1] += 1
+            self._values[key] = (counts, total)
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for key, (counts, (total, count)) in self._values.items():
+                for bound, n in zip(self.buckets, counts):
+                    out.append((f"{self.name}_bucket", key + (("le", bound),), n))
+                out.append((f"{self.name}_bucket", key + (("le", "+Inf"),), count))
+                out.append((f"{self.name}_sum", key, total))
+                out.append((f"{self.name}_count", key, count))
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.started = time.time()
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, value in metric.samples():
+                extra = ()
+                if key and isinstance(key[-1], tuple):   # histogram "le" label
+                    key, extra = key[:-1], key[-1]
+                names = metric.label_names + ((extra[0],) if extra else ())
+                values = key + ((extra[1],) if extra else ())
+                lines.append(f"{name}{_labels(names, values)} {float(value):g}")
+        return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+# CRO metrics
+# ----------------------------------------------------------------------
+
+METRICS = Registry()
+
+PAIRS_COMPLETED = METRICS.register(Counter("cro_pairs_completed_total", "Pairs finished by the orchestrator", ("outcome",)))
+PAIRS_PER_MINUTE = METRICS.register(Gauge("cro_pairs_per_minute", "Completed pairs per minute (last 5 minutes)"))
+AGENTS_IN_FLIGHT = METRICS.register(Gauge("cro_agents_in_flight", "Agents currently running", ("agent",)))
+QUEUE_DEPTH = METRICS.register(Gauge("cro_queue_depth", "Pairs or requests waiting in a batch run", ("queue",)))
+AGENT_LATENCY = METRICS.register(Histogram("cro_agent_latency_seconds", "Agent wall time", ("agent",)))
+AGENT_RUNS = METRICS.register(Counter("cro_agent_runs_total", "Agent runs by outcome", ("agent", "outcome")))
+LLM_TOKENS = METRICS.register(Counter("cro_llm_tokens_total", "LLM tokens", ("model", "kind")))
+LLM_COST = METRICS.register(Counter("cro_llm_cost_usd_total", "Estimated LLM cost (USD)", ("model",)))
+LLM_LATENCY = METRICS.register(Histogram("cro_llm_latency_seconds", "LLM call latency", ("model",)))
+CACHE_REQUESTS = METRICS.register(Counter("cro_cache_requests_total", "Cache lookups", ("cache", "result")))
+CACHE_HIT_RATIO = METRICS.register(Gauge("cro_cache_hit_ratio", "Cache hits / lookups", ("cache",)))
+
+_pair_times = deque()
+_pair_lock = threading.Lock()
+
+
+def _is_parse_failure(output) -> bool:
+    """
+    Agents keep unparseable LLM answers as {"raw_text": ...}.
+    """
+    if not isinstance(output, dict):
+        return False
+    return any(isinstance(v, dict) and "raw_text" in v for v in output.values())
+
+
+def agent_outcome(output) -> str:
+    if isinstance(output, dict) and output.get("degraded"):
+        return "degraded"
+    if isinstance(output, dict) and output.get("error"):
+        return "error"
+    if _is_parse_failure(output):
+        return "parse_failure"
+    return "ok"
+
+
+def record_agent(agent: str, seconds: float, output):
+    AGENT_LATENCY.observe(seconds, agent=agent)
+    AGENT_RUNS.inc(agent=agent, outcome=agent_outcome(output))
+
+
+def record_pair(outcome: str = "ok"):
+    PAIRS_COMPLETED.inc(outcome=outcome)
+    now = time.time()
+    with _pair_lock:
+        _pair_times.append(now)
+        while _pair_times[0] < now - THROUGHPUT_WINDOW_S:
+            _pair_times.popleft()
+        count = len(_pair_times)
+    # Over the window, or since start (at least a minute) for young processes
+    span = min(THROUGHPUT_WINDOW_S, max(now - METRICS.started, 60.0))
+    PAIRS_PER_MINUTE.set(round(count / (span / 60.0), 3))
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+    hits = CACHE_REQUESTS.value(cache=cache, result="hit")
+    misses = CACHE_REQUESTS.value(cache=cache, result="miss")
+    CACHE_HIT_RATIO.set(round(hits / (hits + misses), 4), cache=cache)
+
+
+def usage_tokens(usage) -> tuple[int, int, int]:
+    """
+    (uncached prompt, cached prompt, completion) tokens of an OpenAI `usage` object (or dict).
+    """
+    if usage is None:
+        return 0, 0, 0
+    get = usage.get if isinstance(usage, dict) else lambda k, d=None: getattr(usage, k, d)
+    prompt = get("prompt_tokens", 0) or 0
+    completion = get("completion_tokens", 0) or 0
+    details = get("prompt_tokens_details")
+    cached = (details.get("cached_tokens") if isinstance(details, dict)
+              else getattr(details, "cached_tokens", 0)) or 0
+    return prompt - cached, cached, completion
+
+
+def estimate_cost(model: str, prompt: int, cached: int, completion: int) -> float:
+    """
+    Estimated USD from PRICES (longest matching model prefix; 0.0 if unknown).
+    """
+    price = next((PRICES[m] for m in sorted(PRICES, key=len, reverse=True) if model.startswith(m)), None)
+    if price is None:
+        return 0.0
+    return (prompt * price[0] + cached * price[1] + completion * price[2]) / 1e6
+
+
+def record_usage(model: str, usage):
+    """
+    Count tokens and estimated cost from an OpenAI `usage` object (or dict).
+    """
+    if usage is None:
+        return
+    prompt, cached, completion = usage_tokens(usage)
+    LLM_TOKENS.inc(prompt, model=model, kind="prompt")
+    LLM_TOKENS.inc(cached, model=model, kind="cached")
+    LLM_TOKENS.inc(completion, model=model, kind="completion")
+    LLM_COST.inc(estimate_cost(model, prompt, cached, completion), model=model)
+
+
+# ----------------------------------------------------------------------
+# OpenAI client wrapper
+# ----------------------------------------------------------------------
+
+class MetricsOpenAI:
+    """
+    Wraps an OpenAI client: latency, tokens and cost of every chat completion.
+    """
+
+    def __init__(self, client):
+        self.wrapped = client
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        started = time.monotonic()
+        response = self.wrapped.chat.completions.create(**kwargs)
+        model = kwargs.get("model", "unknown")
+        LLM_LATENCY.observe(time.monotonic() - started, model=model)
+        record_usage(getattr(response, "model", None) or model, getattr(response, "usage", None))
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+
+def install_metrics(package: str = "cro"):
+    """
+    Wrap the OpenAI clients of the imported `package` modules (idempotent).
+    """
+    with install_lock:
+        for name, module in list(sys.modules.items()):
+            if module is None or not (name == package or name.startswith(package + ".")):
+                continue
+            client = getattr(module, "client", None)
+            if client is not None and hasattr(client, "chat") and not has_layer(client, MetricsOpenAI):
+                module.client = MetricsOpenAI(client)
+
+
+# ----------------------------------------------------------------------
+# HTTP endpoint
+# ----------------------------------------------------------------------
+
+def serve_metrics(port: int = 9464, host: str = "127.0.0.1", registry: Registry = METRICS) -> ThreadingHTTPServer:
+    """
+    Serve `registry` at http://host:port/metrics from a daemon thread.
+    Returns the server (call .shutdown() to stop it).
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="cro-metrics", daemon=True).start()
+    print(f"📈 Metrics at http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -1,12 +1,20 @@
 # --- Standard library ---
+import hashlib
+import json
 import os
+import re
+import threading
+import time
 import xml.etree.ElementTree as ET
 
 # --- Third-party ---
 import requests
 from dotenv import load_dotenv
 from tavily import TavilyClient
-import wikipedia
+
+# --- Local ---
+from cro.deadline import timeout_for
+from cro.wikipedia_client import WikipediaClient
 
 # Init env
 load_dotenv()  # load variables 
@@ -17,46 +25,172 @@ session.headers.update({
     "User-Agent": "LF-ADP-Agent/1.0 (mailto:your.email@example.com)"
 })
 
-def arxiv_search_tool(query: str, max_results: int = 5) -> list[dict]:
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+ARXIV_DELAY_SECONDS = 3.0   # arXiv API guidance: at most one request every 3 seconds
+ARXIV_MAX_PAGE_SIZE = 2000  # arXiv API maximum per request
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+OPENSEARCH = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+_arxiv_lock = threading.Lock()
+_arxiv_last_request = 0.0
+
+
+def _arxiv_throttle(delay: float):
     """
-    Searches arXiv for research papers matching the given query.
+    Block until `delay` seconds have passed since the previous arXiv request
+    (shared by all threads).
     """
-    url = f"https://export.arxiv.org/api/query?search_query=all:{query}&start=0&max_results={max_results}"
+    global _arxiv_last_request
+    with _arxiv_lock:
+        wait = _arxiv_last_request + delay - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _arxiv_last_request = time.monotonic()
+
+
+def _arxiv_entry(entry) -> dict:
+    link_pdf = None
+    for link in entry.findall(f"{ATOM}link"):
+        if link.attrib.get("title") == "pdf":
+            link_pdf = link.attrib.get("href")
+            break
+
+    return {
+        "title": " ".join(entry.findtext(f"{ATOM}title", "").split()),
+        "authors": [author.findtext(f"{ATOM}name") for author in entry.findall(f"{ATOM}author")],
+        "published": entry.findtext(f"{ATOM}published", "")[:10],
+        "url": entry.findtext(f"{ATOM}id"),
+        "summary": entry.findtext(f"{ATOM}summary", "").strip(),
+        "link_pdf": link_pdf,
+    }
 
-    try:
-        response = session.get(url, timeout=60)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        return [{"error": str(e)}]
 
-    try:
-        root = ET.fromstring(response.content)
-        ns = {'atom': 'http://www.w3.org/2005/Atom'}
+def _iter_feed(source, page: dict):
+    """
+    Incrementally parse one Atom page; yields entry dicts and records
+    opensearch:totalResults in page["total"]. Parsed elements are freed
+    as soon as they are yielded.
+    """
+    root = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if root is None:
+            root = elem
+        if event != "end":
+            continue
+        if elem.tag == f"{OPENSEARCH}totalResults":
+            page["total"] = int(elem.text or 0)
+        elif elem.tag == f"{ATOM}entry":
+            page["entries"] += 1
+            yield _arxiv_entry(elem)
+            root.clear()
+
+
+def _arxiv_page(params: dict, cache_dir: str | None, delay: float, page: dict):
+    """
+    Fetch one result page and yield its entries.
 
-        results = []
-        for entry in root.findall('atom:entry', ns):
-            title = entry.find('atom:title', ns).text.strip()
-            authors = [author.find('atom:name', ns).text for author in entry.findall('atom:author', ns)]
-            published = entry.find('atom:published', ns).text[:10]
-            url_abstract = entry.find('atom:id', ns).text
-            summary = entry.find('atom:summary', ns).text.strip()
-
-            link_pdf = None
-            for link in entry.findall('atom:link', ns):
-                if link.attrib.get('title') == 'pdf':
-                    link_pdf = link.attrib.get('href')
-                    break
+    With cache_dir, pages are stored on disk with their ETag/Last-Modified
+    and re-requested conditionally; a 304 is served from the stored page.
+    """
+    if not cache_dir:
+        _arxiv_throttle(delay)
+        with session.get(ARXIV_API_URL, params=params, timeout=timeout_for(60), stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            yield from _iter_feed(response.raw, page)
+        return
+
+    os.makedirs(cache_dir, exist_ok=True)
+    key = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+    body_path = os.path.join(cache_dir, f"{key}.xml")
+    meta_path = os.path.join(cache_dir, f"{key}.json")
+
+    headers = {}
+    if os.path.exists(body_path) and os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    _arxiv_throttle(delay)
+    with session.get(ARXIV_API_URL, params=params, headers=headers, timeout=timeout_for(60), stream=True) as response:
+        if response.status_code != 304:
+            response.raise_for_status()
+            tmp_path = body_path + ".part"
+            with open(tmp_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
+            os.replace(tmp_path, body_path)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }, f)
+
+    with open(body_path, "rb") as f:
+        yield from _iter_feed(f, page)
+
+
+def iter_arxiv_entries(
+    query: str,
+    max_results: int | None = None,
+    page_size: int = 100,
+    sort_by: str = "relevance",
+    sort_order: str = "descending",
+    delay: float = ARXIV_DELAY_SECONDS,
+    cache_dir: str | None = None,
+):
+    """
+    Stream arXiv search results, page by page, in constant memory.
 
-            results.append({
-                "title": title,
-                "authors": authors,
-                "published": published,
-                "url": url_abstract,
-                "summary": summary,
-                "link_pdf": link_pdf
-            })
+    Args:
+        query (str): Search keywords (searched in all fields).
+        max_results (int | None): Stop after this many entries (None = all).
+        page_size (int): Entries per API request (max 2000).
+        sort_by (str): "relevance", "lastUpdatedDate" or "submittedDate".
+        sort_order (str): "ascending" or "descending".
+        delay (float): Minimum seconds between API requests.
+        cache_dir (str | None): Directory for conditional-request page caching.
+
+    Yields:
+        dict: title, authors, published, url, summary, link_pdf
+    """
+    page_size = max(1, min(page_size, ARXIV_MAX_PAGE_SIZE))
+    start, yielded = 0, 0
+
+    while max_results is None or yielded < max_results:
+        size = page_size if max_results is None else min(page_size, max_results - yielded)
+        params = {
+            "search_query": f"all:{query}",
+            "start": start,
+            "max_results": size,
+            "sortBy": sort_by,
+            "sortOrder": sort_order,
+        }
+        page = {"entries": 0, "total": None}
 
-        return results
+        for entry in _arxiv_page(params, cache_dir, delay, page):
+            yield entry
+            yielded += 1
+            if max_results is not None and yielded >= max_results:
+                return
+
+        start += page["entries"]
+        if page["entries"] == 0 or (page["total"] is not None and start >= page["total"]):
+            return
+
+
+def arxiv_search_tool(query: str, max_results: int = 5) -> list[dict]:
+    """
+    Searches arXiv for research papers matching the given query.
+    """
+    try:
+        return list(iter_arxiv_entries(query, max_results=max_results))
+    except requests.exceptions.RequestException as e:
+        return [{"error": str(e)}]
     except Exception as e:
         return [{"error": f"Parsing failed: {str(e)}"}]
 
@@ -167,10 +301,43 @@ tavily_tool_def = {
 
 ## Wikipedia search tool
 
+# Shared with the research assistant notebooks (interview search_wikipedia node)
+wikipedia_client = WikipediaClient(
+    user_agent=session.headers["User-Agent"],
+    timeout=lambda: timeout_for(30),
+)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _first_sentences(text: str, sentences: int) -> str:
+    return " ".join(_SENTENCE_END.split(text.strip())[:sentences])
+
+
+def wikipedia_lookup(titles: list[str], sentences: int = 5) -> list[dict]:
+    """
+    Summaries for many Wikipedia titles, 20 titles per API request.
+    Pages are cached by canonical title (redirects and normalized titles are
+    remembered) and revalidated by revision ID (see WikipediaClient).
+
+    Returns:
+        list[dict]: title, summary, url and revid for every title found
+    """
+    return [
+        {"title": page["title"], "summary": _first_sentences(page["content"], sentences),
+         "url": page["url"], "revid": page["revid"]}
+        for page in wikipedia_client.lookup(titles)
+    ]
+
+
 def wikipedia_search_tool(query: str, sentences: int = 5) -> list[dict]:
     """
     Searches Wikipedia for a summary of the given query.
 
+    Search, title, summary and URL come back in one MediaWiki API request
+    (instead of separate search, page and summary calls); repeated queries
+    are served from the cache.
+
     Args:
         query (str): Search query for Wikipedia.
         sentences (int): Number of sentences to include in the summary.
@@ -179,15 +346,11 @@ def wikipedia_search_tool(query: str, sentences: int = 5) -> list[dict]:
         list[dict]: A list with a single dictionary containing title, summary, and URL.
     """
     try:
-        page_title = wikipedia.search(query)[0]
-        page = wikipedia.page(page_title)
-        summary = wikipedia.summary(page_title, sentences=sentences)
-
-        return [{
-            "title": page.title,
-            "summary": summary,
-            "url": page.url
-        }]
+        pages = wikipedia_client.search(query, limit=1)
+        if not pages:
+            return [{"error": f"No Wikipedia page found for '{query}'"}]
+        page = pages[0]
+        return [{"title": page["title"], "summary": _first_sentences(page["content"], sentences), "url": page["url"]}]
     except Exception as e:
         return [{"error": str(e)}]
 
@@ -0,0 +1,190 @@
+"""
+Wikipedia lookups in one MediaWiki API request
+
+WikipediaLoader (and the `wikipedia` package) search first and then fetch
+every page separately. This client asks the MediaWiki API for search hits,
+titles, URLs, revision IDs and plain-text extracts in a single request
+(generator=search + prop=extracts|info), and can look up up to 20 titles
+per request.
+
+Pages are cached by title together with their revision ID. Once a cached
+page is older than `refresh_after`, one cheap prop=info request checks the
+revisions of all stale titles; only pages that actually changed are
+fetched again.
+
+Extracts are the lead section of each article (exintro), which is the
+only extract the API returns for many pages at once.
+
+Used by the CRO research tools (cro.research_tools) and by the interview
+nodes of the research assistant notebook.
+"""
+
+import threading
+import time
+from typing import Callable
+
+import requests
+
+API_URL = "https://en.wikipedia.org/w/api.php"
+MAX_TITLES_PER_REQUEST = 20   # TextExtracts limit for intro extracts
+
+
+class WikipediaClient:
+    """
+    Thread-safe, cached Wikipedia client shared by the tools and interview nodes.
+
+    Args:
+        api_url: MediaWiki API endpoint (language edition)
+        refresh_after: seconds before a cached page's revision is re-checked
+        user_agent: sent with every request (Wikimedia API etiquette)
+        timeout: request timeout in seconds, or a callable returning it
+                 (e.g. the remaining deadline)
+    """
+
+    def __init__(self, api_url: str = API_URL, refresh_after: float = 24 * 3600,
+                 user_agent: str = "LF-ADP-Agent/1.0 (research assistant)",
+                 timeout: float | Callable[[], float] = 30):
+        self.api_url = api_url
+        self.refresh_after = refresh_after
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": user_agent})
+        self.pages = {}      # title -> {"title", "pageid", "revid", "url", "content", "fetched"}
+        self.aliases = {}    # requested / redirected title -> canonical title
+        self.searches = {}   # (query, limit) -> [canonical title]
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def _query(self, **params) -> dict:
+        params = {
+            "action": "query",
+            "format": "json",
+            "formatversion": 2,
+            "redirects": 1,
+            **params,
+        }
+        timeout = self.timeout() if callable(self.timeout) else self.timeout
+        response = self.session.get(self.api_url, params=params, timeout=timeout)
+        response.raise_for_status()
+        with self._lock:
+            self.requests += 1
+        return response.json().get("query", {})
+
+    def _store(self, query: dict) -> list[str]:
+        """
+        Cache the pages of an API response; return their canonical titles in
+        search order.
+        """
+        now = time.time()
+        pages = sorted(
+            (p for p in query.get("pages", []) if not p.get("missing") and not p.get("invalid")),
+            key=lambda p: p.get("index", 0),
+        )
+        with self._lock:
+            for mapping in query.get("normalized", []) + query.get("redirects", []):
+                self.aliases[mapping["from"]] = mapping["to"]
+            for page in pages:
+                self.pages[page["title"]] = {
+                    "title": page["title"],
+                    "pageid": page.get("pageid"),
+                    "revid": page.get("lastrevid"),
+                    "url": page.get("fullurl", ""),
+                    "content": page.get("extract", ""),
+                    "fetched": now,
+                }
+        return [page["title"] for page in pages]
+
+    def _canonical(self, title: str) -> str:
+        seen = set()
+        while title in self.aliases and title not in seen:
+            seen.add(title)
+            title = self.aliases[title]
+        return title
+
+    # ------------------------------------------------------------------
+    def _revalidate(self, titles: list[str]):
+        """
+        Drop cached pages whose revision changed since they were fetched.
+        """
+        for start in range(0, len(titles), 50):
+            chunk = titles[start:start + 50]
+            query = self._query(prop="info", titles="|".join(chunk))
+            now = time.time()
+            with self._lock:
+                for page in query.get("pages", []):
+                    cached = self.pages.get(page.get("title"))
+                    if cached is None:
+                        continue
+                    if page.get("missing") or page.get("lastrevid") != cached["revid"]:
+                        del self.pages[page["title"]]
+                    else:
+                        cached["fetched"] = now
+
+    def lookup(self, titles: list[str]) -> list[dict]:
+        """
+        Pages for many titles (cached, revalidated by revision ID).
+
+        Returns:
+            list[dict]: one dict per found title, in input order
+        """
+        canonical = [self._canonical(t) for t in titles]
+        now = time.time()
+        with self._lock:
+            stale = [t for t in canonical if t in self.pages
+                     and now - self.pages[t]["fetched"] > self.refresh_after]
+        if stale:
+            self._revalidate(list(dict.fromkeys(stale)))
+
+        with self._lock:
+            missing = [t for t in dict.fromkeys(canonical) if t not in self.pages]
+        for start in range(0, len(missing), MAX_TITLES_PER_REQUEST):
+            chunk = missing[start:start + MAX_TITLES_PER_REQUEST]
+            self._store(self._query(
+                titles="|".join(chunk),
+                prop="extracts|info",
+                inprop="url",
+                exintro=1,
+                explaintext=1,
+                exlimit=MAX_TITLES_PER_REQUEST,
+            ))
+
+        with self._lock:
+            results = []
+            for title in titles:
+                page = self.pages.get(self._canonical(title))
+                if page is not None:
+                    results.append(dict(page))
+            return results
+
+    def search(self, query: str, limit: int = 2) -> list[dict]:
+        """
+        Search and fetch the top `limit` pages in one request.
+
+        Returns:
+            list[dict]: title, pageid, revid, url, content (lead section)
+        """
+        key = (" ".join(query.lower().split()), limit)
+        with self._lock:
+            titles = self.searches.get(key)
+
+        if titles is None:
+            titles = self._store(self._query(
+                generator="search",
+                gsrsearch=query,
+                gsrlimit=limit,
+                gsrnamespace=0,
+                prop="extracts|info",
+                inprop="url",
+                exintro=1,
+                explaintext=1,
+                exlimit=min(limit, MAX_TITLES_PER_REQUEST),
+            ))
+            with self._lock:
+                self.searches[key] = titles
+
+        return self.lookup(titles)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pages": len(self.pages), "searches": len(self.searches), "requests": self.requests}
@@ -0,0 +1,41 @@
+"""
+Shared helpers for the client wrappers
+
+install_deadlines, install_budgets, install_metrics and install_hedging
+stack wrappers around the same module-level `client` / `TavilyClient`, in
+any order. Each client wrapper keeps the object it wraps in `.wrapped`,
+each TavilyClient factory in `__wrapped__` (functools.wraps), so an install
+can see whether its layer is already present anywhere in the stack, not
+only on the outermost object. Installs run under one process-wide lock, so
+concurrent runs (batch threads, service workers) do not wrap twice.
+"""
+
+import threading
+
+install_lock = threading.RLock()
+
+
+def has_layer(client, cls) -> bool:
+    """
+    True if `client` or any client it wraps is a `cls`.
+    """
+    seen = set()
+    while client is not None and id(client) not in seen:
+        if isinstance(client, cls):
+            return True
+        seen.add(id(client))
+        client = vars(client).get("wrapped") if hasattr(client, "__dict__") else None
+    return False
+
+
+def has_marker(factory, marker: str) -> bool:
+    """
+    True if `factory` or any factory it wraps carries the attribute `marker`.
+    """
+    seen = set()
+    while factory is not None and id(factory) not in seen:
+        if getattr(factory, marker, False):
+            return True
+        seen.add(id(factory))
+        factory = getattr(factory, "__wrapped__", None)
+    return False